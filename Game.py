@@ -1,13 +1,36 @@
 import pygame
+import functools
 import math
 import random
+import time
+import numpy as np
 
-# Initialize Pygame
-pygame.init()
+from bullets import BULLET_HALF_SIZE, BulletStore
+from enemies import EnemyPool
+from hostages import HostageStore
+from level import Level
+from navigation import FlowField
+from particles import FogSystem
+from players import GUN, KNIFE, PlayerStore
+from profiler import Profiler
+from projection import WALL, PLAYER, BULLET, ENEMY, HOSTAGE, ALLY, project, visible_mask
+from raycast import EYE_HEIGHT, Raycaster, visible_spans
+from render_cache import LayerCache, SpriteCache, TextCache
+from replay import InputRecorder, KeyState
+from savestate import restore_state, save_state
+from snapshot import RenderThread, WorldSnapshot
+from spatial import SCALAR_BATCH
 
 # Constants
 WIDTH, HEIGHT = 800, 600
-FPS = 60
+# Frames are drawn up to FPS times a second; the simulation always steps at TICK_RATE
+FPS = 144
+TICK_RATE = 60
+TICK_SECONDS = 1 / TICK_RATE
+# Most ticks run in one frame to catch up; a longer stall is dropped, not replayed
+MAX_CATCH_UP_TICKS = 5
+# Simulated seconds per real second while slow motion is active
+SLOW_MOTION_SCALE = 0.35
 WHITE = (255, 255, 255)
 BLACK = (0, 0, 0)
 RED = (255, 0, 0)
@@ -20,10 +43,62 @@ BROWN = (139, 69, 19)
 SKIN = (255, 220, 177)
 ORANGE = (255, 165, 0)
 
-# Create display
-screen = pygame.display.set_mode((WIDTH, HEIGHT))
-pygame.display.set_caption("Hero's Mission - FPS")
-clock = pygame.time.Clock()
+# Fog puffs in the sky; lower this on slow machines
+FOG_PARTICLES = 15
+# Figures bigger than this are drawn directly instead of caching huge sprites
+HUMAN_SPRITE_MAX_SCALE = 8
+
+# Mission views: the projected third-person camera, or the first-person column raycaster
+THIRD_PERSON = "third-person"
+RAYCAST = "raycast"
+VIEWS = (THIRD_PERSON, RAYCAST)
+# Raycast view: the third-person draw helpers' perspective per screen pixel per world pixel,
+# which makes figures about 40 world pixels tall and bullets their true size; bullets fly
+# this far below the eye
+RAYCAST_FIGURE_PERSPECTIVE = 0.65
+RAYCAST_BULLET_PERSPECTIVE = BULLET_HALF_SIZE / 8
+RAYCAST_BULLET_DROP = 10
+
+# Window surface and frame clock; importing this module opens nothing until init_display()
+screen = None
+clock = None
+
+# Static full-screen layers (background gradient, vignette), shared across restarts
+layer_cache = LayerCache()
+# Fonts and rendered labels for the HUD and overlays
+text_cache = TextCache()
+# Per-phase frame timers; F3 toggles them and their overlay
+profiler = Profiler(text_cache=text_cache)
+
+# Bullets beyond this box (left, top, right, bottom) are discarded
+BULLET_BOUNDS = (-100, -100, WIDTH + 100, HEIGHT + 100)
+
+# Input of a player who is not pressing anything
+IDLE_KEYS = KeyState()
+
+# Living-player indices of a single-player game while its player lives
+SOLO = np.zeros(1, dtype=np.intp)
+SOLO.flags.writeable = False
+
+# Extra co-op players spawn at the first of these offsets from the level's
+# player spawn that is clear of walls
+COOP_SPAWN_OFFSETS = ((0, 0), (0, 40), (0, -40), (40, 0), (-40, 0), (40, 40), (-40, 40), (40, -40),
+                      (-40, -40))
+
+def init_display():
+    """Start only the display and font modules and open the game window
+
+    Anything that draws calls this first. Later calls return the window
+    that is already open.
+    """
+    global screen, clock
+    if screen is None:
+        pygame.display.init()
+        pygame.font.init()
+        screen = pygame.display.set_mode((WIDTH, HEIGHT))
+        pygame.display.set_caption("Hero's Mission - FPS")
+        clock = pygame.time.Clock()
+    return screen
 
 # Game states
 MISSION = "mission"
@@ -31,145 +106,140 @@ DEATH = "death"
 TIMESKIP = "timeskip"
 ENDING = "ending"
 
-class Player:
-    def __init__(self, x, y):
-        self.x = x
-        self.y = y
-        self.angle = 0
-        self.speed = 4
-        self.health = 100
-        self.max_health = 100
-        self.weapon = "gun"  # "gun" or "knife"
-        self.shoot_cooldown = 0
-        self.camera_distance = 150
-        self.camera_height = 80
-        
-    def move(self, keys, walls, enemies):
-        old_x, old_y = self.x, self.y
-        
-        # Strafe movement (fixed directions)
-        if keys[pygame.K_w]:  # Forward
-            self.y -= self.speed
-        if keys[pygame.K_s]:  # Backward
-            self.y += self.speed
-        if keys[pygame.K_a]:  # Left
-            self.x -= self.speed
-        if keys[pygame.K_d]:  # Right
-            self.x += self.speed
-            
-        # Check wall collision
-        for wall in walls:
-            if self.check_collision(wall):
-                self.x, self.y = old_x, old_y
-                break
-                
-        self.shoot_cooldown = max(0, self.shoot_cooldown - 1)
-                
-    def check_collision(self, rect):
-        player_rect = pygame.Rect(self.x - 15, self.y - 15, 30, 30)
-        return player_rect.colliderect(rect)
-        
-    def rotate(self, mouse_dx):
-        self.angle += mouse_dx * 0.003
-        
-    def take_damage(self, amount):
-        self.health -= amount
-        if self.health < 0:
-            self.health = 0
-            
-    def switch_weapon(self):
-        if self.weapon == "gun":
-            self.weapon = "knife"
+def paint_background(size, slow_motion):
+    """Paint the sky and ground gradient once for a screen size"""
+    width, height = size
+    surface = pygame.Surface(size)
+    
+    # Dramatic sunset/dusk sky with gradient
+    for i in range(height // 2):
+        ratio = i / (height // 2)
+        if not slow_motion:
+            r = int(255 * (1 - ratio * 0.5))
+            g = int(140 * (1 - ratio * 0.7))
+            b = int(50 + 150 * ratio)
         else:
-            self.weapon = "gun"
-            
-    def can_shoot(self):
-        return self.shoot_cooldown == 0
+            r = int(200 * (1 - ratio * 0.5))
+            g = int(100 * (1 - ratio * 0.7))
+            b = int(150 + 50 * ratio)
+        pygame.draw.line(surface, (r, g, b), (0, i), (width, i))
+    
+    # Dramatic ground with shadows
+    for i in range(height // 2, height):
+        ratio = (i - height // 2) / (height // 2)
+        if not slow_motion:
+            gray_val = int(40 + ratio * 30)
+            pygame.draw.line(surface, (gray_val, gray_val + 10, gray_val), (0, i), (width, i))
+        else:
+            gray_val = int(30 + ratio * 20)
+            pygame.draw.line(surface, (gray_val, gray_val, gray_val + 30), (0, i), (width, i))
+    
+    # Slow motion effect overlay, baked in since nothing is drawn between it and the sky
+    if slow_motion:
+        overlay = pygame.Surface(size)
+        overlay.set_alpha(30)
+        overlay.fill((100, 100, 255))
+        surface.blit(overlay, (0, 0))
+    
+    return surface.convert()
 
-class Enemy:
-    def __init__(self, x, y):
-        self.x = x
-        self.y = y
-        self.health = 60
-        self.max_health = 60
-        self.speed = 1.2
-        self.shoot_timer = 0
-        self.shoot_cooldown = 90
-        
-    def update(self, player_x, player_y, walls):
-        dx = player_x - self.x
-        dy = player_y - self.y
-        dist = math.sqrt(dx**2 + dy**2)
-        
-        if dist > 200:
-            old_x, old_y = self.x, self.y
-            self.x += (dx / dist) * self.speed
-            self.y += (dy / dist) * self.speed
-            
-            # Check wall collision for enemies
-            enemy_rect = pygame.Rect(self.x - 15, self.y - 15, 30, 30)
-            for wall in walls:
-                if enemy_rect.colliderect(wall):
-                    self.x, self.y = old_x, old_y
-                    break
-            
-        self.shoot_timer += 1
-        
-    def get_angle_to_player(self, player_x, player_y):
-        return math.atan2(player_y - self.y, player_x - self.x)
+def paint_vignette(size, variant):
+    """Paint the dark vignette frame once for a screen size"""
+    width, height = size
+    vignette = pygame.Surface(size, pygame.SRCALPHA)
+    for i in range(150):
+        alpha = int((i / 150) * 80)
+        pygame.draw.rect(vignette, (0, 0, 0, alpha), (i, i, width - i*2, height - i*2), 1)
+    return vignette.convert_alpha()
 
-class Hostage:
-    def __init__(self, x, y):
-        self.x = x
-        self.y = y
-        self.saved = False
+def draw_human_primitives(surface, x, y, scale, color):
+    """Draw a simple human figure from primitives"""
+    # Head
+    pygame.draw.circle(surface, SKIN, (int(x), int(y - 15 * scale)), int(8 * scale))
+    
+    # Body
+    pygame.draw.rect(surface, color, 
+                    (int(x - 6 * scale), int(y - 7 * scale), 
+                     int(12 * scale), int(20 * scale)))
+    
+    # Arms
+    pygame.draw.rect(surface, SKIN, 
+                    (int(x - 12 * scale), int(y - 5 * scale), 
+                     int(5 * scale), int(12 * scale)))
+    pygame.draw.rect(surface, SKIN, 
+                    (int(x + 7 * scale), int(y - 5 * scale), 
+                     int(5 * scale), int(12 * scale)))
+    
+    # Legs
+    pygame.draw.rect(surface, BROWN, 
+                    (int(x - 6 * scale), int(y + 13 * scale), 
+                     int(5 * scale), int(15 * scale)))
+    pygame.draw.rect(surface, BROWN, 
+                    (int(x + 1 * scale), int(y + 13 * scale), 
+                     int(5 * scale), int(15 * scale)))
 
-class Bullet:
-    def __init__(self, x, y, angle, friendly=True):
-        self.x = x
-        self.y = y
-        self.angle = angle
-        self.speed = 12
-        self.friendly = friendly
-        self.active = True
-        
-    def update(self, walls):
-        self.x += math.cos(self.angle) * self.speed
-        self.y += math.sin(self.angle) * self.speed
-        
-        # Check wall collision
-        bullet_rect = pygame.Rect(self.x - 3, self.y - 3, 6, 6)
-        for wall in walls:
-            if bullet_rect.colliderect(wall):
-                self.active = False
-                return
-        
-    def is_off_map(self):
-        return self.x < -100 or self.x > 900 or self.y < -100 or self.y > 700
+def paint_human(color, scale):
+    """Render one human figure to a sprite; returns (surface, anchor)"""
+    anchor_x = math.ceil(12 * scale) + 1
+    anchor_y = math.ceil(23 * scale) + 1
+    size = (2 * anchor_x + 1, anchor_y + math.ceil(28 * scale) + 2)
+    sprite = pygame.Surface(size, pygame.SRCALPHA)
+    draw_human_primitives(sprite, anchor_x, anchor_y, scale, color)
+    return sprite.convert_alpha(), (anchor_x, anchor_y)
 
-class Game:
-    def __init__(self):
-        self.state = MISSION
-        self.player = Player(100, 300)
-        self.enemies = [
-            Enemy(600, 200),
-            Enemy(700, 400),
-            Enemy(650, 150),
-            Enemy(500, 480),
-            Enemy(550, 300)
-        ]
-        self.hostages = [
-            Hostage(680, 300),
-            Hostage(720, 320),
-            Hostage(650, 280)
-        ]
-        self.bullets = []
-        self.walls = [
+# Pre-rendered human figures by (color, quantized scale)
+human_sprites = SpriteCache(paint_human)
+
+@functools.lru_cache(maxsize=None)
+def mission_level():
+    """The built-in mission map, built once and shared by every Game"""
+    return Level.build(
+        (WIDTH, HEIGHT),
+        walls=[
             pygame.Rect(250, 150, 20, 300),
             pygame.Rect(400, 200, 150, 20),
             pygame.Rect(550, 350, 20, 150),
             pygame.Rect(200, 450, 200, 20)
-        ]
+        ],
+        player_spawn=(100, 300),
+        enemy_spawns=[(600, 200), (700, 400), (650, 150), (500, 480), (550, 300)],
+        hostage_spawns=[(680, 300), (720, 320), (650, 280)])
+
+def coop_spawns(level, count):
+    """Spawn points for count players around the level's player spawn"""
+    spawn_x, spawn_y = level.player_spawn
+    points = [(spawn_x + dx, spawn_y + dy) for dx, dy in COOP_SPAWN_OFFSETS
+              if not level.wall_grid.hits_box(spawn_x + dx, spawn_y + dy, 15)]
+    return [points[i % len(points)] for i in range(count)]
+
+class Game:
+    def __init__(self, level=None, seed=None, players=1, view=THIRD_PERSON):
+        if level is None:
+            level = mission_level()
+        self.level = level
+        # How draw_mission shows the mission, one of VIEWS; the raycaster's grid is built on first use
+        self.view = view
+        self.raycaster = None
+        # Simulation randomness comes only from self.rng, so a seed and the
+        # inputs fully determine a run; drawing uses its own generator
+        self.seed = seed
+        self.rng = random.Random(seed)
+        self.render_rng = random.Random(seed)
+        # Persistent fog particles, drifting across the sky between frames
+        self.fog = FogSystem(FOG_PARTICLES, seed=seed)
+        self.state = MISSION
+        # self.player is the local player; co-op missions add more behind it
+        self.players = PlayerStore(coop_spawns(level, players))
+        self.player = self.players[0]
+        self.enemies = EnemyPool.from_spawns(level.enemy_spawns.tolist())
+        self.hostages = HostageStore(level.hostage_spawns.tolist())
+        self.bullets = BulletStore()
+        self.walls = level.rects
+        # Broadphase and navigation grid come prebuilt with the level
+        self.wall_grid = level.wall_grid
+        self.nav_grid = level.nav_grid
+        # Shared path toward the player that every enemy samples
+        self.flow_field = FlowField(self.nav_grid)
         self.hostages_saved = 0
         self.timeskip_timer = 0
         self.ending_timer = 0
@@ -177,63 +247,65 @@ class Game:
         self.head_turn_angle = 0
         self.slow_motion = False
         self.slow_motion_timer = 0
+        self.tick = 0
+        # Line of sight results for the current tick, keyed by enemy id
+        self.los_cache = {}
+        self.los_cache_tick = -1
+        # Positions before the latest tick, to draw frames that fall between ticks
+        self.prev_player = None
+        self.prev_enemies = None
+        # Static death/timeskip/ending screen currently on the display, and its overlays
+        self.screen_shown = None
+        self.screen_base = None
+        self.screen_parts = {}
+        # Restarting with the same seed restores this instead of rebuilding everything
+        self.opening = save_state(self)
         
     def handle_mission(self, keys, mouse_dx, mouse_click):
-        # Player movement and rotation
-        self.player.move(keys, self.walls, self.enemies)
-        self.player.rotate(mouse_dx)
+        """Advance the mission one tick with input for the local player"""
+        self.handle_players(((keys, mouse_dx, mouse_click),))
         
-        # Check if player died
-        if self.player.health <= 0:
-            self.state = DEATH
-            return
+    def handle_players(self, inputs):
+        """Advance the mission one tick with one (keys, mouse_dx, mouse_click) per player
+
+        Players without an entry stand still. The mission fails once every
+        player is down.
+        """
+        self.tick += 1
+        players = self.players
+        
+        if len(players) == 1:
+            # A lone player is stepped with plain scalars; there is nothing to batch
+            keys, mouse_dx, mouse_click = next(iter(inputs), (IDLE_KEYS, 0, False))
+            if players.health[0] <= 0:
+                self.state = DEATH
+                return
+            alive = SOLO
+            players.move_one(0, keys[pygame.K_d] - keys[pygame.K_a], keys[pygame.K_s] - keys[pygame.K_w],
+                             self.wall_grid)
+            players.rotate(0, mouse_dx)
+            players.switch_one(0, keys[pygame.K_q])
+            if mouse_click:
+                self.fire_weapons(alive)
+        else:
+            inputs = list(inputs) + [(IDLE_KEYS, 0, False)] * (len(players) - len(inputs))
         
-        # Weapon switching with Q
-        if keys[pygame.K_q]:
-            if not hasattr(self, 'weapon_switch_cooldown'):
-                self.weapon_switch_cooldown = 0
-            if self.weapon_switch_cooldown == 0:
-                self.player.switch_weapon()
-                self.weapon_switch_cooldown = 20
+            # One row of controls per living player: strafe x and y, turn, switch, fire
+            alive = players.alive()
+            controls = np.array([(keys[pygame.K_d] - keys[pygame.K_a], keys[pygame.K_s] - keys[pygame.K_w],
+                                  mouse_dx, keys[pygame.K_q], mouse_click)
+                                 for keys, mouse_dx, mouse_click in inputs], dtype=float)[alive]
         
-        if hasattr(self, 'weapon_switch_cooldown'):
-            self.weapon_switch_cooldown = max(0, self.weapon_switch_cooldown - 1)
+            # Player movement and rotation, for every living player at once
+            players.move(alive, controls[:, 0], controls[:, 1], self.wall_grid)
+            players.rotate(alive, controls[:, 2])
         
-        # Shooting or melee
-        if mouse_click and self.player.can_shoot():
-            if self.player.weapon == "gun":
-                # Calculate muzzle position (in front of player)
-                muzzle_offset = 25
-                muzzle_x = self.player.x + math.cos(self.player.angle) * muzzle_offset
-                muzzle_y = self.player.y + math.sin(self.player.angle) * muzzle_offset
-                
-                bullet = Bullet(muzzle_x, muzzle_y, self.player.angle)
-                self.bullets.append(bullet)
-                self.player.shoot_cooldown = 15
-                
-                # Activate slow motion briefly
-                self.slow_motion = True
-                self.slow_motion_timer = 20
-            else:  # knife
-                # Melee attack - check enemies in front
-                for enemy in self.enemies[:]:
-                    dx = enemy.x - self.player.x
-                    dy = enemy.y - self.player.y
-                    dist = math.sqrt(dx**2 + dy**2)
-                    angle_to_enemy = math.atan2(dy, dx)
-                    angle_diff = abs(angle_to_enemy - self.player.angle)
-                    
-                    # Normalize angle difference
-                    while angle_diff > math.pi:
-                        angle_diff -= 2 * math.pi
-                    angle_diff = abs(angle_diff)
-                    
-                    if dist < 60 and angle_diff < 0.5:  # Close and in front
-                        enemy.health -= 50
-                        if enemy.health <= 0:
-                            self.enemies.remove(enemy)
-                        self.player.shoot_cooldown = 30
-                        break
+            # Check if every player died
+            if not len(alive):
+                self.state = DEATH
+                return
+        
+            self.handle_weapons(alive, controls[:, 3] > 0, controls[:, 4] > 0)
         
         # Update slow motion
         if self.slow_motion:
@@ -241,194 +313,297 @@ class Game:
             if self.slow_motion_timer <= 0:
                 self.slow_motion = False
         
-        # Bullet speed modifier based on slow motion
-        bullet_updates = 1 if not self.slow_motion else 1
+        # Update bullets (slow motion scales time in main(), not the step size)
+        with profiler.phase("bullets"):
+            self.bullets.update(self.wall_grid, BULLET_BOUNDS)
         
-        # Update bullets
-        for _ in range(bullet_updates):
-            for bullet in self.bullets[:]:
-                if not bullet.active:
-                    self.bullets.remove(bullet)
-                    continue
-                    
-                bullet.update(self.walls)
-                
-                if bullet.is_off_map():
-                    self.bullets.remove(bullet)
-                    continue
+            # Check bullet collisions
+            n = len(self.enemies)
+            hits = self.bullets.collide(self.enemies.x[:n], self.enemies.y[:n], 20, friendly=True)
+            if len(hits):
+                self.enemies.damage(hits, 30)
+                self.enemies.remove_dead()
+        
+            hits = self.bullets.collide(players.x[alive], players.y[alive], 20, friendly=False)
+            if len(hits):
+                players.damage(alive, 15 * np.bincount(hits, minlength=len(alive)))
+        
+            self.bullets.compact()
                     
-                # Check bullet collisions
-                if bullet.friendly:
-                    for enemy in self.enemies[:]:
-                        dist = math.sqrt((bullet.x - enemy.x)**2 + (bullet.y - enemy.y)**2)
-                        if dist < 20:
-                            enemy.health -= 30
-                            if bullet in self.bullets:
-                                self.bullets.remove(bullet)
-                            if enemy.health <= 0:
-                                self.enemies.remove(enemy)
-                            break
-                else:
-                    dist = math.sqrt((bullet.x - self.player.x)**2 + (bullet.y - self.player.y)**2)
-                    if dist < 20:
-                        self.player.take_damage(15)
-                        if bullet in self.bullets:
-                            self.bullets.remove(bullet)
-                        
-        # Update enemies
-        for enemy in self.enemies:
-            enemy.update(self.player.x, self.player.y, self.walls)
+        # Update every enemy in one step; returns those ready to fire
+        with profiler.phase("enemy_ai"):
+            target_x, target_y = self.enemy_targets(alive)
+            if len(alive) == 1:
+                self.flow_field.update(target_x, target_y)
+            else:
+                self.flow_field.update(players.x[alive], players.y[alive])
+            ready = self.enemies.update(target_x, target_y, self.wall_grid, self.flow_field)
             
-            # Enemy shooting - check line of sight
-            if enemy.shoot_timer > enemy.shoot_cooldown:
-                if self.has_line_of_sight(enemy.x, enemy.y, self.player.x, self.player.y):
-                    angle = enemy.get_angle_to_player(self.player.x, self.player.y)
-                    angle += random.uniform(-0.15, 0.15)
-                    self.bullets.append(Bullet(enemy.x, enemy.y, angle, friendly=False))
-                    enemy.shoot_timer = 0
+        # Enemy shooting - check line of sight for every enemy ready to fire in one batch
+        if len(ready):
+            with profiler.phase("los"):
+                sees_player = self.cache_line_of_sight(ready, target_x, target_y)
+            shooters = ready[sees_player]
+            if len(shooters):
+                enemies = self.enemies
+                if np.ndim(target_x):
+                    aim_x, aim_y = target_x[shooters], target_y[shooters]
+                else:
+                    aim_x, aim_y = target_x, target_y
+                angles = np.arctan2(aim_y - enemies.y[shooters], aim_x - enemies.x[shooters])
+                angles += [self.rng.uniform(-0.15, 0.15) for _ in range(len(shooters))]
+                self.bullets.spawn_many(enemies.x[shooters], enemies.y[shooters], angles, friendly=False)
+                enemies.shoot_timer[shooters] = 0
                     
-        # Check hostage rescue
-        for hostage in self.hostages:
-            if not hostage.saved:
-                dist = math.sqrt((self.player.x - hostage.x)**2 + (self.player.y - hostage.y)**2)
-                if dist < 50 and len(self.enemies) == 0:
-                    hostage.saved = True
-                    self.hostages_saved += 1
+        # Hostages can be rescued by any living player once every enemy is down
+        if len(self.enemies) == 0:
+            self.hostages_saved += self.hostages.rescue(players.x[alive], players.y[alive])
                     
         # Check mission complete
         if self.hostages_saved >= len(self.hostages):
             self.state = TIMESKIP
     
-    def has_line_of_sight(self, x1, y1, x2, y2):
-        """Check if there's a clear line between two points"""
-        steps = 20
-        for i in range(steps):
-            t = i / steps
-            check_x = x1 + (x2 - x1) * t
-            check_y = y1 + (y2 - y1) * t
+    def handle_weapons(self, alive, switch, fire):
+        """Weapon switching, shooting and melee for the living players, given who pressed what"""
+        players = self.players
+        
+        # Weapon switching with Q
+        players.switch_weapons(alive, switch)
+        
+        # Shooting or melee
+        if fire.any():
+            self.fire_weapons(alive[fire])
+    
+    def fire_weapons(self, pressing):
+        """Shooting or melee for the given players pressing fire, those off cooldown"""
+        players = self.players
+        firing = pressing[players.shoot_cooldown[pressing] == 0]
+        gunners = firing[players.weapon[firing] == GUN]
+        if len(gunners):
+            # Bullets leave from the muzzle, in front of each player
+            muzzle_offset = 25
+            angles = players.angle[gunners]
+            self.bullets.spawn_many(players.x[gunners] + np.cos(angles) * muzzle_offset,
+                                    players.y[gunners] + np.sin(angles) * muzzle_offset, angles)
+            players.shoot_cooldown[gunners] = 15
             
-            check_rect = pygame.Rect(check_x - 2, check_y - 2, 4, 4)
-            for wall in self.walls:
-                if check_rect.colliderect(wall):
-                    return False
-        return True
+            # Activate slow motion briefly
+            self.slow_motion = True
+            self.slow_motion_timer = 20
             
+        # Melee attack - hits the first enemy close and in front; each kill changes the pool
+        for i in firing[players.weapon[firing] == KNIFE].tolist():
+            px, py = players.x[i], players.y[i]
+            n = len(self.enemies)
+            dx = self.enemies.x[:n] - px
+            dy = self.enemies.y[:n] - py
+            dist = np.hypot(dx, dy)
+            angle_to_enemy = np.arctan2(dy, dx)
+            
+            # Normalize angle difference
+            angle_diff = np.abs((angle_to_enemy - players.angle[i] + math.pi) % (2 * math.pi) - math.pi)
+            
+            in_reach = np.flatnonzero((dist < 60) & (angle_diff < 0.5))  # Close and in front
+            if len(in_reach):
+                self.enemies.damage(in_reach[:1], 50)
+                self.enemies.remove_dead()
+                players.shoot_cooldown[i] = 30
+    
+    def enemy_targets(self, alive):
+        """Where each enemy heads and aims: the nearest of the given living players
+
+        With a single player these are its scalar coordinates; otherwise
+        they are per-enemy arrays.
+        """
+        players = self.players
+        if len(alive) == 1:
+            i = alive[0]
+            return players.x[i].item(), players.y[i].item()
+        n = len(self.enemies)
+        xs = players.x[alive]
+        ys = players.y[alive]
+        nearest = np.argmin(np.hypot(self.enemies.x[:n, None] - xs, self.enemies.y[:n, None] - ys), axis=1)
+        return xs[nearest], ys[nearest]
+    
+    def remember_positions(self):
+        """Keep the positions the next tick starts from, for interpolated drawing"""
+        player = self.player
+        enemies = self.enemies
+        n = len(enemies)
+        self.prev_player = (player.x, player.y, player.angle)
+        self.prev_enemies = (enemies.ids[:n].copy(), enemies.x[:n].copy(), enemies.y[:n].copy())
+    
+    def snapshot(self):
+        """Immutable copy of what the mission view draws, safe to hand to another thread"""
+        return WorldSnapshot.capture(self)
+    
+    def has_line_of_sight(self, x1, y1, x2, y2):
+        """Check if there's a clear line between two points"""
+        return not self.wall_grid.segment_blocked(x1, y1, x2, y2)
+    
+    def _los_cache_for_tick(self):
+        if self.los_cache_tick != self.tick:
+            self.los_cache.clear()
+            self.los_cache_tick = self.tick
+        return self.los_cache
+    
+    def cache_line_of_sight(self, indices, target_x=None, target_y=None):
+        """Line of sight to the player for many enemies in one vectorized pass
+
+        Targets default to the local player and may be per-enemy arrays, as
+        from enemy_targets. Returns a bool array aligned with indices.
+        Batches up to SCALAR_BATCH are tested one ray at a time and skip the
+        per-tick cache, which costs more than it saves for a handful.
+        """
+        if target_x is None:
+            target_x, target_y = self.player.x, self.player.y
+        if len(indices) <= SCALAR_BATCH:
+            xs = self.enemies.x
+            ys = self.enemies.y
+            per_enemy = np.ndim(target_x)
+            return np.array([self.has_line_of_sight(xs[i], ys[i], target_x[i] if per_enemy else target_x,
+                                                    target_y[i] if per_enemy else target_y)
+                             for i in indices.tolist()], dtype=bool)
+        cache = self._los_cache_for_tick()
+        enemies = self.enemies
+        ids = enemies.ids[indices].tolist()
+        pending = [i for i, enemy_id in zip(indices.tolist(), ids) if enemy_id not in cache]
+        if pending:
+            if np.ndim(target_x):
+                end_x, end_y = target_x[pending], target_y[pending]
+            else:
+                end_x, end_y = np.full(len(pending), target_x), np.full(len(pending), target_y)
+            blocked = self.wall_grid.segments_blocked(enemies.x[pending], enemies.y[pending], end_x, end_y)
+            for enemy_id, is_blocked in zip(enemies.ids[pending].tolist(), blocked.tolist()):
+                cache[enemy_id] = not is_blocked
+        return np.array([cache[enemy_id] for enemy_id in ids], dtype=bool)
+    
     def draw_human(self, screen, x, y, scale, color, facing_angle=0):
         """Draw a simple human figure"""
-        # Head
-        pygame.draw.circle(screen, SKIN, (int(x), int(y - 15 * scale)), int(8 * scale))
-        
-        # Body
-        pygame.draw.rect(screen, color, 
-                        (int(x - 6 * scale), int(y - 7 * scale), 
-                         int(12 * scale), int(20 * scale)))
-        
-        # Arms
-        pygame.draw.rect(screen, SKIN, 
-                        (int(x - 12 * scale), int(y - 5 * scale), 
-                         int(5 * scale), int(12 * scale)))
-        pygame.draw.rect(screen, SKIN, 
-                        (int(x + 7 * scale), int(y - 5 * scale), 
-                         int(5 * scale), int(12 * scale)))
-        
-        # Legs
-        pygame.draw.rect(screen, BROWN, 
-                        (int(x - 6 * scale), int(y + 13 * scale), 
-                         int(5 * scale), int(15 * scale)))
-        pygame.draw.rect(screen, BROWN, 
-                        (int(x + 1 * scale), int(y + 13 * scale), 
-                         int(5 * scale), int(15 * scale)))
+        if scale > HUMAN_SPRITE_MAX_SCALE:
+            draw_human_primitives(screen, x, y, scale, color)
+            return
+        sprite, (anchor_x, anchor_y) = human_sprites.get(color, scale)
+        screen.blit(sprite, (int(x) - anchor_x, int(y) - anchor_y))
             
-    def draw_fps_view(self):
-        # Dramatic sunset/dusk sky with gradient
-        for i in range(HEIGHT // 2):
-            ratio = i / (HEIGHT // 2)
-            if not self.slow_motion:
-                r = int(255 * (1 - ratio * 0.5))
-                g = int(140 * (1 - ratio * 0.7))
-                b = int(50 + 150 * ratio)
-            else:
-                r = int(200 * (1 - ratio * 0.5))
-                g = int(100 * (1 - ratio * 0.7))
-                b = int(150 + 50 * ratio)
-            pygame.draw.line(screen, (r, g, b), (0, i), (WIDTH, i))
-        
-        # Dramatic ground with shadows
-        for i in range(HEIGHT // 2, HEIGHT):
-            ratio = (i - HEIGHT // 2) / (HEIGHT // 2)
-            if not self.slow_motion:
-                gray_val = int(40 + ratio * 30)
-                pygame.draw.line(screen, (gray_val, gray_val + 10, gray_val), (0, i), (WIDTH, i))
-            else:
-                gray_val = int(30 + ratio * 20)
-                pygame.draw.line(screen, (gray_val, gray_val, gray_val + 30), (0, i), (WIDTH, i))
-        
-        # Add dramatic fog/atmosphere particles
-        if not self.slow_motion:
-            for _ in range(15):
-                fog_x = random.randint(0, WIDTH)
-                fog_y = random.randint(0, HEIGHT // 2)
-                fog_size = random.randint(30, 80)
-                fog_surface = pygame.Surface((fog_size, fog_size), pygame.SRCALPHA)
-                pygame.draw.circle(fog_surface, (255, 255, 255, 20), (fog_size // 2, fog_size // 2), fog_size // 2)
-                screen.blit(fog_surface, (fog_x, fog_y))
-        
-        # Slow motion effect overlay
-        if self.slow_motion:
-            overlay = pygame.Surface((WIDTH, HEIGHT))
-            overlay.set_alpha(30)
-            overlay.fill((100, 100, 255))
-            screen.blit(overlay, (0, 0))
-        
-        # Sort entities by distance for proper rendering
-        entities = []
-        
-        # Add walls
-        for wall in self.walls:
-            wall_center_x = wall.x + wall.width // 2
-            wall_center_y = wall.y + wall.height // 2
-            dist = math.sqrt((wall_center_x - self.player.x)**2 + 
-                           (wall_center_y - self.player.y)**2)
-            entities.append(('wall', wall, dist))
-        
-        # Add player (for third person view)
-        entities.append(('player', self.player, 0))
-        
-        # Add bullets
-        for bullet in self.bullets:
-            dist = math.sqrt((bullet.x - self.player.x)**2 + 
-                           (bullet.y - self.player.y)**2)
-            entities.append(('bullet', bullet, dist))
-        
-        # Add enemies
-        for enemy in self.enemies:
-            dist = math.sqrt((enemy.x - self.player.x)**2 + 
-                           (enemy.y - self.player.y)**2)
-            entities.append(('enemy', enemy, dist))
+    def draw_fps_view(self, world, alpha=1.0):
+        # Pre-baked sky and ground (with the slow motion tint in its variant)
+        with profiler.phase("background"):
+            background = layer_cache.get("background", screen.get_size(), world.slow_motion, paint_background)
+            screen.blit(background, (0, 0))
             
-        # Add hostages
-        for hostage in self.hostages:
-            if not hostage.saved:
-                dist = math.sqrt((hostage.x - self.player.x)**2 + 
-                               (hostage.y - self.player.y)**2)
-                entities.append(('hostage', hostage, dist))
+            # Add dramatic fog/atmosphere particles, drifting one step per simulation tick
+            if not world.slow_motion:
+                self.fog.draw(screen, (WIDTH, HEIGHT // 2), world.tick - 1 + alpha)
         
-        # Sort by distance (furthest first)
-        entities.sort(key=lambda e: e[2], reverse=True)
+        if self.view == RAYCAST:
+            self.draw_raycast(world, alpha)
+            return
+        with profiler.phase("entities"):
+            self.draw_entities(world, alpha)
+            
+    def draw_entities(self, world, alpha=1.0):
+        # Gather every entity into flat arrays: kind, index, projected point, sort distance
+        player = world.player
+        (player_x, player_y, player_angle), bullet_xs, bullet_ys, enemy_xs, enemy_ys = \
+            world.render_positions(alpha)
+        boxes = self.wall_grid.boxes
+        hostages = [hostage for hostage in world.hostages if not hostage.saved]
+        allies = world.allies
+        counts = (len(boxes), 1, len(bullet_xs), len(enemy_xs), len(hostages), len(allies))
+        kinds = np.repeat(np.arange(len(counts)), counts)
+        refs = np.concatenate([np.arange(count) for count in counts])
+        xs = np.concatenate((boxes[:, 0], (player_x,), bullet_xs, enemy_xs,
+                             [hostage.x for hostage in hostages], [ally.x for ally in allies]))
+        ys = np.concatenate((boxes[:, 1], (player_y,), bullet_ys, enemy_ys,
+                             [hostage.y for hostage in hostages], [ally.y for ally in allies]))
+        
+        # Project and cull everything in one pass
+        screen_xs, screen_ys, perspectives, distances = project(
+            xs, ys, player_x, player_y, player_angle + math.pi, WIDTH // 2, HEIGHT // 2)
+        visible = np.flatnonzero(visible_mask(kinds, screen_xs, screen_ys, distances, WIDTH, HEIGHT))
+        
+        # Walls sort by their centre rather than the projected corner
+        sort_dist = distances.copy()
+        sort_dist[:len(boxes)] = np.hypot(boxes[:, 0] + (boxes[:, 2] - boxes[:, 0]) // 2 - player_x,
+                                          boxes[:, 1] + (boxes[:, 3] - boxes[:, 1]) // 2 - player_y)
+        sort_dist[len(boxes)] = 0
+        
+        # Painter's order: furthest first, survivors only
+        order = visible[np.argsort(-sort_dist[visible], kind="stable")]
         
         # Draw entities
-        for entity_type, entity, dist in entities:
-            if entity_type == 'wall':
-                self.draw_wall_3pv(entity)
-            elif entity_type == 'player':
-                self.draw_player_3pv(entity)
-            elif entity_type == 'bullet':
-                self.draw_bullet_3pv(entity)
-            elif entity_type == 'enemy':
-                self.draw_enemy_3pv(entity)
-            elif entity_type == 'hostage':
-                self.draw_hostage_3pv(entity)
+        for i in order.tolist():
+            kind = kinds[i]
+            ref = refs[i]
+            screen_x = int(screen_xs[i])
+            screen_y = int(screen_ys[i])
+            if kind == WALL:
+                self.draw_wall_3pv(self.walls[ref], screen_x, screen_y, perspectives[i], distances[i])
+            elif kind == PLAYER:
+                self.draw_player_3pv(player)
+            elif kind == BULLET:
+                self.draw_bullet_3pv(world, ref, screen_x, screen_y, perspectives[i])
+            elif kind == ENEMY:
+                self.draw_enemy_3pv(world, ref, screen_x, screen_y, perspectives[i])
+            elif kind == HOSTAGE:
+                self.draw_hostage_3pv(hostages[ref], screen_x, screen_y, perspectives[i])
+            elif kind == ALLY:
+                self.draw_ally_3pv(allies[ref], screen_x, screen_y, perspectives[i])
                 
+    def draw_raycast(self, world, alpha=1.0):
+        """First-person view: walls from the column raycaster, figures clipped by its depth buffer"""
+        (player_x, player_y, player_angle), bullet_xs, bullet_ys, enemy_xs, enemy_ys = \
+            world.render_positions(alpha)
+        if self.raycaster is None:
+            self.raycaster = Raycaster(self.wall_grid.boxes)
+        raycaster = self.raycaster
+        with profiler.phase("walls"):
+            depth = raycaster.draw(screen, player_x, player_y, player_angle)
+        
+        with profiler.phase("entities"):
+            hostages = [hostage for hostage in world.hostages if not hostage.saved]
+            allies = world.allies
+            counts = (len(bullet_xs), len(enemy_xs), len(hostages), len(allies))
+            kinds = np.repeat(np.array((BULLET, ENEMY, HOSTAGE, ALLY)), counts)
+            refs = np.concatenate([np.arange(count) for count in counts])
+            xs = np.concatenate((bullet_xs, enemy_xs, [hostage.x for hostage in hostages],
+                                 [ally.x for ally in allies]))
+            ys = np.concatenate((bullet_ys, enemy_ys, [hostage.y for hostage in hostages],
+                                 [ally.y for ally in allies]))
+            screen_xs, forward = raycaster.project(xs, ys, player_x, player_y, player_angle, WIDTH)
+            
+            # Painter's order among the figures in front of the eye; walls are handled by the depth buffer
+            ahead = np.flatnonzero(forward > 10)
+            order = ahead[np.argsort(-forward[ahead], kind="stable")]
+            focal = raycaster.focal_length(WIDTH)
+            for i in order.tolist():
+                kind = kinds[i]
+                ref = refs[i]
+                scale = focal / forward[i]
+                screen_x = int(screen_xs[i])
+                if kind == BULLET:
+                    perspective = scale * RAYCAST_BULLET_PERSPECTIVE
+                    half_width = max(int(8 * perspective), 3)
+                    screen_y = HEIGHT // 2 + int(scale * RAYCAST_BULLET_DROP)
+                else:
+                    perspective = scale * RAYCAST_FIGURE_PERSPECTIVE
+                    # Figures stand on the ground, which is EYE_HEIGHT below the eye
+                    half_width = int(20 * perspective * 1.2) + 1
+                    screen_y = HEIGHT // 2 + int(scale * EYE_HEIGHT - 28 * perspective * 1.2)
+                spans = visible_spans(depth, screen_x - half_width, screen_x + half_width + 1, forward[i])
+                for start, end in spans:
+                    screen.set_clip((start, 0, end - start, HEIGHT))
+                    if kind == BULLET:
+                        self.draw_bullet_3pv(world, ref, screen_x, screen_y, perspective)
+                    elif kind == ENEMY:
+                        self.draw_enemy_3pv(world, ref, screen_x, screen_y, perspective)
+                    elif kind == HOSTAGE:
+                        self.draw_hostage_3pv(hostages[ref], screen_x, screen_y, perspective)
+                    elif kind == ALLY:
+                        self.draw_ally_3pv(allies[ref], screen_x, screen_y, perspective)
+            screen.set_clip(None)
+            
     def draw_player_3pv(self, player):
         """Draw player in third person view"""
         # Calculate camera position behind player
@@ -458,122 +633,76 @@ class Game:
                 (knife_x + 13, knife_y)
             ])
     
-    def draw_bullet_3pv(self, bullet):
-        """Draw bullets in 3D space for third person"""
-        # Calculate relative position from player
-        rel_x = bullet.x - self.player.x
-        rel_y = bullet.y - self.player.y
-        
-        # Rotate relative to camera angle
-        cam_angle = self.player.angle + math.pi
-        rotated_x = rel_x * math.cos(-cam_angle) - rel_y * math.sin(-cam_angle)
-        rotated_y = rel_x * math.sin(-cam_angle) + rel_y * math.cos(-cam_angle)
-        
-        # Apply perspective
-        distance = math.sqrt(rel_x**2 + rel_y**2)
-        if distance > 0:
-            perspective = 200 / (distance + 50)
-            screen_x = WIDTH // 2 + int(rotated_x * perspective)
-            screen_y = HEIGHT // 2 + int(rotated_y * perspective * 0.5)
-            
-            if 0 < screen_x < WIDTH and 0 < screen_y < HEIGHT:
-                bullet_color = ORANGE if bullet.friendly else RED
-                bullet_size = max(int(8 * perspective), 3)
-                pygame.draw.circle(screen, bullet_color, (screen_x, screen_y), bullet_size)
+    def draw_bullet_3pv(self, world, i, screen_x, screen_y, perspective):
+        """Draw bullet i of the snapshot's bullets at its projected third person position"""
+        bullets = world.bullets
+        bullet_color = ORANGE if bullets.friendly[i] else RED
+        bullet_size = max(int(8 * perspective), 3)
+        pygame.draw.circle(screen, bullet_color, (screen_x, screen_y), bullet_size)
+        
+        # Bullet trail in slow motion
+        if world.slow_motion:
+            trail_length = 20
+            trail_angle = bullets.angle[i] - (world.player.angle + math.pi)
+            trail_x = screen_x - int(math.cos(trail_angle) * trail_length)
+            trail_y = screen_y - int(math.sin(trail_angle) * trail_length * 0.5)
+            pygame.draw.line(screen, bullet_color, (screen_x, screen_y), 
+                           (trail_x, trail_y), max(2, bullet_size // 2))
                 
-                # Bullet trail in slow motion
-                if self.slow_motion:
-                    trail_length = 20
-                    trail_angle = bullet.angle - cam_angle
-                    trail_x = screen_x - int(math.cos(trail_angle) * trail_length)
-                    trail_y = screen_y - int(math.sin(trail_angle) * trail_length * 0.5)
-                    pygame.draw.line(screen, bullet_color, (screen_x, screen_y), 
-                                   (trail_x, trail_y), max(2, bullet_size // 2))
-                
-    def draw_wall_3pv(self, wall):
+    def draw_wall_3pv(self, wall, screen_x, screen_y, perspective, distance):
         """Draw walls in third person perspective"""
-        # Calculate relative position from player
-        rel_x = wall.x - self.player.x
-        rel_y = wall.y - self.player.y
-        
-        cam_angle = self.player.angle + math.pi
-        rotated_x = rel_x * math.cos(-cam_angle) - rel_y * math.sin(-cam_angle)
-        rotated_y = rel_x * math.sin(-cam_angle) + rel_y * math.cos(-cam_angle)
-        
-        distance = math.sqrt(rel_x**2 + rel_y**2)
-        if distance > 0 and distance < 500:
-            perspective = 200 / (distance + 50)
-            screen_x = WIDTH // 2 + int(rotated_x * perspective)
-            screen_y = HEIGHT // 2 + int(rotated_y * perspective * 0.5)
-            
-            wall_width = int(wall.width * perspective)
-            wall_height = int(80 * perspective)
-            
-            if -100 < screen_x < WIDTH + 100:
-                # Add dramatic lighting to walls
-                base_gray = 50
-                light_amount = max(0, 100 - distance // 3)
-                wall_color = (base_gray + light_amount, base_gray + light_amount, base_gray + light_amount)
-                pygame.draw.rect(screen, wall_color, 
-                               (screen_x, screen_y - wall_height//2, wall_width, wall_height))
-                # Add edge highlight
-                pygame.draw.rect(screen, (100, 100, 100), 
-                               (screen_x, screen_y - wall_height//2, wall_width, wall_height), 2)
+        wall_width = int(wall.width * perspective)
+        wall_height = int(80 * perspective)
+        
+        # Add dramatic lighting to walls
+        base_gray = 50
+        light_amount = max(0, 100 - distance // 3)
+        wall_color = (base_gray + light_amount, base_gray + light_amount, base_gray + light_amount)
+        pygame.draw.rect(screen, wall_color, 
+                       (screen_x, screen_y - wall_height//2, wall_width, wall_height))
+        # Add edge highlight
+        pygame.draw.rect(screen, (100, 100, 100), 
+                       (screen_x, screen_y - wall_height//2, wall_width, wall_height), 2)
                 
-    def draw_enemy_3pv(self, enemy):
-        """Draw enemies in third person perspective"""
-        rel_x = enemy.x - self.player.x
-        rel_y = enemy.y - self.player.y
-        
-        cam_angle = self.player.angle + math.pi
-        rotated_x = rel_x * math.cos(-cam_angle) - rel_y * math.sin(-cam_angle)
-        rotated_y = rel_x * math.sin(-cam_angle) + rel_y * math.cos(-cam_angle)
-        
-        distance = math.sqrt(rel_x**2 + rel_y**2)
-        if distance > 0 and distance < 500:
-            perspective = 200 / (distance + 50)
-            screen_x = WIDTH // 2 + int(rotated_x * perspective)
-            screen_y = HEIGHT // 2 + int(rotated_y * perspective * 0.5)
-            
-            if -100 < screen_x < WIDTH + 100:
-                scale = perspective * 1.2
-                self.draw_human(screen, screen_x, screen_y, scale, RED)
+    def draw_enemy_3pv(self, world, i, screen_x, screen_y, perspective):
+        """Draw enemy i of the snapshot's enemies in third person perspective"""
+        scale = perspective * 1.2
+        self.draw_human(screen, screen_x, screen_y, scale, RED)
+        
+        # Health bar
+        bar_width = int(40 * scale)
+        bar_x = screen_x - bar_width // 2
+        bar_y = screen_y - int(40 * scale)
+        pygame.draw.rect(screen, BLACK, (bar_x, bar_y, bar_width, 5))
+        health_width = int(bar_width * (world.enemies.health[i] / world.enemies.max_health[i]))
+        pygame.draw.rect(screen, GREEN, (bar_x, bar_y, health_width, 5))
                 
-                # Health bar
-                bar_width = int(40 * scale)
-                bar_x = screen_x - bar_width // 2
-                bar_y = screen_y - int(40 * scale)
-                pygame.draw.rect(screen, BLACK, (bar_x, bar_y, bar_width, 5))
-                health_width = int(bar_width * (enemy.health / enemy.max_health))
-                pygame.draw.rect(screen, GREEN, (bar_x, bar_y, health_width, 5))
+    def draw_ally_3pv(self, ally, screen_x, screen_y, perspective):
+        """Draw another co-op player in third person perspective"""
+        scale = perspective * 1.2
+        self.draw_human(screen, screen_x, screen_y, scale, BLUE)
+        
+        # Health bar
+        bar_width = int(40 * scale)
+        bar_x = screen_x - bar_width // 2
+        bar_y = screen_y - int(40 * scale)
+        pygame.draw.rect(screen, BLACK, (bar_x, bar_y, bar_width, 5))
+        health_width = int(bar_width * (ally.health / ally.max_health))
+        pygame.draw.rect(screen, GREEN, (bar_x, bar_y, health_width, 5))
                 
-    def draw_hostage_3pv(self, hostage):
+    def draw_hostage_3pv(self, hostage, screen_x, screen_y, perspective):
         """Draw hostages in third person perspective"""
-        rel_x = hostage.x - self.player.x
-        rel_y = hostage.y - self.player.y
-        
-        cam_angle = self.player.angle + math.pi
-        rotated_x = rel_x * math.cos(-cam_angle) - rel_y * math.sin(-cam_angle)
-        rotated_y = rel_x * math.sin(-cam_angle) + rel_y * math.cos(-cam_angle)
+        scale = perspective * 1.2
+        self.draw_human(screen, screen_x, screen_y, scale, YELLOW)
         
-        distance = math.sqrt(rel_x**2 + rel_y**2)
-        if distance > 0 and distance < 500:
-            perspective = 200 / (distance + 50)
-            screen_x = WIDTH // 2 + int(rotated_x * perspective)
-            screen_y = HEIGHT // 2 + int(rotated_y * perspective * 0.5)
-            
-            if -100 < screen_x < WIDTH + 100:
-                scale = perspective * 1.2
-                self.draw_human(screen, screen_x, screen_y, scale, YELLOW)
+        text = text_cache.render("!", text_cache.quantize(40 * scale), WHITE)
+        screen.blit(text, (screen_x - 5, screen_y - int(50 * scale)))
                 
-                font = pygame.font.Font(None, int(40 * scale))
-                text = font.render("!", True, WHITE)
-                screen.blit(text, (screen_x - 5, screen_y - int(50 * scale)))
-                
-    def draw_bullet_fps(self, bullet):
-        """Draw bullets in 3D space"""
-        rel_x = bullet.x - self.player.x
-        rel_y = bullet.y - self.player.y
+    def draw_bullet_fps(self, i):
+        """Draw bullet i of the bullet store in 3D space"""
+        bullets = self.bullets
+        rel_x = bullets.x[i] - self.player.x
+        rel_y = bullets.y[i] - self.player.y
         
         rotated_x = rel_x * math.cos(-self.player.angle) - rel_y * math.sin(-self.player.angle)
         rotated_y = rel_x * math.sin(-self.player.angle) + rel_y * math.cos(-self.player.angle)
@@ -584,15 +713,15 @@ class Game:
             screen_y = HEIGHT // 2
             
             if -100 < screen_x < WIDTH + 100:
-                bullet_color = ORANGE if bullet.friendly else RED
+                bullet_color = ORANGE if bullets.friendly[i] else RED
                 bullet_size = int(8 * scale)
                 pygame.draw.circle(screen, bullet_color, (screen_x, screen_y), max(bullet_size, 2))
                 
                 # Bullet trail in slow motion
                 if self.slow_motion:
                     trail_length = 15
-                    trail_x = screen_x - int(math.cos(bullet.angle) * trail_length)
-                    trail_y = screen_y - int(math.sin(bullet.angle) * trail_length)
+                    trail_x = screen_x - int(math.cos(bullets.angle[i]) * trail_length)
+                    trail_y = screen_y - int(math.sin(bullets.angle[i]) * trail_length)
                     pygame.draw.line(screen, bullet_color, (screen_x, screen_y), 
                                    (trail_x, trail_y), max(2, bullet_size // 2))
                 
@@ -616,9 +745,10 @@ class Game:
                                (screen_x, screen_y - wall_height//2, 
                                 wall_width, wall_height))
                 
-    def draw_enemy_fps(self, enemy):
-        rel_x = enemy.x - self.player.x
-        rel_y = enemy.y - self.player.y
+    def draw_enemy_fps(self, i):
+        enemies = self.enemies
+        rel_x = enemies.x[i] - self.player.x
+        rel_y = enemies.y[i] - self.player.y
         
         rotated_x = rel_x * math.cos(-self.player.angle) - rel_y * math.sin(-self.player.angle)
         rotated_y = rel_x * math.sin(-self.player.angle) + rel_y * math.cos(-self.player.angle)
@@ -636,7 +766,7 @@ class Game:
                 bar_x = screen_x - bar_width // 2
                 bar_y = screen_y - int(40 * scale)
                 pygame.draw.rect(screen, BLACK, (bar_x, bar_y, bar_width, 5))
-                health_width = int(bar_width * (enemy.health / enemy.max_health))
+                health_width = int(bar_width * (enemies.health[i] / enemies.max_health[i]))
                 pygame.draw.rect(screen, GREEN, (bar_x, bar_y, health_width, 5))
                 
     def draw_hostage_fps(self, hostage):
@@ -654,13 +784,12 @@ class Game:
             if -100 < screen_x < WIDTH + 100:
                 self.draw_human(screen, screen_x, screen_y, scale, YELLOW)
                 
-                font = pygame.font.Font(None, int(40 * scale))
-                text = font.render("!", True, WHITE)
+                text = text_cache.render("!", text_cache.quantize(40 * scale), WHITE)
                 screen.blit(text, (screen_x - 5, screen_y - int(50 * scale)))
     
-    def draw_weapon(self):
+    def draw_weapon(self, world):
         """Draw the current weapon on screen"""
-        if self.player.weapon == "gun":
+        if world.player.weapon == "gun":
             # Draw gun
             gun_x = WIDTH - 150
             gun_y = HEIGHT - 100
@@ -679,7 +808,7 @@ class Game:
             ])
             pygame.draw.rect(screen, BROWN, (knife_x + 10, knife_y + 60, 20, 40))
     
-    def draw_hud(self):
+    def draw_hud(self, world):
         # Health bar
         bar_width = 300
         bar_height = 30
@@ -688,31 +817,28 @@ class Game:
         
         pygame.draw.rect(screen, BLACK, (bar_x - 2, bar_y - 2, bar_width + 4, bar_height + 4))
         pygame.draw.rect(screen, RED, (bar_x, bar_y, bar_width, bar_height))
-        health_width = int(bar_width * (self.player.health / self.player.max_health))
+        health_width = int(bar_width * (world.player.health / world.player.max_health))
         pygame.draw.rect(screen, GREEN, (bar_x, bar_y, health_width, bar_height))
         
-        font = pygame.font.Font(None, 28)
-        text = font.render(f"HP: {int(self.player.health)}/{self.player.max_health}", True, WHITE)
+        text = text_cache.render(f"HP: {int(world.player.health)}/{world.player.max_health}", 28, WHITE)
         screen.blit(text, (bar_x + bar_width // 2 - 50, bar_y + 5))
         
         # Mission info
-        font_large = pygame.font.Font(None, 32)
-        text = font_large.render(f"Hostages: {self.hostages_saved}/{len(self.hostages)}", True, WHITE)
+        text = text_cache.render(f"Hostages: {world.hostages_saved}/{len(world.hostages)}", 32, WHITE)
         screen.blit(text, (20, 20))
         
-        text = font_large.render(f"Enemies: {len(self.enemies)}", True, WHITE)
+        text = text_cache.render(f"Enemies: {len(world.enemies)}", 32, WHITE)
         screen.blit(text, (20, 55))
         
         # Weapon indicator
-        weapon_text = "GUN" if self.player.weapon == "gun" else "KNIFE"
-        weapon_color = BLUE if self.player.weapon == "gun" else ORANGE
-        text = font_large.render(f"Weapon: {weapon_text}", True, weapon_color)
+        weapon_text = "GUN" if world.player.weapon == "gun" else "KNIFE"
+        weapon_color = BLUE if world.player.weapon == "gun" else ORANGE
+        text = text_cache.render(f"Weapon: {weapon_text}", 32, weapon_color)
         screen.blit(text, (20, 90))
         
         # Slow motion indicator
-        if self.slow_motion:
-            font_huge = pygame.font.Font(None, 48)
-            text = font_huge.render("SLOW MOTION", True, (100, 200, 255))
+        if world.slow_motion:
+            text = text_cache.render("SLOW MOTION", 48, (100, 200, 255))
             screen.blit(text, (WIDTH // 2 - 150, 80))
         
         # Crosshair
@@ -725,141 +851,273 @@ class Game:
         pygame.draw.circle(screen, WHITE, (center_x, center_y), 5, 2)
         
         # Draw weapon model
-        self.draw_weapon()
-        
+        self.draw_weapon(world)
+        
+    def update_screen(self):
+        """Advance the death, timeskip or ending screen by one tick"""
+        if self.state == DEATH:
+            self.death_timer += 1
+        elif self.state == TIMESKIP:
+            self.timeskip_timer += 1
+            if self.timeskip_timer >= 200:
+                self.state = ENDING
+        elif self.state == ENDING:
+            self.ending_timer += 1
+            
+            # Head turn animation
+            if self.ending_timer > 180:
+                self.head_turn_angle = min(self.head_turn_angle + 1.5, 90)
+                
+    def begin_screen(self, paint_base):
+        """Put a static screen's base on the display once; returns the dirty rects for that"""
+        if self.screen_shown == self.state:
+            return []
+        self.screen_shown = self.state
+        self.screen_base = paint_base()
+        self.screen_parts = {}
+        return [screen.blit(self.screen_base, (0, 0))]
+    
+    def show_part(self, name, value, dirty, render=None, pos=(0, 0)):
+        """Swap one overlay of a static screen when value changes; None hides it
+
+        Only the old and new overlay rects are repainted and added to dirty.
+        """
+        old_value, old_rect = self.screen_parts.get(name, (None, None))
+        if value == old_value:
+            return
+        if old_rect:
+            dirty.append(screen.blit(self.screen_base, old_rect, old_rect))
+        rect = None
+        if value is not None:
+            rect = screen.blit(render(), pos)
+            dirty.append(rect)
+        self.screen_parts[name] = (value, rect)
+    
+    def paint_black(self):
+        base = pygame.Surface(screen.get_size()).convert()
+        base.fill(BLACK)
+        return base
+    
     def draw_death_screen(self):
-        screen.fill(BLACK)
-        self.death_timer += 1
+        """Draw the death screen; returns the rects that changed"""
+        dirty = self.begin_screen(self.paint_black)
         
+        # Only the title's fade-in changes from tick to tick
         alpha = min(255, self.death_timer * 3)
         
-        font_huge = pygame.font.Font(None, 96)
-        font_medium = pygame.font.Font(None, 42)
-        
-        if self.death_timer > 60:
-            text = font_huge.render("YOU DIED", True, RED)
+        def faded_title():
+            text = text_cache.render("YOU DIED", 96, RED).copy()
             text.set_alpha(alpha)
-            screen.blit(text, (WIDTH//2 - 180, HEIGHT//2 - 50))
+            return text
+        
+        self.show_part("title", alpha if self.death_timer > 60 else None, dirty,
+                       faded_title, (WIDTH//2 - 180, HEIGHT//2 - 50))
+        self.show_part("hint", True if self.death_timer > 120 else None, dirty,
+                       lambda: text_cache.render("Press R to Restart", 42, WHITE),
+                       (WIDTH//2 - 140, HEIGHT//2 + 50))
+        return dirty
             
-        if self.death_timer > 120:
-            text = font_medium.render("Press R to Restart", True, WHITE)
-            screen.blit(text, (WIDTH//2 - 140, HEIGHT//2 + 50))
+    def draw_mission(self, alpha=1.0, world=None):
+        """Draw a snapshot (by default the current state) alpha of the way into its last tick"""
+        if world is None:
+            world = self.snapshot()
+        self.draw_fps_view(world, alpha)
+        
+        with profiler.phase("hud"):
+            self.draw_hud(world)
             
-    def draw_mission(self):
-        self.draw_fps_view()
-        self.draw_hud()
-        
-        # Add vignette effect for drama
-        vignette = pygame.Surface((WIDTH, HEIGHT), pygame.SRCALPHA)
-        for i in range(150):
-            alpha = int((i / 150) * 80)
-            pygame.draw.rect(vignette, (0, 0, 0, alpha), (i, i, WIDTH - i*2, HEIGHT - i*2), 1)
-        screen.blit(vignette, (0, 0))
-        
-        # Controls hint
-        font_small = pygame.font.Font(None, 20)
-        text = font_small.render("WASD: Move | Mouse: Aim | Click: Shoot | Q: Switch Weapon", True, WHITE)
-        screen.blit(text, (WIDTH - 470, HEIGHT - 25))
+            # Add vignette effect for drama
+            screen.blit(layer_cache.get("vignette", screen.get_size(), None, paint_vignette), (0, 0))
+            
+            # Controls hint
+            text = text_cache.render("WASD: Move | Mouse: Aim | Click: Shoot | Q: Switch Weapon", 20, WHITE)
+            screen.blit(text, (WIDTH - 470, HEIGHT - 25))
         
     def draw_timeskip(self):
-        screen.fill(BLACK)
-        self.timeskip_timer += 1
-        
-        font_large = pygame.font.Font(None, 72)
-        font_medium = pygame.font.Font(None, 48)
-        
-        if self.timeskip_timer < 120:
-            text = font_large.render("MISSION COMPLETE", True, GREEN)
-            screen.blit(text, (WIDTH//2 - 280, HEIGHT//2 - 50))
-        elif self.timeskip_timer < 200:
-            text = font_medium.render("3 MONTHS LATER...", True, WHITE)
-            screen.blit(text, (WIDTH//2 - 200, HEIGHT//2))
-        else:
-            self.state = ENDING
+        """Draw the mission complete card; returns the rects that changed"""
+        dirty = self.begin_screen(self.paint_black)
+        
+        complete = self.timeskip_timer < 120
+        self.show_part("complete", True if complete else None, dirty,
+                       lambda: text_cache.render("MISSION COMPLETE", 72, GREEN),
+                       (WIDTH//2 - 280, HEIGHT//2 - 50))
+        self.show_part("later", None if complete else True, dirty,
+                       lambda: text_cache.render("3 MONTHS LATER...", 48, WHITE),
+                       (WIDTH//2 - 200, HEIGHT//2))
+        return dirty
             
-    def draw_ending(self):
-        screen.fill((135, 206, 235))
-        self.ending_timer += 1
+    def paint_ending(self):
+        base = pygame.Surface(screen.get_size()).convert()
+        base.fill((135, 206, 235))
         
-        # Draw celebrating crowd
+        # Draw celebrating crowd, dressed once per ending
         for i in range(20):
             x = 30 + i * 40
             y = 480
-            self.draw_human(screen, x, y, 0.8, 
-                          (random.randint(50, 200), random.randint(50, 200), random.randint(100, 255)))
+            self.draw_human(base, x, y, 0.8, 
+                          (self.render_rng.randint(50, 200), self.render_rng.randint(50, 200),
+                           self.render_rng.randint(100, 255)))
             
         # Draw hero in center
         hero_x, hero_y = WIDTH//2, 320
-        self.draw_human(screen, hero_x, hero_y, 2.5, BLUE)
+        self.draw_human(base, hero_x, hero_y, 2.5, BLUE)
+        return base
+    
+    def draw_ending(self):
+        """Draw the ending; returns the rects that changed"""
+        dirty = self.begin_screen(self.paint_ending)
         
-        # Head turn animation
-        if self.ending_timer > 180:
-            self.head_turn_angle = min(self.head_turn_angle + 1.5, 90)
-            
         # Text
-        font_huge = pygame.font.Font(None, 84)
-        font_large = pygame.font.Font(None, 52)
-        
-        if self.ending_timer < 120:
-            text = font_huge.render("HERO!", True, (255, 215, 0))
-            screen.blit(text, (WIDTH//2 - 100, 50))
+        intro = True if self.ending_timer < 120 else None
+        self.show_part("hero", intro, dirty,
+                       lambda: text_cache.render("HERO!", 84, (255, 215, 0)), (WIDTH//2 - 100, 50))
+        self.show_part("celebrate", intro, dirty,
+                       lambda: text_cache.render("The city celebrates you!", 52, BLACK),
+                       (WIDTH//2 - 220, 140))
+        
+        continued = self.ending_timer > 180 and self.head_turn_angle > 70
+        self.show_part("continued", True if continued else None, dirty,
+                       lambda: text_cache.render("TO BE CONTINUED...", 84, RED),
+                       (WIDTH//2 - 320, HEIGHT - 80))
+        return dirty
             
-            text = font_large.render("The city celebrates you!", True, BLACK)
-            screen.blit(text, (WIDTH//2 - 220, 140))
-            
-        if self.ending_timer > 180 and self.head_turn_angle > 70:
-            text = font_huge.render("TO BE CONTINUED...", True, RED)
-            screen.blit(text, (WIDTH//2 - 320, HEIGHT - 80))
-            
-    def restart(self):
-        self.__init__()
+    def restart(self, seed=None):
+        """Start the mission over, with a new seed if given"""
+        if seed is None or seed == self.seed:
+            restore_state(self, self.opening)
+            return
+        # Keep the already-loaded level; only the mission state is rebuilt
+        self.__init__(self.level, seed, len(self.players), self.view)
 
-def main():
-    game = Game()
+def main(level=None, seed=None, record=None, profile=None, render_thread=True, view=THIRD_PERSON):
+    started = time.perf_counter()
+    if profile:
+        profiler.enabled = True
+    with profiler.phase("open_window"):
+        init_display()
+    window_ms = (time.perf_counter() - started) * 1000
+    first_frame_ms = None
+    
+    if record and seed is None:
+        # A recording is only reproducible with a known seed
+        seed = random.randrange(2**31)
+    game = Game(level, seed, view=view)
+    recorder = InputRecorder(record, seed) if record else None
     running = True
-    mouse_click = False
     pygame.mouse.set_visible(False)
     pygame.event.set_grab(True)
     
     center_x, center_y = WIDTH // 2, HEIGHT // 2
     pygame.mouse.set_pos(center_x, center_y)
     
+    # Simulated time not yet consumed by ticks, and input gathered since the last tick
+    accumulator = 0.0
+    mouse_dx = 0
+    mouse_click = False
+    
+    # Mission frames are drawn from snapshots on a render thread while the next ticks run
+    renderer = RenderThread(lambda world, alpha: game.draw_mission(alpha, world), render_thread)
+    world = None
+    
     while running:
-        clock.tick(FPS)
-        mouse_dx = 0
-        mouse_click = False
+        # Static screens never need more frames than there are ticks
+        frame_seconds = clock.tick(FPS if game.state == MISSION else TICK_RATE) / 1000
         
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
                 running = False
+            if event.type == pygame.VIDEOEXPOSE:
+                # The window was uncovered; repaint static screens in full
+                game.screen_shown = None
             if event.type == pygame.MOUSEBUTTONDOWN and game.state == MISSION:
                 mouse_click = True
             if event.type == pygame.KEYDOWN:
                 if event.key == pygame.K_r and game.state == DEATH:
+                    # No mission frame is in flight on the death screen
                     game.restart()
+                    world = None
+                    accumulator = 0.0
+                    mouse_dx = 0
+                    mouse_click = False
+                    if recorder:
+                        recorder.mark_restart()
                 if event.key == pygame.K_ESCAPE:
                     running = False
+                if event.key == pygame.K_F3:
+                    profiler.toggle()
                 
         if game.state == MISSION:
             mouse_pos = pygame.mouse.get_pos()
-            mouse_dx = mouse_pos[0] - center_x
+            mouse_dx += mouse_pos[0] - center_x
             pygame.mouse.set_pos(center_x, center_y)
             
         keys = pygame.key.get_pressed()
         
+        # Run as many fixed ticks as real time (scaled down in slow motion) allows
+        slowed = game.state == MISSION and game.slow_motion
+        accumulator += frame_seconds * (SLOW_MOTION_SCALE if slowed else 1)
+        ticks = 0
+        while accumulator >= TICK_SECONDS and ticks < MAX_CATCH_UP_TICKS:
+            accumulator -= TICK_SECONDS
+            ticks += 1
+            if game.state == MISSION:
+                game.remember_positions()
+                if recorder:
+                    recorder.record(keys, mouse_dx, mouse_click)
+                game.handle_mission(keys, mouse_dx, mouse_click)
+                mouse_dx = 0
+                mouse_click = False
+            else:
+                game.update_screen()
+        if ticks == MAX_CATCH_UP_TICKS:
+            # Too far behind to catch up: drop the backlog instead of spiralling
+            accumulator %= TICK_SECONDS
+            
+        # Show the mission frame that was drawn while these ticks ran
+        if renderer.wait():
+            profiler.draw_overlay(screen)
+            with profiler.phase("flip"):
+                pygame.display.flip()
+            if first_frame_ms is None:
+                first_frame_ms = (time.perf_counter() - started) * 1000
+        
+        # Gameplay hands a full frame to the renderer; the other screens report what changed
         if game.state == MISSION:
-            game.handle_mission(keys, mouse_dx, mouse_click)
-            game.draw_mission()
-        elif game.state == DEATH:
-            game.draw_death_screen()
+            if world is None or ticks:
+                world = game.snapshot()
+            renderer.submit(world, accumulator / TICK_SECONDS)
+            continue
+        if game.state == DEATH:
+            dirty = game.draw_death_screen()
         elif game.state == TIMESKIP:
-            game.draw_timeskip()
-        elif game.state == ENDING:
-            game.draw_ending()
-            
-        pygame.display.flip()
-        
+            dirty = game.draw_timeskip()
+        else:
+            dirty = game.draw_ending()
+        if dirty:
+            with profiler.phase("flip"):
+                pygame.display.update(dirty)
+        
+    renderer.stop()
+    if recorder:
+        recorder.close()
+        print(f"Recorded {record} with seed {seed}")
+    if profile:
+        print(f"Startup: window open after {window_ms:.1f} ms, first frame after {first_frame_ms or 0:.1f} ms")
+        print(f"Wrote {profiler.export_trace(profile)} trace events to {profile}")
     pygame.quit()
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    # Only the command line needs argparse; importing Game stays cheap
+    import argparse
+    parser = argparse.ArgumentParser(description="Hero's Mission")
+    parser.add_argument("--level", help="level file to play instead of the built-in mission")
+    parser.add_argument("--seed", type=int, help="seed for the mission's randomness")
+    parser.add_argument("--record", help="record every mission tick's input to this file")
+    parser.add_argument("--profile", help="profile from the start and write a Chrome trace here on exit")
+    parser.add_argument("--no-render-thread", dest="render_thread", action="store_false",
+                        help="draw on the main thread between ticks")
+    parser.add_argument("--view", choices=VIEWS, default=THIRD_PERSON,
+                        help="third-person camera, or the first-person column raycaster")
+    args = parser.parse_args()
+    main(Level.load(args.level) if args.level else None, args.seed, args.record, args.profile,
+         args.render_thread, args.view)
\ No newline at end of file
@@ -0,0 +1 @@
+"""Benchmarks for the game's hot paths; run modules with python -m benchmarks.<name>"""
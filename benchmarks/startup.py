@@ -0,0 +1,73 @@
+"""Cold start cost: importing Game, and a fresh process up to its first mission frame
+
+Run from the repository root:
+
+    python -m benchmarks.startup
+    python -m benchmarks.startup --window   # real video driver instead of SDL's dummy one
+
+Every sample is a new Python process, so nothing is warm but the OS file
+cache. "import pygame" is the floor every entry point pays; "import Game"
+is the extra cost of the game module on top of it; "first frame" is the
+whole process from launch until the first mission frame is flipped.
+"""
+import argparse
+import os
+import subprocess
+import sys
+import time
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+IMPORT_GAME = """
+import time
+import pygame
+start = time.perf_counter()
+import Game
+print((time.perf_counter() - start) * 1000)
+"""
+
+FIRST_FRAME = """
+import pygame
+import Game
+Game.init_display()
+Game.Game().draw_mission()
+pygame.display.flip()
+pygame.quit()
+"""
+
+
+def run(code, env):
+    """Wall-clock ms for a fresh interpreter running code, and what it printed"""
+    start = time.perf_counter()
+    result = subprocess.run([sys.executable, "-c", code], cwd=ROOT, env=env, check=True,
+                            capture_output=True, text=True)
+    return (time.perf_counter() - start) * 1000, result.stdout
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=10, help="processes started per measurement")
+    parser.add_argument("--window", action="store_true", help="open a real window for the first frame")
+    args = parser.parse_args(argv)
+
+    env = dict(os.environ, PYGAME_HIDE_SUPPORT_PROMPT="1")
+    if not args.window:
+        env.setdefault("SDL_VIDEODRIVER", "dummy")
+        env.setdefault("SDL_AUDIODRIVER", "dummy")
+
+    # One untimed run to fill the file cache and write bytecode
+    run(FIRST_FRAME, env)
+    pygame_ms = [run("import pygame", env)[0] for _ in range(args.runs)]
+    game_ms = [float(run(IMPORT_GAME, env)[1]) for _ in range(args.runs)]
+    frame_ms = [run(FIRST_FRAME, env)[0] for _ in range(args.runs)]
+
+    print(f"{'measurement':<32} {'p50 ms':>8} {'min ms':>8}")
+    for name, samples in (("process + import pygame", pygame_ms), ("import Game (after pygame)", game_ms),
+                          ("process to first frame", frame_ms)):
+        print(f"{name:<32} {np.percentile(samples, 50):>8.1f} {min(samples):>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,227 @@
+"""Simulation and rendering benchmarks at scaled entity counts
+
+Run from the repository root:
+
+    python -m benchmarks.suite --out results.json
+    python -m benchmarks.suite --baseline results.json
+
+Each scenario builds a Game on a generated level with a given number of
+walls, enemies, bullets and hostages, then times handle_mission and
+draw_mission separately, tick by tick, under SDL's dummy video driver.
+The player cannot die and bullets are topped back up between ticks, so
+every timed tick sees the requested counts. Starting from the stock
+mission counts, one count is scaled at a time to give a scaling curve per
+entity type. A "stock mission" scenario also plays the built-in mission
+with the headless random pilot, so the default game, with its handful of
+enemies and bullets, is timed as shipped. --view raycast times the
+first-person raycaster instead of the third-person view. Results are
+written as JSON. With --baseline, p50 latencies are compared against an
+earlier run and any scenario that slowed down by more than --threshold
+percent is reported as a regression.
+"""
+import os
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+import argparse
+import json
+import platform
+import random
+import sys
+import time
+
+import numpy as np
+import pygame
+
+import Game
+from headless import RandomPilot
+from level import Level
+from replay import KeyState
+
+BASE = {"walls": 4, "enemies": 5, "bullets": 0, "hostages": 3}
+CURVES = {
+    "walls": [4, 64, 256, 1024],
+    "enemies": [5, 50, 500, 2000],
+    "bullets": [0, 100, 1000, 10000],
+    "hostages": [3, 30, 300],
+}
+QUICK_CURVES = {name: counts[:3] for name, counts in CURVES.items()}
+PLAYER_SPAWN = (100, 300)
+STOCK = "stock mission"
+
+
+def build_level(walls, enemies, hostages, rng):
+    rects = []
+    while len(rects) < walls:
+        if rng.random() < 0.5:
+            rect = pygame.Rect(rng.randrange(Game.WIDTH), rng.randrange(Game.HEIGHT), 20, rng.randint(30, 150))
+        else:
+            rect = pygame.Rect(rng.randrange(Game.WIDTH), rng.randrange(Game.HEIGHT), rng.randint(30, 150), 20)
+        # Keep the player's spawn clear so it can still move
+        if not rect.inflate(60, 60).collidepoint(PLAYER_SPAWN):
+            rects.append(rect)
+    enemy_spawns = [(rng.uniform(300, Game.WIDTH), rng.uniform(0, Game.HEIGHT)) for _ in range(enemies)]
+    hostage_spawns = [(rng.uniform(300, Game.WIDTH), rng.uniform(0, Game.HEIGHT)) for _ in range(hostages)]
+    return Level.build((Game.WIDTH, Game.HEIGHT), rects, PLAYER_SPAWN, enemy_spawns, hostage_spawns)
+
+
+def top_up_bullets(game, target, rng):
+    missing = target - len(game.bullets)
+    if missing > 0:
+        xs = np.array([rng.uniform(0, Game.WIDTH) for _ in range(missing)])
+        ys = np.array([rng.uniform(0, Game.HEIGHT) for _ in range(missing)])
+        angles = np.array([rng.uniform(-np.pi, np.pi) for _ in range(missing)])
+        game.bullets.spawn_many(xs, ys, angles, friendly=False)
+
+
+def percentiles(samples):
+    ms = np.array(samples) * 1000
+    return {
+        "mean": float(ms.mean()),
+        "p50": float(np.percentile(ms, 50)),
+        "p90": float(np.percentile(ms, 90)),
+        "p99": float(np.percentile(ms, 99)),
+    }
+
+
+def run_scenario(counts, ticks, seed, warmup=10, view=Game.THIRD_PERSON):
+    rng = random.Random(seed)
+    game = Game.Game(build_level(counts["walls"], counts["enemies"], counts["hostages"], rng), seed, view=view)
+    game.player.health = game.player.max_health = 10**9
+
+    pilot = random.Random(seed)
+    keys = KeyState()
+    sim = []
+    draw = []
+    for tick in range(warmup + ticks):
+        top_up_bullets(game, counts["bullets"], rng)
+        mouse_dx = pilot.randint(-20, 20)
+
+        start = time.perf_counter()
+        game.handle_mission(keys, mouse_dx, False)
+        mid = time.perf_counter()
+        game.draw_mission()
+        end = time.perf_counter()
+
+        if tick >= warmup:
+            sim.append(mid - start)
+            draw.append(end - mid)
+    return {"counts": counts, "sim": percentiles(sim), "draw": percentiles(draw)}
+
+
+def run_stock(ticks, seed, warmup=10, view=Game.THIRD_PERSON):
+    """Time the built-in mission under the headless pilot, restarting after each outcome"""
+    game = Game.Game(seed=seed, view=view)
+    pilot = RandomPilot(seed)
+    sim = []
+    draw = []
+    for tick in range(warmup + ticks):
+        if game.state != Game.MISSION:
+            game.restart()
+        keys, mouse_dx, mouse_click = pilot(tick)
+
+        start = time.perf_counter()
+        game.handle_mission(keys, mouse_dx, mouse_click)
+        mid = time.perf_counter()
+        game.draw_mission()
+        end = time.perf_counter()
+
+        if tick >= warmup:
+            sim.append(mid - start)
+            draw.append(end - mid)
+    counts = {"walls": len(game.wall_grid), "enemies": len(game.level.enemy_spawns),
+              "bullets": None, "hostages": len(game.hostages)}
+    return {"counts": counts, "sim": percentiles(sim), "draw": percentiles(draw)}
+
+
+def scenarios(curves):
+    seen = set()
+    for name, values in curves.items():
+        for value in values:
+            counts = dict(BASE, **{name: value})
+            key = ",".join(f"{k}={counts[k]}" for k in BASE)
+            if key not in seen:
+                seen.add(key)
+                yield name, key, counts
+
+
+def compare(results, baseline, threshold):
+    """Print p50 changes against a baseline; returns the regressed (scenario, phase) pairs"""
+    regressions = []
+    print(f"\n{'scenario':<44} {'phase':<5} {'base p50':>9} {'now p50':>9} {'change':>8}")
+    for key, result in results["scenarios"].items():
+        base = baseline.get("scenarios", {}).get(key)
+        if base is None:
+            continue
+        for phase in ("sim", "draw"):
+            before = base[phase]["p50"]
+            after = result[phase]["p50"]
+            change = (after - before) / before * 100 if before else 0.0
+            flag = ""
+            if change > threshold:
+                flag = "  REGRESSION"
+                regressions.append((key, phase))
+            print(f"{key:<44} {phase:<5} {before:>9.3f} {after:>9.3f} {change:>+7.1f}%{flag}")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--ticks", type=int, default=120, help="timed ticks per scenario")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--quick", action="store_true", help="skip the largest count of each curve")
+    parser.add_argument("--view", choices=Game.VIEWS, default=Game.THIRD_PERSON, help="mission view to draw")
+    parser.add_argument("--out", help="write results to this JSON file")
+    parser.add_argument("--baseline", help="compare against a JSON file from an earlier run")
+    parser.add_argument("--threshold", type=float, default=10.0,
+                        help="percent p50 slowdown that counts as a regression")
+    args = parser.parse_args(argv)
+    Game.init_display()
+
+    results = {
+        "meta": {
+            "ticks": args.ticks,
+            "seed": args.seed,
+            "view": args.view,
+            "python": platform.python_version(),
+            "pygame": pygame.version.ver,
+            "numpy": np.__version__,
+            "machine": platform.machine(),
+        },
+        "curves": {},
+        "scenarios": {},
+    }
+
+    print(f"{'scenario':<44} {'sim p50':>8} {'sim p99':>8} {'draw p50':>9} {'draw p99':>9}  (ms)")
+    result = run_stock(args.ticks, args.seed, view=args.view)
+    results["scenarios"][STOCK] = result
+    print(f"{STOCK:<44} {result['sim']['p50']:>8.3f} {result['sim']['p99']:>8.3f} "
+          f"{result['draw']['p50']:>9.3f} {result['draw']['p99']:>9.3f}")
+    for name, key, counts in scenarios(QUICK_CURVES if args.quick else CURVES):
+        result = run_scenario(counts, args.ticks, args.seed, view=args.view)
+        results["scenarios"][key] = result
+        results["curves"].setdefault(name, []).append(
+            {"count": counts[name], "sim_p50": result["sim"]["p50"], "draw_p50": result["draw"]["p50"]})
+        print(f"{key:<44} {result['sim']['p50']:>8.3f} {result['sim']['p99']:>8.3f} "
+              f"{result['draw']['p50']:>9.3f} {result['draw']['p99']:>9.3f}")
+
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"\nWrote {args.out}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(results, json.load(f), args.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} regression(s) over {args.threshold:g}%")
+            pygame.quit()
+            sys.exit(1)
+
+    pygame.quit()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""Wall collision cost vs wall count: brute-force rect scan against the WallGrid
+
+Run from the repository root:
+
+    python -m benchmarks.wall_collision
+
+Walls are scattered at a constant density, so the map grows with the wall
+count. The brute-force columns grow linearly with walls; the grid columns
+should stay roughly flat.
+"""
+import argparse
+import random
+import time
+
+import numpy as np
+import pygame
+
+from spatial import WallGrid
+
+DENSITY = 1 / 20000  # walls per square pixel, about the density of the mission map
+
+
+def make_walls(count, rng):
+    side = int((count / DENSITY) ** 0.5)
+    walls = []
+    for _ in range(count):
+        if rng.random() < 0.5:
+            walls.append(pygame.Rect(rng.randrange(side), rng.randrange(side), 20, rng.randint(50, 300)))
+        else:
+            walls.append(pygame.Rect(rng.randrange(side), rng.randrange(side), rng.randint(50, 300), 20))
+    return walls, side
+
+
+def brute_movers(walls, points):
+    hits = 0
+    for x, y in points:
+        rect = pygame.Rect(x - 15, y - 15, 30, 30)
+        for wall in walls:
+            if rect.colliderect(wall):
+                hits += 1
+                break
+    return hits
+
+
+def grid_movers(grid, points):
+    return sum(grid.hits_box(x, y, 15) for x, y in points)
+
+
+def brute_bullets(boxes, xs, ys):
+    hit = ((xs[:, None] - 3 < boxes[None, :, 2]) & (xs[:, None] + 3 > boxes[None, :, 0]) &
+           (ys[:, None] - 3 < boxes[None, :, 3]) & (ys[:, None] + 3 > boxes[None, :, 1]))
+    return hit.any(axis=1)
+
+
+def timed(fn, *args, repeat=5):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(*args)
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--walls", type=int, nargs="+", default=[10, 100, 1000, 4000])
+    parser.add_argument("--movers", type=int, default=200)
+    parser.add_argument("--bullets", type=int, default=5000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    print(f"{args.movers} movers, {args.bullets} bullets; best of 5, ms per tick")
+    print(f"{'walls':>6} {'build':>8} {'movers brute':>13} {'movers grid':>12} "
+          f"{'bullets brute':>14} {'bullets grid':>13}")
+    for count in args.walls:
+        rng = random.Random(args.seed)
+        walls, side = make_walls(count, rng)
+        points = [(rng.randrange(side), rng.randrange(side)) for _ in range(args.movers)]
+        xs = np.array([rng.uniform(0, side) for _ in range(args.bullets)])
+        ys = np.array([rng.uniform(0, side) for _ in range(args.bullets)])
+
+        start = time.perf_counter()
+        grid = WallGrid(walls)
+        build = (time.perf_counter() - start) * 1000
+
+        assert brute_movers(walls, points) == grid_movers(grid, points)
+        assert (brute_bullets(grid.boxes, xs, ys) == grid.hits_boxes(xs, ys, 3)).all()
+
+        print(f"{count:>6} {build:>8.2f} {timed(brute_movers, walls, points):>13.3f} "
+              f"{timed(grid_movers, grid, points):>12.3f} "
+              f"{timed(brute_bullets, grid.boxes, xs, ys):>14.3f} "
+              f"{timed(grid.hits_boxes, xs, ys, 3):>13.3f}")
+
+
+if __name__ == "__main__":
+    main()
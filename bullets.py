@@ -0,0 +1,233 @@
+"""Structure-of-arrays bullet storage with vectorized movement and collision"""
+import math
+
+import numpy as np
+
+from spatial import SCALAR_BATCH, segment_circle_entry
+
+BULLET_SPEED = 12
+BULLET_HALF_SIZE = 3
+
+
+class BulletStore:
+    """All bullets as parallel NumPy arrays; live bullets occupy slots [0, count)"""
+    FIELDS = ("x", "y", "angle", "speed", "friendly", "active", "vx", "vy", "travel")
+
+    def __init__(self, capacity=256):
+        self.count = 0
+        self.x = np.zeros(capacity)
+        self.y = np.zeros(capacity)
+        self.angle = np.zeros(capacity)
+        self.speed = np.zeros(capacity)
+        self.friendly = np.zeros(capacity, dtype=bool)
+        self.active = np.zeros(capacity, dtype=bool)
+        # Per-tick displacement, cached so trig only runs once per bullet
+        self.vx = np.zeros(capacity)
+        self.vy = np.zeros(capacity)
+        # Fraction of the last step flown before striking a wall; 1 while still flying
+        self.travel = np.ones(capacity)
+
+    def __len__(self):
+        return self.count
+
+    def _grow(self, needed):
+        capacity = len(self.x)
+        while capacity < needed:
+            capacity *= 2
+        for name in self.FIELDS:
+            old = getattr(self, name)
+            new = np.zeros(capacity, dtype=old.dtype)
+            new[:self.count] = old[:self.count]
+            setattr(self, name, new)
+
+    def spawn(self, x, y, angle, friendly=True, speed=BULLET_SPEED):
+        if self.count == len(self.x):
+            self._grow(self.count + 1)
+        i = self.count
+        self.x[i] = x
+        self.y[i] = y
+        self.angle[i] = angle
+        self.speed[i] = speed
+        self.friendly[i] = friendly
+        self.active[i] = True
+        self.vx[i] = np.cos(angle) * speed
+        self.vy[i] = np.sin(angle) * speed
+        self.travel[i] = 1.0
+        self.count += 1
+
+    def spawn_many(self, xs, ys, angles, friendly=True, speed=BULLET_SPEED):
+        """Append a batch of bullets in one vectorized write"""
+        k = len(xs)
+        if self.count + k > len(self.x):
+            self._grow(self.count + k)
+        s = slice(self.count, self.count + k)
+        self.x[s] = xs
+        self.y[s] = ys
+        self.angle[s] = angles
+        self.speed[s] = speed
+        self.friendly[s] = friendly
+        self.active[s] = True
+        self.vx[s] = np.cos(angles) * speed
+        self.vy[s] = np.sin(angles) * speed
+        self.travel[s] = 1.0
+        self.count += k
+
+    def clear(self):
+        self.count = 0
+
+    def update(self, walls, bounds):
+        """Move every bullet one tick, stopping at the first wall along its path
+
+        walls is a spatial.WallGrid and bounds is (left, top, right, bottom) of
+        the playable area plus margin; bullets leaving it are deactivated.
+        Bullets that strike a wall stop at the point of impact with travel < 1.
+        They can still hit targets on the way there in collide, and compact
+        drops them.
+        """
+        n = self.count
+        if n == 0:
+            return
+        if n <= SCALAR_BATCH:
+            self._update_scalar(walls, bounds)
+            return
+        x = self.x[:n]
+        y = self.y[:n]
+        vx = self.vx[:n]
+        vy = self.vy[:n]
+        travel = self.travel[:n]
+        np.minimum(walls.sweep_boxes(x, y, x + vx, y + vy, BULLET_HALF_SIZE), 1.0, out=travel)
+        x += vx * travel
+        y += vy * travel
+
+        left, top, right, bottom = bounds
+        self.active[:n] &= (x >= left) & (x <= right) & (y >= top) & (y <= bottom)
+
+    def _update_scalar(self, walls, bounds):
+        """update one bullet at a time, cheaper for a handful than NumPy's per-call overhead"""
+        n = self.count
+        left, top, right, bottom = bounds
+        xs = self.x[:n].tolist()
+        ys = self.y[:n].tolist()
+        active = self.active[:n].tolist()
+        travels = []
+        for i, (vx, vy) in enumerate(zip(self.vx[:n].tolist(), self.vy[:n].tolist())):
+            x = xs[i]
+            y = ys[i]
+            travel = min(walls.sweep_box(x, y, x + vx, y + vy, BULLET_HALF_SIZE), 1.0)
+            x += vx * travel
+            y += vy * travel
+            xs[i] = x
+            ys[i] = y
+            travels.append(travel)
+            active[i] = active[i] and left <= x <= right and top <= y <= bottom
+        self.x[:n] = xs
+        self.y[:n] = ys
+        self.travel[:n] = travels
+        self.active[:n] = active
+
+    def collide(self, target_x, target_y, radius, friendly):
+        """Deactivate bullets of one side whose path in the last step came within radius of a target
+
+        Returns the index of the target each of those bullets reached first
+        along its path, so callers can tally damage with np.bincount.
+        """
+        n = self.count
+        if n == 0 or len(target_x) == 0:
+            return np.empty(0, dtype=np.intp)
+        if n <= SCALAR_BATCH and len(target_x) <= SCALAR_BATCH:
+            return self._collide_scalar(target_x, target_y, radius, friendly)
+        candidates = np.flatnonzero(self.active[:n] & (self.friendly[:n] == friendly))
+        if candidates.size == 0:
+            return np.empty(0, dtype=np.intp)
+
+        target_x = np.asarray(target_x, dtype=float)
+        target_y = np.asarray(target_y, dtype=float)
+        x = self.x[candidates]
+        y = self.y[candidates]
+        # Broadphase: a path can only have met targets within radius plus one full step of where it ended
+        reach = radius + self.speed[candidates].max()
+        dx = x[:, None] - target_x
+        dy = y[:, None] - target_y
+        rows, cols = np.nonzero(dx * dx + dy * dy < reach * reach)
+        if not len(rows):
+            return np.empty(0, dtype=np.intp)
+
+        bullets = candidates[rows]
+        travel = self.travel[bullets]
+        entry = segment_circle_entry(x[rows] - self.vx[bullets] * travel, y[rows] - self.vy[bullets] * travel,
+                                     x[rows], y[rows], target_x[cols], target_y[cols], radius)
+        met = np.isfinite(entry)
+        bullets, cols, entry = bullets[met], cols[met], entry[met]
+        # Earliest contact per bullet; ties go to the lower target index
+        order = np.lexsort((cols, entry, bullets))
+        bullets, first = np.unique(bullets[order], return_index=True)
+        self.active[bullets] = False
+        return cols[order][first]
+
+    def _collide_scalar(self, target_x, target_y, radius, friendly):
+        """collide for a handful of bullets and targets, with the same arithmetic as segment_circle_entry"""
+        n = self.count
+        candidates = [i for i, (active, side) in
+                      enumerate(zip(self.active[:n].tolist(), self.friendly[:n].tolist()))
+                      if active and side == friendly]
+        if not candidates:
+            return np.empty(0, dtype=np.intp)
+        targets = list(zip(np.asarray(target_x, dtype=float).tolist(),
+                           np.asarray(target_y, dtype=float).tolist()))
+        xs = self.x[:n].tolist()
+        ys = self.y[:n].tolist()
+        vxs = self.vx[:n].tolist()
+        vys = self.vy[:n].tolist()
+        travels = self.travel[:n].tolist()
+        speeds = self.speed[:n].tolist()
+        reach = radius + max(speeds[i] for i in candidates)
+        hits = []
+        for i in candidates:
+            x2 = xs[i]
+            y2 = ys[i]
+            x1 = x2 - vxs[i] * travels[i]
+            y1 = y2 - vys[i] * travels[i]
+            dx = x2 - x1
+            dy = y2 - y1
+            a = dx * dx + dy * dy
+            first = math.inf
+            hit = None
+            for col, (cx, cy) in enumerate(targets):
+                # Same broadphase as the vectorized path, then the circle entry test
+                if not (x2 - cx) * (x2 - cx) + (y2 - cy) * (y2 - cy) < reach * reach:
+                    continue
+                fx = x1 - cx
+                fy = y1 - cy
+                b = fx * dx + fy * dy
+                c = fx * fx + fy * fy - radius * radius
+                if c < 0:
+                    t = 0.0
+                else:
+                    disc = b * b - a * c
+                    if not disc > 0:
+                        continue
+                    t = (-b - math.sqrt(disc)) / a
+                    if not 0 <= t < 1:
+                        continue
+                if t < first:
+                    first = t
+                    hit = col
+            if hit is not None:
+                self.active[i] = False
+                hits.append(hit)
+        return np.array(hits, dtype=np.intp)
+
+    def compact(self):
+        """Pack live bullets to the front of the arrays in one pass"""
+        n = self.count
+        if n <= SCALAR_BATCH and all(active and travel >= 1 for active, travel in
+                                     zip(self.active[:n].tolist(), self.travel[:n].tolist())):
+            return
+        keep = self.active[:n] & (self.travel[:n] >= 1)
+        live = int(keep.sum())
+        if live == n:
+            return
+        for name in self.FIELDS:
+            arr = getattr(self, name)
+            arr[:live] = arr[:n][keep]
+        self.count = live
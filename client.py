@@ -0,0 +1,212 @@
+"""Co-op client: sends input to a server.py and draws the snapshots it gets back
+
+    python client.py --host 127.0.0.1
+    python client.py --bots 32 --seconds 30
+
+With --bots, no window is opened: N scripted clients (headless.RandomPilot)
+join from this process and report the bandwidth and snapshot rates they
+saw, for load-testing a server on one machine.
+"""
+import argparse
+import socket
+import time
+from collections import OrderedDict
+
+import pygame
+
+import Game
+import netcode
+
+# Decoded snapshots kept as delta bases; more than the server's history
+RECEIVED_HISTORY = 128
+
+
+class GameClient:
+    """One UDP connection to a GameServer"""
+    def __init__(self, host="127.0.0.1", port=netcode.DEFAULT_PORT, timeout=5.0):
+        self.address = (host, port)
+        self.socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.socket.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 1 << 20)
+        self.socket.connect(self.address)
+        self.socket.setblocking(False)
+        self.slot = None
+        self.seed = None
+        self.input_sequence = 0
+        self.received = OrderedDict()
+        self.latest = None
+        self.snapshots = 0
+        self.deltas = 0
+        self.dropped = 0
+        self.bytes = 0
+        self.connect(timeout)
+
+    def connect(self, timeout):
+        """HELLO until the server answers; raises ConnectionError if it is full or silent"""
+        deadline = time.perf_counter() + timeout
+        while time.perf_counter() < deadline:
+            self.socket.send(netcode.PACKET_TYPE.pack(netcode.HELLO))
+            answer_by = time.perf_counter() + 0.25
+            while time.perf_counter() < answer_by:
+                try:
+                    data = self.socket.recv(65536)
+                except (BlockingIOError, ConnectionRefusedError):
+                    time.sleep(0.005)
+                    continue
+                if data[0] != netcode.WELCOME:
+                    continue
+                _, slot, self.seed = netcode.WELCOME_PACKET.unpack(data)
+                if slot < 0:
+                    raise ConnectionError(f"server {self.address} is full")
+                self.slot = slot
+                return
+        raise ConnectionError(f"no answer from {self.address}")
+
+    def ack(self):
+        return self.latest[0]["sequence"] if self.latest else netcode.NO_BASE
+
+    def send_input(self, keys, mouse_dx=0, mouse_click=False):
+        self.input_sequence += 1
+        try:
+            self.socket.send(netcode.encode_input(self.input_sequence, self.ack(), keys, mouse_dx,
+                                                  mouse_click))
+        except (BlockingIOError, ConnectionRefusedError):
+            pass
+
+    def poll(self):
+        """Decode every waiting snapshot; returns how many were new"""
+        new = 0
+        while True:
+            try:
+                data = self.socket.recv(65536)
+            except (BlockingIOError, ConnectionRefusedError):
+                return new
+            self.bytes += len(data)
+            if data[0] != netcode.SNAPSHOT:
+                continue
+            decoded = netcode.decode_snapshot(data, self.received)
+            if decoded is None:
+                # Its base fell out of our history; the server resends in full once the ack moves on
+                self.dropped += 1
+                continue
+            header, tables = decoded
+            if self.latest and header["sequence"] <= self.latest[0]["sequence"]:
+                continue
+            self.received[header["sequence"]] = tables
+            while len(self.received) > RECEIVED_HISTORY:
+                self.received.popitem(last=False)
+            self.latest = decoded
+            self.snapshots += 1
+            self.deltas += header["base"] is not None
+            new += 1
+
+    def world(self):
+        """WorldSnapshot of the newest server state, or None before the first snapshot"""
+        if self.latest is None:
+            return None
+        return netcode.to_world(*self.latest)
+
+    def close(self):
+        try:
+            self.socket.send(netcode.PACKET_TYPE.pack(netcode.BYE))
+        except OSError:
+            pass
+        self.socket.close()
+
+
+def run_bots(host, port, bots, seconds, seed):
+    """Drive `bots` scripted clients at TICK_RATE and print what they received"""
+    from headless import RandomPilot
+
+    clients = []
+    for i in range(bots):
+        try:
+            clients.append((GameClient(host, port), RandomPilot(seed + i)))
+        except ConnectionError as error:
+            print(f"bot {i}: {error}")
+            break
+
+    start = next_frame = time.perf_counter()
+    frame = 0
+    while time.perf_counter() - start < seconds:
+        for client, pilot in clients:
+            client.poll()
+            client.send_input(*pilot(frame))
+        frame += 1
+        next_frame += Game.TICK_SECONDS
+        time.sleep(max(0.0, next_frame - time.perf_counter()))
+    elapsed = time.perf_counter() - start
+
+    for client, _ in clients:
+        client.poll()
+        client.close()
+    if not clients:
+        return
+    snapshots = sum(c.snapshots for c, _ in clients)
+    deltas = sum(c.deltas for c, _ in clients)
+    received = sum(c.bytes for c, _ in clients)
+    dropped = sum(c.dropped for c, _ in clients)
+    print(f"{len(clients)} bots for {elapsed:.1f}s: {snapshots / elapsed / len(clients):.1f} snapshots/sec each, "
+          f"{received / 1024 / elapsed:.1f} KB/s total ({received / 1024 / elapsed / len(clients):.2f} per bot), "
+          f"{received / max(snapshots, 1):.0f}B per snapshot, {deltas / max(snapshots, 1):.0%} deltas, "
+          f"{dropped} undecodable")
+
+
+def play(host, port, level):
+    """Open a window and play as one slot of the server's mission"""
+    client = GameClient(host, port)
+    Game.init_display()
+    game = Game.Game(level, client.seed)
+    pygame.mouse.set_visible(False)
+    pygame.event.set_grab(True)
+    center_x, center_y = Game.WIDTH // 2, Game.HEIGHT // 2
+    pygame.mouse.set_pos(center_x, center_y)
+
+    running = True
+    while running:
+        Game.clock.tick(Game.TICK_RATE)
+        mouse_click = False
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                running = False
+            if event.type == pygame.MOUSEBUTTONDOWN:
+                mouse_click = True
+            if event.type == pygame.KEYDOWN and event.key == pygame.K_ESCAPE:
+                running = False
+        mouse_dx = pygame.mouse.get_pos()[0] - center_x
+        pygame.mouse.set_pos(center_x, center_y)
+        client.send_input(pygame.key.get_pressed(), mouse_dx, mouse_click)
+
+        client.poll()
+        world = client.world()
+        if world is None:
+            continue
+        game.draw_mission(world=world)
+        if world.state != Game.MISSION:
+            text = Game.text_cache.render(f"{world.state.upper()} - waiting for the server to restart",
+                                          36, Game.WHITE)
+            Game.screen.blit(text, (Game.WIDTH // 2 - text.get_width() // 2, Game.HEIGHT // 2))
+        pygame.display.flip()
+
+    client.close()
+    pygame.quit()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Join a co-op mission hosted by server.py")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=netcode.DEFAULT_PORT)
+    parser.add_argument("--level", help="the level file the server is hosting, if not the built-in one")
+    parser.add_argument("--bots", type=int, help="run this many headless scripted clients instead of a window")
+    parser.add_argument("--seconds", type=float, default=30, help="how long the bots play")
+    parser.add_argument("--seed", type=int, default=0, help="seed for the bots' input scripts")
+    args = parser.parse_args(argv)
+
+    if args.bots:
+        run_bots(args.host, args.port, args.bots, args.seconds, args.seed)
+        return
+    from level import Level
+    play(args.host, args.port, Level.load(args.level) if args.level else None)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,191 @@
+"""Array-backed enemy pool with batched steering, wall resolution and shooting timers"""
+import numpy as np
+
+from spatial import SCALAR_BATCH
+
+ENEMY_HEALTH = 60
+ENEMY_SPEED = 1.2
+ENEMY_SHOOT_COOLDOWN = 90
+ENEMY_HALF_SIZE = 15
+# Enemies stop closing in once they are this near the player
+ENEMY_KEEP_DISTANCE = 200
+
+
+class EnemyPool:
+    """All enemies as parallel NumPy arrays; live enemies occupy slots [0, count)
+
+    ids are unique per spawn and survive compaction, so they can key caches
+    across removals where slot indices cannot.
+    """
+    FIELDS = ("ids", "x", "y", "health", "max_health", "speed", "shoot_timer", "shoot_cooldown")
+
+    def __init__(self, capacity=16):
+        self.count = 0
+        self.next_id = 0
+        self.ids = np.zeros(capacity, dtype=np.int64)
+        self.x = np.zeros(capacity)
+        self.y = np.zeros(capacity)
+        self.health = np.zeros(capacity)
+        self.max_health = np.zeros(capacity)
+        self.speed = np.zeros(capacity)
+        self.shoot_timer = np.zeros(capacity, dtype=np.int64)
+        self.shoot_cooldown = np.zeros(capacity, dtype=np.int64)
+
+    @classmethod
+    def from_spawns(cls, spawns):
+        pool = cls(max(len(spawns), 1))
+        for x, y in spawns:
+            pool.spawn(x, y)
+        return pool
+
+    def __len__(self):
+        return self.count
+
+    def _grow(self, needed):
+        capacity = len(self.x)
+        while capacity < needed:
+            capacity *= 2
+        for name in self.FIELDS:
+            old = getattr(self, name)
+            new = np.zeros(capacity, dtype=old.dtype)
+            new[:self.count] = old[:self.count]
+            setattr(self, name, new)
+
+    def spawn(self, x, y, health=ENEMY_HEALTH, speed=ENEMY_SPEED, shoot_cooldown=ENEMY_SHOOT_COOLDOWN):
+        if self.count == len(self.x):
+            self._grow(self.count + 1)
+        i = self.count
+        self.ids[i] = self.next_id
+        self.x[i] = x
+        self.y[i] = y
+        self.health[i] = health
+        self.max_health[i] = health
+        self.speed[i] = speed
+        self.shoot_timer[i] = 0
+        self.shoot_cooldown[i] = shoot_cooldown
+        self.next_id += 1
+        self.count += 1
+
+    def update(self, player_x, player_y, walls, flow=None):
+        """Steer every enemy toward the player, undo moves into walls and tick timers
+
+        With a navigation.FlowField, enemies follow the shared path around
+        walls instead of heading straight at the player. player_x and
+        player_y may also be per-enemy arrays, giving each enemy its own
+        target. Returns the indices of enemies whose shoot timer has run past
+        their cooldown and are ready to fire.
+        """
+        n = self.count
+        if n <= SCALAR_BATCH:
+            return self._update_scalar(player_x, player_y, walls, flow)
+        x = self.x[:n]
+        y = self.y[:n]
+        dx = player_x - x
+        dy = player_y - y
+        dist = np.hypot(dx, dy)
+
+        moving = np.flatnonzero(dist > ENEMY_KEEP_DISTANCE)
+        if len(moving):
+            old_x = x[moving]
+            old_y = y[moving]
+            move_x = dx[moving]
+            move_y = dy[moving]
+            length = dist[moving]
+            if flow is not None:
+                goal_x = player_x[moving] if np.ndim(player_x) else player_x
+                goal_y = player_y[moving] if np.ndim(player_y) else player_y
+                target_x, target_y = flow.steer_targets(old_x, old_y, goal_x, goal_y)
+                path_x = target_x - old_x
+                path_y = target_y - old_y
+                path_length = np.hypot(path_x, path_y)
+                # Sitting exactly on a waypoint: keep the straight-line heading this tick
+                on_path = path_length > 1e-6
+                move_x = np.where(on_path, path_x, move_x)
+                move_y = np.where(on_path, path_y, move_y)
+                length = np.where(on_path, path_length, length)
+
+            step = self.speed[moving] / length
+            new_x = old_x + move_x * step
+            new_y = old_y + move_y * step
+            # Moves that end inside a wall slide along one axis, or are reverted
+            blocked = walls.hits_boxes(new_x, new_y, ENEMY_HALF_SIZE)
+            if blocked.any():
+                stuck = np.flatnonzero(blocked)
+                slide_x = ~walls.hits_boxes(new_x[stuck], old_y[stuck], ENEMY_HALF_SIZE)
+                slide_y = ~slide_x & ~walls.hits_boxes(old_x[stuck], new_y[stuck], ENEMY_HALF_SIZE)
+                new_y[stuck[slide_x]] = old_y[stuck[slide_x]]
+                new_x[stuck[slide_y]] = old_x[stuck[slide_y]]
+                reverted = stuck[~slide_x & ~slide_y]
+                new_x[reverted] = old_x[reverted]
+                new_y[reverted] = old_y[reverted]
+            x[moving] = new_x
+            y[moving] = new_y
+
+        timer = self.shoot_timer[:n]
+        timer += 1
+        return np.flatnonzero(timer > self.shoot_cooldown[:n])
+
+    def _update_scalar(self, player_x, player_y, walls, flow):
+        """update one enemy at a time, cheaper for a handful than NumPy's per-call overhead
+
+        Every step is the same float arithmetic as the vectorized path, so
+        both give identical positions; hypot stays np.hypot because
+        math.hypot rounds differently.
+        """
+        n = self.count
+        goals_x = player_x.tolist() if np.ndim(player_x) else [float(player_x)] * n
+        goals_y = player_y.tolist() if np.ndim(player_y) else [float(player_y)] * n
+        xs = self.x[:n].tolist()
+        ys = self.y[:n].tolist()
+        speeds = self.speed[:n].tolist()
+        for i in range(n):
+            old_x = xs[i]
+            old_y = ys[i]
+            move_x = goals_x[i] - old_x
+            move_y = goals_y[i] - old_y
+            length = float(np.hypot(move_x, move_y))
+            if length <= ENEMY_KEEP_DISTANCE:
+                continue
+            if flow is not None:
+                target_x, target_y = flow.steer_target(old_x, old_y, goals_x[i], goals_y[i])
+                path_x = target_x - old_x
+                path_y = target_y - old_y
+                path_length = float(np.hypot(path_x, path_y))
+                if path_length > 1e-6:
+                    move_x, move_y, length = path_x, path_y, path_length
+
+            step = speeds[i] / length
+            new_x = old_x + move_x * step
+            new_y = old_y + move_y * step
+            if walls.hits_box(new_x, new_y, ENEMY_HALF_SIZE):
+                if not walls.hits_box(new_x, old_y, ENEMY_HALF_SIZE):
+                    new_y = old_y
+                elif not walls.hits_box(old_x, new_y, ENEMY_HALF_SIZE):
+                    new_x = old_x
+                else:
+                    new_x, new_y = old_x, old_y
+            xs[i] = new_x
+            ys[i] = new_y
+        self.x[:n] = xs
+        self.y[:n] = ys
+
+        timer = self.shoot_timer[:n]
+        timer += 1
+        return np.flatnonzero(timer > self.shoot_cooldown[:n])
+
+    def damage(self, indices, amount):
+        """Apply amount of damage per entry in indices; repeated indices stack"""
+        np.subtract.at(self.health, indices, amount)
+
+    def remove_dead(self):
+        """Pack surviving enemies to the front of the arrays; returns how many died"""
+        n = self.count
+        keep = self.health[:n] > 0
+        live = int(keep.sum())
+        if live == n:
+            return 0
+        for name in self.FIELDS:
+            arr = getattr(self, name)
+            arr[:live] = arr[:n][keep]
+        self.count = live
+        return n - live
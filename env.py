@@ -0,0 +1,315 @@
+"""Gym-style environment around the mission, and a multi-process vectorized runner
+
+MissionEnv steps one Game without drawing:
+
+    env = MissionEnv(seed=0)
+    obs = env.reset()
+    obs, reward, done, info = env.step(action)
+
+An action is (keys, mouse_dx, click): keys is a bitmask of W, A, S, D and
+Q in replay.RECORDED_KEYS order. The observation is a fixed-size float32
+vector (see observe()).
+
+VecMissionEnv runs N environments spread over worker processes. Actions,
+observations, rewards and done flags live in shared memory, so a step only
+sends a one-word command down each worker's pipe. Finished environments
+reset themselves; the observation returned for them is the new episode's
+first one.
+
+    python env.py --envs 8 --workers 4 --steps 2000
+"""
+import os
+
+# One pygame banner per worker process is just noise
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+import argparse
+import multiprocessing
+import time
+from multiprocessing import shared_memory
+
+import numpy as np
+
+import Game
+from bullets import BULLET_SPEED
+from replay import RECORDED_KEYS, keys_from_mask
+
+# Nearest entities of each kind in an observation, zero-padded when fewer exist
+OBS_ENEMIES = 8
+OBS_BULLETS = 8
+OBS_HOSTAGES = 4
+PLAYER_FEATURES = 8
+ENEMY_FEATURES = 4
+BULLET_FEATURES = 5
+HOSTAGE_FEATURES = 4
+OBS_SIZE = (PLAYER_FEATURES + OBS_ENEMIES * ENEMY_FEATURES + OBS_BULLETS * BULLET_FEATURES +
+            OBS_HOSTAGES * HOSTAGE_FEATURES)
+ACTION_SIZE = 3
+
+# Reward terms
+KILL_REWARD = 1.0
+RESCUE_REWARD = 5.0
+COMPLETE_REWARD = 10.0
+DEATH_PENALTY = -10.0
+DAMAGE_PENALTY = -0.01
+
+
+def _nearest(dx, dy, limit):
+    """Indices of up to limit points closest to the origin, nearest first"""
+    dist = np.hypot(dx, dy)
+    if len(dist) > limit:
+        nearest = np.argpartition(dist, limit)[:limit]
+        return nearest[np.argsort(dist[nearest])]
+    return np.argsort(dist)
+
+
+def observe(game, out):
+    """Write game's observation into out, a float32 array of OBS_SIZE
+
+    Layout: player (x, y, cos and sin of the angle, health, gun selected,
+    shoot cooldown, slow motion), then the nearest enemies (dx, dy, health,
+    present), hostile bullets (dx, dy, vx, vy, present) and hostages (dx, dy,
+    saved, present). Positions are relative to the player and scaled by the
+    map size.
+    """
+    out[:] = 0
+    player = game.player
+    px, py = player.x, player.y
+    out[:PLAYER_FEATURES] = (px / Game.WIDTH, py / Game.HEIGHT, np.cos(player.angle),
+                             np.sin(player.angle), player.health / player.max_health,
+                             player.weapon == "gun", player.shoot_cooldown / 30, game.slow_motion)
+    offset = PLAYER_FEATURES
+
+    enemies = game.enemies
+    n = len(enemies)
+    dx = enemies.x[:n] - px
+    dy = enemies.y[:n] - py
+    pick = _nearest(dx, dy, OBS_ENEMIES)
+    block = out[offset:offset + OBS_ENEMIES * ENEMY_FEATURES].reshape(OBS_ENEMIES, ENEMY_FEATURES)
+    k = len(pick)
+    block[:k, 0] = dx[pick] / Game.WIDTH
+    block[:k, 1] = dy[pick] / Game.HEIGHT
+    block[:k, 2] = enemies.health[pick] / enemies.max_health[pick]
+    block[:k, 3] = 1
+    offset += OBS_ENEMIES * ENEMY_FEATURES
+
+    bullets = game.bullets
+    hostile = np.flatnonzero(~bullets.friendly[:len(bullets)])
+    dx = bullets.x[hostile] - px
+    dy = bullets.y[hostile] - py
+    pick = _nearest(dx, dy, OBS_BULLETS)
+    block = out[offset:offset + OBS_BULLETS * BULLET_FEATURES].reshape(OBS_BULLETS, BULLET_FEATURES)
+    k = len(pick)
+    block[:k, 0] = dx[pick] / Game.WIDTH
+    block[:k, 1] = dy[pick] / Game.HEIGHT
+    block[:k, 2] = bullets.vx[hostile[pick]] / BULLET_SPEED
+    block[:k, 3] = bullets.vy[hostile[pick]] / BULLET_SPEED
+    block[:k, 4] = 1
+    offset += OBS_BULLETS * BULLET_FEATURES
+
+    hostages = game.hostages
+    k = min(len(hostages), OBS_HOSTAGES)
+    block = out[offset:offset + OBS_HOSTAGES * HOSTAGE_FEATURES].reshape(OBS_HOSTAGES, HOSTAGE_FEATURES)
+    block[:k, 0] = (hostages.x[:k] - px) / Game.WIDTH
+    block[:k, 1] = (hostages.y[:k] - py) / Game.HEIGHT
+    block[:k, 2] = hostages.saved[:k]
+    block[:k, 3] = 1
+    return out
+
+
+class MissionEnv:
+    """One mission as a reset/step environment
+
+    Episodes end on death, on mission completion, or after max_ticks
+    (info["truncated"]). Each reset starts a new seed, seed + episode *
+    seed_stride, so episodes differ but the whole sequence is reproducible.
+    """
+    def __init__(self, level=None, seed=0, max_ticks=3600, seed_stride=1, obs_out=None):
+        self.level = level
+        self.seed = seed
+        self.seed_stride = seed_stride
+        self.max_ticks = max_ticks
+        self.episodes = 0
+        self.game = None
+        # Observations are written in place, e.g. into a shared-memory row
+        self.obs = obs_out if obs_out is not None else np.zeros(OBS_SIZE, dtype=np.float32)
+        self.keys = [keys_from_mask(mask) for mask in range(1 << len(RECORDED_KEYS))]
+
+    def reset(self, seed=None):
+        if seed is not None:
+            self.seed = seed
+            self.episodes = 0
+        self.game = Game.Game(self.level, self.seed + self.episodes * self.seed_stride)
+        self.episodes += 1
+        return observe(self.game, self.obs)
+
+    def step(self, action):
+        game = self.game
+        keys, mouse_dx, click = (int(a) for a in action)
+        enemies = len(game.enemies)
+        saved = game.hostages_saved
+        health = game.player.health
+
+        game.handle_mission(self.keys[keys & ((1 << len(RECORDED_KEYS)) - 1)], mouse_dx, bool(click))
+
+        reward = ((enemies - len(game.enemies)) * KILL_REWARD +
+                  (game.hostages_saved - saved) * RESCUE_REWARD +
+                  (health - game.player.health) * DAMAGE_PENALTY)
+        if game.state == Game.DEATH:
+            reward += DEATH_PENALTY
+        elif game.state != Game.MISSION:
+            reward += COMPLETE_REWARD
+        truncated = game.state == Game.MISSION and game.tick >= self.max_ticks
+        done = game.state != Game.MISSION or truncated
+        info = {"state": game.state, "tick": game.tick, "truncated": truncated}
+        return observe(game, self.obs), reward, done, info
+
+
+def _attach(name, shape, dtype):
+    memory = shared_memory.SharedMemory(name=name)
+    return memory, np.ndarray(shape, dtype=dtype, buffer=memory.buf)
+
+
+def _worker(conn, slots, names, n_envs, level_path, seed, max_ticks):
+    """Steps the environments in slots, reading actions and writing results in shared memory"""
+    from level import Level
+
+    memories = []
+    arrays = {}
+    for field, (shape, dtype) in VecMissionEnv.buffer_layout(n_envs).items():
+        memory, arrays[field] = _attach(names[field], shape, dtype)
+        memories.append(memory)
+    level = Level.load(level_path) if level_path else None
+    envs = {i: MissionEnv(level, seed + i, max_ticks, n_envs, arrays["obs"][i]) for i in slots}
+
+    try:
+        while True:
+            command = conn.recv()
+            if command == "step":
+                actions = arrays["actions"]
+                for i, env in envs.items():
+                    _, reward, done, _ = env.step(actions[i])
+                    arrays["rewards"][i] = reward
+                    arrays["dones"][i] = done
+                    if done:
+                        env.reset()
+            elif command == "reset":
+                for env in envs.values():
+                    env.reset()
+            elif command == "close":
+                break
+            conn.send(True)
+    finally:
+        for memory in memories:
+            memory.close()
+
+
+class VecMissionEnv:
+    """n_envs MissionEnvs split evenly over n_workers processes
+
+    step() returns views of the shared buffers; they are overwritten by the
+    next step, so copy anything that must outlive it.
+    """
+    def __init__(self, n_envs, n_workers=None, level_path=None, seed=0, max_ticks=3600):
+        n_workers = min(n_envs, n_workers or os.cpu_count() or 1)
+        self.n_envs = n_envs
+        self.memories = []
+        self.names = {}
+        for field, (shape, dtype) in self.buffer_layout(n_envs).items():
+            memory = shared_memory.SharedMemory(create=True, size=max(1, int(np.prod(shape)) *
+                                                                     np.dtype(dtype).itemsize))
+            self.memories.append(memory)
+            self.names[field] = memory.name
+            setattr(self, field, np.ndarray(shape, dtype=dtype, buffer=memory.buf))
+        self.actions[:] = 0
+
+        # Spawned, not forked: each worker imports pygame and Game from scratch, which opens nothing
+        context = multiprocessing.get_context("spawn")
+        self.conns = []
+        self.processes = []
+        for slots in np.array_split(np.arange(n_envs), n_workers):
+            parent, child = context.Pipe()
+            process = context.Process(target=_worker, daemon=True,
+                                      args=(child, slots.tolist(), self.names, n_envs, level_path,
+                                            seed, max_ticks))
+            process.start()
+            child.close()
+            self.conns.append(parent)
+            self.processes.append(process)
+
+    @staticmethod
+    def buffer_layout(n_envs):
+        return {
+            "actions": ((n_envs, ACTION_SIZE), np.int32),
+            "obs": ((n_envs, OBS_SIZE), np.float32),
+            "rewards": ((n_envs,), np.float32),
+            "dones": ((n_envs,), np.bool_),
+        }
+
+    def _broadcast(self, command):
+        for conn in self.conns:
+            conn.send(command)
+        for conn in self.conns:
+            conn.recv()
+
+    def reset(self):
+        self._broadcast("reset")
+        return self.obs
+
+    def step(self, actions):
+        """actions is (n_envs, 3); returns (obs, rewards, dones)"""
+        self.actions[:] = actions
+        self._broadcast("step")
+        return self.obs, self.rewards, self.dones
+
+    def close(self):
+        for conn in self.conns:
+            conn.send("close")
+        for process in self.processes:
+            process.join()
+        for memory in self.memories:
+            memory.close()
+            memory.unlink()
+        self.memories = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def random_actions(rng, n):
+    """Uniform random (keys, mouse_dx, click) actions for n environments"""
+    return np.stack((rng.integers(0, 1 << len(RECORDED_KEYS), n),
+                     rng.integers(-40, 41, n),
+                     rng.random(n) < 0.1), axis=1)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Measure vectorized environment throughput")
+    parser.add_argument("--envs", type=int, default=8)
+    parser.add_argument("--workers", type=int, help="worker processes (default: one per core)")
+    parser.add_argument("--steps", type=int, default=2000, help="vector steps to run")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--level", help="level file to run instead of the built-in mission")
+    args = parser.parse_args(argv)
+
+    rng = np.random.default_rng(args.seed)
+    with VecMissionEnv(args.envs, args.workers, args.level, args.seed) as env:
+        env.reset()
+        episodes = 0
+        start = time.perf_counter()
+        for _ in range(args.steps):
+            _, _, dones = env.step(random_actions(rng, args.envs))
+            episodes += int(dones.sum())
+        elapsed = time.perf_counter() - start
+        workers = len(env.processes)
+
+    steps = args.steps * args.envs
+    print(f"{args.envs} envs on {workers} workers: {steps} env steps in {elapsed:.3f}s "
+          f"({steps / elapsed:.0f} steps/sec), {episodes} episodes finished")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""Headless fixed-step simulation of the mission for balance testing and soak runs"""
+import os
+
+# Keep pygame's import banner out of the report
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+import argparse
+import random
+import time
+
+import pygame
+
+from Game import Game, MISSION, DEATH
+from level import Level
+from replay import InputRecorder, KeyState
+
+
+class RandomPilot:
+    """Seeded input script: wanders, turns and fires like a restless player"""
+    MOVE_KEYS = (pygame.K_w, pygame.K_a, pygame.K_s, pygame.K_d)
+
+    def __init__(self, seed=0):
+        self.rng = random.Random(seed)
+        self.held = KeyState()
+        self.hold_ticks = 0
+        self.turn_rate = 0
+
+    def __call__(self, tick):
+        if self.hold_ticks <= 0:
+            # Pick a new set of movement keys and a turn rate to hold for a while
+            keys = [k for k in self.MOVE_KEYS if self.rng.random() < 0.35]
+            if self.rng.random() < 0.05:
+                keys.append(pygame.K_q)
+            self.held = KeyState(keys)
+            self.hold_ticks = self.rng.randint(10, 60)
+            self.turn_rate = self.rng.randint(-40, 40)
+        self.hold_ticks -= 1
+
+        mouse_dx = self.turn_rate + self.rng.randint(-5, 5)
+        mouse_click = self.rng.random() < 0.1
+        return self.held, mouse_dx, mouse_click
+
+
+class HeadlessRunner:
+    """Steps Game.handle_mission without drawing, restarting after each outcome"""
+    def __init__(self, seed=0, level=None, recorder=None):
+        self.game = Game(level, seed)
+        self.recorder = recorder
+        self.ticks = 0
+        self.deaths = 0
+        self.missions_complete = 0
+
+    def step(self, keys, mouse_dx=0, mouse_click=False):
+        if self.recorder:
+            self.recorder.record(keys, mouse_dx, mouse_click)
+        self.game.handle_mission(keys, mouse_dx, mouse_click)
+        self.ticks += 1
+
+        if self.game.state != MISSION:
+            if self.game.state == DEATH:
+                self.deaths += 1
+            else:
+                self.missions_complete += 1
+            self.game.restart()
+            if self.recorder:
+                self.recorder.mark_restart()
+
+    def run(self, ticks, pilot):
+        """Run a fixed number of ticks, pulling (keys, mouse_dx, mouse_click) from pilot"""
+        start = time.perf_counter()
+        for tick in range(ticks):
+            self.step(*pilot(tick))
+        return time.perf_counter() - start
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run the mission headless at full speed")
+    parser.add_argument("--ticks", type=int, default=10000, help="number of simulation ticks")
+    parser.add_argument("--seed", type=int, default=0, help="seed for the game and the input script")
+    parser.add_argument("--level", help="level file to run instead of the built-in mission")
+    parser.add_argument("--record", help="record the scripted input to this file for replay.py")
+    args = parser.parse_args(argv)
+
+    recorder = InputRecorder(args.record, args.seed) if args.record else None
+    runner = HeadlessRunner(args.seed, Level.load(args.level) if args.level else None, recorder)
+    elapsed = runner.run(args.ticks, RandomPilot(args.seed))
+    if recorder:
+        recorder.close()
+
+    rate = runner.ticks / elapsed if elapsed > 0 else float("inf")
+    print(f"{runner.ticks} ticks in {elapsed:.3f}s ({rate:.0f} ticks/sec)")
+    print(f"deaths: {runner.deaths}  missions complete: {runner.missions_complete}")
+    pygame.quit()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,29 @@
+"""Structure-of-arrays hostage storage and the rescue check"""
+import numpy as np
+
+RESCUE_RADIUS = 50
+
+
+class HostageStore:
+    """All hostages as parallel NumPy arrays; hostages never leave, so every slot is live"""
+    FIELDS = ("x", "y", "saved")
+
+    def __init__(self, spawns):
+        n = len(spawns)
+        self.count = n
+        self.x = np.array([x for x, _ in spawns], dtype=float).reshape(n)
+        self.y = np.array([y for _, y in spawns], dtype=float).reshape(n)
+        self.saved = np.zeros(n, dtype=bool)
+
+    def __len__(self):
+        return self.count
+
+    def rescue(self, player_xs, player_ys):
+        """Mark every unsaved hostage within reach of any of the players as saved; returns how many"""
+        waiting = np.flatnonzero(~self.saved)
+        if not len(waiting) or not len(player_xs):
+            return 0
+        dist = np.hypot(self.x[waiting, None] - player_xs, self.y[waiting, None] - player_ys)
+        rescued = waiting[(dist < RESCUE_RADIUS).any(axis=1)]
+        self.saved[rescued] = True
+        return len(rescued)
@@ -0,0 +1,149 @@
+"""Mission maps and their compact, memory-mappable binary file format
+
+A level file is a fixed header, a table of array sections and the raw
+arrays themselves, each aligned to 64 bytes:
+
+    header    magic b"HMLV", version, section count, map metadata
+    sections  name, dtype, shape and byte offset of every array
+    arrays    walls, spawns, wall grid table and navigation grid
+
+Loading memory-maps the file and wraps the arrays in place, so the wall
+broadphase and navigation grid are never rebuilt in Python.
+
+Usage:
+
+    python level.py export mission.lvl   # write the built-in mission
+    python level.py info mission.lvl
+"""
+import os
+import struct
+import time
+
+import numpy as np
+import pygame
+
+from navigation import NavGrid
+from spatial import WallGrid
+
+MAGIC = b"HMLV"
+VERSION = 1
+ALIGN = 64
+
+# magic, version, section count, then map size, wall grid and nav grid metadata
+HEADER = struct.Struct("<4sHH dd dd ii dd dd")
+# name, dtype string, rows, cols, byte offset
+SECTION = struct.Struct("<8s4sQQQ")
+
+
+class Level:
+    """A mission map: geometry, spawns and the acceleration data built from them"""
+    def __init__(self, size, player_spawn, enemy_spawns, hostage_spawns, wall_grid, nav_grid):
+        self.size = size
+        self.player_spawn = player_spawn
+        self.enemy_spawns = enemy_spawns
+        self.hostage_spawns = hostage_spawns
+        self.wall_grid = wall_grid
+        self.nav_grid = nav_grid
+        self._rects = None
+
+    @classmethod
+    def build(cls, size, walls, player_spawn, enemy_spawns, hostage_spawns):
+        """Build a level, and its wall grid and navigation grid, from plain data"""
+        wall_grid = WallGrid(walls)
+        return cls(size, tuple(player_spawn),
+                   np.array(enemy_spawns, dtype=float).reshape(-1, 2),
+                   np.array(hostage_spawns, dtype=float).reshape(-1, 2),
+                   wall_grid, NavGrid.rasterize(wall_grid.boxes, size))
+
+    @property
+    def rects(self):
+        """Walls as pygame.Rect, created on first use and shared by every restart"""
+        if self._rects is None:
+            self._rects = [pygame.Rect(int(l), int(t), int(r - l), int(b - t))
+                           for l, t, r, b in self.wall_grid.boxes.tolist()]
+        return self._rects
+
+    def save(self, path):
+        grid = self.wall_grid
+        nav = self.nav_grid
+        arrays = [
+            (b"walls", grid.boxes.astype("<f8")),
+            (b"player", np.array([self.player_spawn], dtype="<f8")),
+            (b"enemies", self.enemy_spawns.astype("<f8")),
+            (b"hostages", self.hostage_spawns.astype("<f8")),
+            (b"gridtab", grid.table.astype("<i4")),
+            (b"navgrid", nav.blocked.astype("u1")),
+        ]
+
+        offset = _align(HEADER.size + SECTION.size * len(arrays))
+        table = []
+        for name, array in arrays:
+            table.append(SECTION.pack(name, array.dtype.str.encode(), array.shape[0],
+                                      array.shape[1], offset))
+            offset = _align(offset + array.nbytes)
+
+        header = HEADER.pack(MAGIC, VERSION, len(arrays), *self.size,
+                             grid.origin_x, grid.origin_y, grid.cols, grid.rows,
+                             grid.cell_size, grid.pad, nav.cell_size, nav.clearance)
+        with open(path, "wb") as f:
+            f.write(header)
+            f.write(b"".join(table))
+            for (name, array), entry in zip(arrays, table):
+                f.seek(SECTION.unpack(entry)[4])
+                f.write(array.tobytes())
+
+    @classmethod
+    def load(cls, path):
+        """Memory-map a level file; arrays are read-only views into the mapping"""
+        data = np.memmap(path, dtype=np.uint8, mode="r")
+        (magic, version, count, width, height, origin_x, origin_y, cols, rows,
+         cell_size, pad, nav_cell, nav_clearance) = HEADER.unpack_from(data)
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a level file")
+        if version != VERSION:
+            raise ValueError(f"{path} has level format version {version}, expected {VERSION}")
+
+        arrays = {}
+        for i in range(count):
+            name, dtype, n_rows, n_cols, offset = SECTION.unpack_from(data, HEADER.size + i * SECTION.size)
+            arrays[name.rstrip(b"\0").decode()] = np.ndarray(
+                (n_rows, n_cols), dtype=np.dtype(dtype.rstrip(b"\0").decode()),
+                buffer=data, offset=offset)
+
+        wall_grid = WallGrid.from_index(arrays["walls"], arrays["gridtab"], origin_x, origin_y,
+                                        cols, rows, cell_size, pad)
+        nav_grid = NavGrid(arrays["navgrid"], nav_cell, nav_clearance)
+        return cls((width, height), tuple(arrays["player"][0].tolist()), arrays["enemies"],
+                   arrays["hostages"], wall_grid, nav_grid)
+
+
+def _align(offset):
+    return -(-offset // ALIGN) * ALIGN
+
+
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Export or inspect level files")
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("export", help="write the built-in mission").add_argument("path")
+    sub.add_parser("info", help="summarize a level file").add_argument("path")
+    args = parser.parse_args(argv)
+
+    if args.command == "export":
+        # Imported late: Game imports this module
+        from Game import mission_level
+        mission_level().save(args.path)
+
+    start = time.perf_counter()
+    level = Level.load(args.path)
+    elapsed = (time.perf_counter() - start) * 1000
+    print(f"{args.path}: {os.path.getsize(args.path)} bytes, loaded in {elapsed:.3f} ms")
+    print(f"  size {level.size[0]:g}x{level.size[1]:g}, {len(level.wall_grid)} walls, "
+          f"{len(level.enemy_spawns)} enemies, {len(level.hostage_spawns)} hostages")
+    print(f"  wall grid {level.wall_grid.cols}x{level.wall_grid.rows}, "
+          f"nav grid {level.nav_grid.cols}x{level.nav_grid.rows}")
+
+
+if __name__ == "__main__":
+    main()
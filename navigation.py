@@ -0,0 +1,207 @@
+"""Navigation grid rasterized from the static walls"""
+import numpy as np
+
+
+class NavGrid:
+    """Walkable/blocked cells covering the map
+
+    A cell is blocked when a mover of the given clearance (half-size) centred
+    on the cell would overlap a wall.
+    """
+    def __init__(self, blocked, cell_size, clearance):
+        self.blocked = blocked
+        self.cell_size = cell_size
+        self.clearance = clearance
+        self.rows, self.cols = blocked.shape
+        self._links = None
+
+    @classmethod
+    def rasterize(cls, boxes, size, cell_size=20, clearance=15):
+        """Build the grid for a map of size (width, height) from (N, 4) wall boxes"""
+        width, height = size
+        cols = -(-int(width) // cell_size)
+        rows = -(-int(height) // cell_size)
+        blocked = np.zeros((rows, cols), dtype=np.uint8)
+        for left, top, right, bottom in boxes:
+            # Cells whose centre lies strictly within clearance of the wall
+            c0 = max(0, int(np.floor((left - clearance) / cell_size - 0.5)) + 1)
+            r0 = max(0, int(np.floor((top - clearance) / cell_size - 0.5)) + 1)
+            c1 = min(cols, int(np.ceil((right + clearance) / cell_size - 0.5)))
+            r1 = min(rows, int(np.ceil((bottom + clearance) / cell_size - 0.5)))
+            blocked[r0:r1, c0:c1] = 1
+        return cls(blocked, cell_size, clearance)
+
+    def cell_of(self, x, y):
+        """(col, row) of the cell containing a world point, clamped to the grid"""
+        col = min(max(int(x // self.cell_size), 0), self.cols - 1)
+        row = min(max(int(y // self.cell_size), 0), self.rows - 1)
+        return col, row
+
+    def center(self, col, row):
+        return ((col + 0.5) * self.cell_size, (row + 0.5) * self.cell_size)
+
+    def links(self):
+        """Walkable 4-neighbours of every cell, as flat indices row * cols + col
+
+        Built once per grid from shifted views of blocked, then shared by
+        every FlowField over it.
+        """
+        if self._links is None:
+            rows, cols = self.rows, self.cols
+            cells = np.arange(rows * cols).reshape(rows, cols)
+            open_cells = np.where(self.blocked == 0, cells, -1)
+            # Up, down, left and right; -1 where off the grid or blocked
+            around = np.full((rows, cols, 4), -1)
+            around[1:, :, 0] = open_cells[:-1]
+            around[:-1, :, 1] = open_cells[1:]
+            around[:, 1:, 2] = open_cells[:, :-1]
+            around[:, :-1, 3] = open_cells[:, 1:]
+            self._links = [tuple(n for n in cell if n >= 0) for cell in around.reshape(-1, 4).tolist()]
+        return self._links
+
+
+class FlowField:
+    """Shared BFS distance field toward the nearest goal cell, sampled by every chaser
+
+    The field is rebuilt only when a goal has moved into a different cell
+    and a chaser next samples it. Each cell steers toward the centre of its
+    best neighbour: steer_targets looks that up in arrays built for the
+    whole grid on its first call after a rebuild, while steer_target finds
+    it for the one cell asked about and remembers it until the next rebuild.
+    """
+    # 8-neighbourhood as (d_row, d_col); diagonals last
+    OFFSETS = ((-1, 0), (1, 0), (0, -1), (0, 1), (-1, -1), (-1, 1), (1, -1), (1, 1))
+
+    def __init__(self, nav_grid):
+        self.nav = nav_grid
+        self.goal = None
+        self.distance = None
+        self.next_x = None
+        self.next_y = None
+        self.has_step = None
+        # Flat BFS distances, unreached cells at rows * cols + 1
+        self.flat_distance = None
+        # steer_target's steps by flat cell: (x, y), or None to head straight at the goal
+        self.steps = {}
+        # Set when the goal moved since the last rebuild
+        self.stale = False
+        self.rebuilds = 0
+
+    def update(self, goal_x, goal_y):
+        """Retarget the field at one goal, or at arrays of several; returns True if the goal moved"""
+        if np.ndim(goal_x):
+            goal = tuple(sorted({self.nav.cell_of(x, y) for x, y in zip(goal_x, goal_y)}))
+        else:
+            goal = (self.nav.cell_of(goal_x, goal_y),)
+        if goal == self.goal:
+            return False
+        self.goal = goal
+        self.stale = True
+        return True
+
+    def _rebuild(self):
+        nav = self.nav
+        rows, cols = nav.rows, nav.cols
+        links = nav.links()
+        unreached = rows * cols + 1
+        distance = [unreached] * (rows * cols)
+
+        # Breadth-first over walkable cells, 4-connected, from every goal at once
+        frontier = [goal_row * cols + goal_col for goal_col, goal_row in self.goal]
+        for start in frontier:
+            distance[start] = 0
+        d = 0
+        while frontier:
+            d += 1
+            next_frontier = []
+            for cell in frontier:
+                for neighbour in links[cell]:
+                    if distance[neighbour] > d:
+                        distance[neighbour] = d
+                        next_frontier.append(neighbour)
+            frontier = next_frontier
+
+        self.flat_distance = distance
+        # Both lookups are rebuilt on demand
+        self.distance = self.has_step = None
+        self.steps = {}
+        self.stale = False
+        self.rebuilds += 1
+
+    def _build_arrays(self):
+        """distance, next_x, next_y and has_step for the whole grid, from the flat distances"""
+        nav = self.nav
+        rows, cols = nav.rows, nav.cols
+        dist = np.array(self.flat_distance, dtype=float).reshape(rows, cols)
+        dist[dist == rows * cols + 1] = np.inf
+        self.distance = dist
+
+        # Best neighbour per cell, vectorized; diagonals may not cut wall corners
+        padded = np.pad(dist, 1, constant_values=np.inf)
+        best = np.full((rows, cols), np.inf)
+        step_row = np.zeros((rows, cols), dtype=np.intp)
+        step_col = np.zeros((rows, cols), dtype=np.intp)
+        for d_row, d_col in self.OFFSETS:
+            neighbour = padded[1 + d_row:1 + d_row + rows, 1 + d_col:1 + d_col + cols]
+            if d_row and d_col:
+                side_a = padded[1 + d_row:1 + d_row + rows, 1:1 + cols]
+                side_b = padded[1:1 + rows, 1 + d_col:1 + d_col + cols]
+                neighbour = np.where(np.isinf(side_a) | np.isinf(side_b), np.inf, neighbour)
+            better = neighbour < best
+            best[better] = neighbour[better]
+            step_row[better] = d_row
+            step_col[better] = d_col
+
+        row_idx, col_idx = np.indices((rows, cols))
+        self.next_x = (col_idx + step_col + 0.5) * nav.cell_size
+        self.next_y = (row_idx + step_row + 0.5) * nav.cell_size
+        # Cells with nowhere better to go (the goal, or cut off) steer straight at the goal
+        self.has_step = best < dist
+
+    def _step(self, col, row):
+        """_build_arrays' step for one cell, from the flat distances"""
+        nav = self.nav
+        rows, cols = nav.rows, nav.cols
+        distance = self.flat_distance
+        # The unreached marker sorts after every real distance, like inf does
+        unreached = best = rows * cols + 1
+
+        def at(r, c):
+            return distance[r * cols + c] if 0 <= r < rows and 0 <= c < cols else unreached
+
+        step = None
+        for d_row, d_col in self.OFFSETS:
+            neighbour = at(row + d_row, col + d_col)
+            if d_row and d_col and (at(row + d_row, col) == unreached or at(row, col + d_col) == unreached):
+                continue
+            if neighbour < best:
+                best = neighbour
+                step = (d_row, d_col)
+        if best < distance[row * cols + col]:
+            return ((col + step[1] + 0.5) * nav.cell_size, (row + step[0] + 0.5) * nav.cell_size)
+        return None
+
+    def steer_targets(self, xs, ys, goal_x, goal_y):
+        """Point each chaser at (xs, ys) should head for this tick"""
+        if self.stale:
+            self._rebuild()
+        if self.has_step is None:
+            self._build_arrays()
+        nav = self.nav
+        cols = np.clip((xs // nav.cell_size).astype(np.intp), 0, nav.cols - 1)
+        rows = np.clip((ys // nav.cell_size).astype(np.intp), 0, nav.rows - 1)
+        use_field = self.has_step[rows, cols]
+        target_x = np.where(use_field, self.next_x[rows, cols], goal_x)
+        target_y = np.where(use_field, self.next_y[rows, cols], goal_y)
+        return target_x, target_y
+
+    def steer_target(self, x, y, goal_x, goal_y):
+        """steer_targets for a single chaser, with plain floats"""
+        if self.stale:
+            self._rebuild()
+        col, row = self.nav.cell_of(x, y)
+        cell = row * self.nav.cols + col
+        steps = self.steps
+        if cell not in steps:
+            steps[cell] = self._step(col, row)
+        return steps[cell] or (goal_x, goal_y)
@@ -0,0 +1,233 @@
+"""Wire format for co-op missions: input packets and delta-compressed snapshots
+
+Clients send one INPUT packet per frame and the server answers every tick
+with a SNAPSHOT. A snapshot is a header followed by four keyed tables:
+players (by slot), enemies (by id), hostages (by index) and bullets.
+Every table value is quantized to int16; row counts and ids are uint32, so
+neither long sessions (enemy ids only grow) nor bullet storms wrap them.
+
+Each table is encoded against the same table of an earlier snapshot that
+the client has acknowledged. Ids that disappeared are listed, and every
+new or changed row carries a bitmask of the fields that changed followed
+by only those fields, so static data such as hostage positions costs
+nothing after the first snapshot. Bullets have no stable ids and move
+every tick, so they are always sent in full. With no acknowledged base
+the whole snapshot goes out in full.
+
+Snapshots can grow past a typical MTU with many bullets; that is fine
+over loopback, where UDP datagrams can be up to 64 KiB. A snapshot larger
+than that cannot be sent at all; the server drops it and counts the drop
+in its stats.
+"""
+import math
+import struct
+
+import numpy as np
+
+from bullets import BULLET_SPEED
+from players import GUN
+from replay import CLICK_BIT, key_mask, keys_from_mask
+from snapshot import Columns, HostageState, PlayerState, WorldSnapshot
+
+DEFAULT_PORT = 47100
+
+HELLO, WELCOME, INPUT, SNAPSHOT, BYE = range(1, 6)
+PACKET_TYPE = struct.Struct("<B")
+# type, assigned slot (-1 when the server is full), game seed
+WELCOME_PACKET = struct.Struct("<Bbq")
+# type, input sequence, last snapshot sequence received, key and click mask, mouse_dx
+INPUT_PACKET = struct.Struct("<BIIBh")
+# type, sequence, base sequence, game tick, state, flags, hostages saved, receiver's slot
+SNAPSHOT_HEADER = struct.Struct("<BIIIBBBB")
+NO_BASE = 0xFFFFFFFF
+SLOW_MOTION_FLAG = 1
+
+COUNT = struct.Struct("<I")
+ID = np.dtype("<u4")
+
+# Game's state names, in wire order
+STATES = ("mission", "death", "timeskip", "ending")
+
+TABLES = {
+    "players": ("x", "y", "angle", "health", "max_health", "weapon"),
+    "enemies": ("x", "y", "health", "max_health"),
+    "hostages": ("x", "y", "saved"),
+    "bullets": ("x", "y", "angle", "friendly"),
+}
+# Tables encoded against a base; the rest are sent in full every time
+DELTA_TABLES = ("players", "enemies", "hostages")
+
+POSITION_SCALE = 4
+ANGLE_SCALE = 65536 / (2 * math.pi)
+
+
+def _position(values):
+    return np.clip(np.round(np.asarray(values, dtype=float) * POSITION_SCALE), -32768, 32767)
+
+
+def _angle(values):
+    turns = np.round(np.mod(np.asarray(values, dtype=float), 2 * math.pi) * ANGLE_SCALE)
+    return (turns.astype(np.int64) + 32768) % 65536 - 32768
+
+
+def _table(ids, *columns):
+    values = np.stack([np.asarray(c, dtype=np.int64) for c in columns], axis=1) if len(ids) else \
+        np.zeros((0, len(columns)), dtype=np.int64)
+    # Always a copy: servers keep these tables as delta bases while the stores compact in place
+    return np.array(ids, dtype=np.int64), values.astype(np.int16)
+
+
+def encode_input(sequence, ack, keys, mouse_dx, mouse_click):
+    mask = key_mask(keys) | (CLICK_BIT if mouse_click else 0)
+    return INPUT_PACKET.pack(INPUT, sequence, ack, mask, max(-32768, min(32767, int(mouse_dx))))
+
+
+def decode_input(data):
+    """(sequence, ack, keys, mouse_dx, mouse_click) from an INPUT packet"""
+    _, sequence, ack, mask, mouse_dx = INPUT_PACKET.unpack_from(data)
+    return sequence, ack, keys_from_mask(mask), mouse_dx, bool(mask & CLICK_BIT)
+
+
+def capture_tables(game):
+    """Quantized (ids, values) tables of a Game, with ids ascending"""
+    players = game.players
+    enemies = game.enemies
+    bullets = game.bullets
+    hostages = game.hostages
+    n = len(enemies)
+    b = len(bullets)
+    return {
+        "players": _table(np.arange(len(players)), _position(players.x), _position(players.y),
+                          _angle(players.angle), np.round(players.health), np.round(players.max_health),
+                          players.weapon == GUN),
+        "enemies": _table(enemies.ids[:n], _position(enemies.x[:n]), _position(enemies.y[:n]),
+                          np.round(enemies.health[:n]), np.round(enemies.max_health[:n])),
+        "hostages": _table(np.arange(len(hostages)), _position(hostages.x), _position(hostages.y),
+                           hostages.saved),
+        "bullets": _table(np.arange(b), _position(bullets.x[:b]), _position(bullets.y[:b]),
+                          _angle(bullets.angle[:b]), bullets.friendly[:b]),
+    }
+
+
+def encode_table(ids, values, base=None):
+    """Rows of (ids, values) that differ from base, plus the base ids that are gone
+
+    Layout: removed count and ids, changed-row count, the changed rows'
+    ids, their field masks, then the changed fields row by row.
+    """
+    width = values.shape[1]
+    changed = np.ones(values.shape, dtype=bool)
+    removed = np.zeros(0, dtype=np.int64)
+    if base is not None:
+        base_ids, base_values = base
+        removed = base_ids[~np.isin(base_ids, ids, assume_unique=True)]
+        if len(base_ids) and len(ids):
+            slot = np.minimum(np.searchsorted(base_ids, ids), len(base_ids) - 1)
+            known = base_ids[slot] == ids
+            changed[known] = values[known] != base_values[slot[known]]
+    masks = changed.astype(np.uint8) @ (1 << np.arange(width, dtype=np.uint8))
+    rows = np.flatnonzero(masks)
+    return b"".join((COUNT.pack(len(removed)), removed.astype(ID).tobytes(),
+                     COUNT.pack(len(rows)), ids[rows].astype(ID).tobytes(),
+                     masks[rows].astype(np.uint8).tobytes(),
+                     values[rows][changed[rows]].astype("<i2").tobytes()))
+
+
+def decode_table(data, offset, width, base=None):
+    """Inverse of encode_table; returns ((ids, values), new offset)"""
+    (removed,) = COUNT.unpack_from(data, offset)
+    offset += COUNT.size
+    removed_ids = np.frombuffer(data, dtype=ID, count=removed, offset=offset).astype(np.int64)
+    offset += ID.itemsize * removed
+
+    (rows,) = COUNT.unpack_from(data, offset)
+    offset += COUNT.size
+    row_ids = np.frombuffer(data, dtype=ID, count=rows, offset=offset).astype(np.int64)
+    offset += ID.itemsize * rows
+    masks = np.frombuffer(data, dtype=np.uint8, count=rows, offset=offset)
+    offset += rows
+    changed = (masks[:, None] >> np.arange(width, dtype=np.uint8)) & 1 == 1
+    fields = int(changed.sum())
+    stream = np.frombuffer(data, dtype="<i2", count=fields, offset=offset)
+    offset += 2 * fields
+
+    kept_ids = np.zeros(0, dtype=np.int64)
+    kept_values = np.zeros((0, width), dtype=np.int16)
+    if base is not None:
+        keep = ~np.isin(base[0], removed_ids, assume_unique=True)
+        kept_ids, kept_values = base[0][keep], base[1][keep]
+    ids = np.union1d(kept_ids, row_ids)
+    values = np.zeros((len(ids), width), dtype=np.int16)
+    values[np.searchsorted(ids, kept_ids)] = kept_values
+    at = np.searchsorted(ids, row_ids)
+    updated = values[at]
+    updated[changed] = stream
+    values[at] = updated
+    return (ids, values), offset
+
+
+def encode_tables(tables, base=None):
+    """The tables part of a SNAPSHOT packet; the same for every client with the same base"""
+    return b"".join(encode_table(*tables[name], base[name] if base is not None and name in DELTA_TABLES
+                                 else None)
+                    for name in TABLES)
+
+
+def encode_header(sequence, game, slot, base_sequence=None):
+    flags = SLOW_MOTION_FLAG if game.slow_motion else 0
+    return SNAPSHOT_HEADER.pack(SNAPSHOT, sequence, NO_BASE if base_sequence is None else base_sequence,
+                                game.tick, STATES.index(game.state), flags,
+                                min(game.hostages_saved, 255), slot)
+
+
+def encode_snapshot(sequence, game, tables, slot, base_sequence=None, base=None):
+    """SNAPSHOT packet for one client, as a delta against base if given"""
+    return encode_header(sequence, game, slot, None if base is None else base_sequence) + \
+        encode_tables(tables, base)
+
+
+def decode_snapshot(data, bases):
+    """(header dict, tables) from a SNAPSHOT packet; None if its base is not in bases"""
+    _, sequence, base_sequence, tick, state, flags, hostages_saved, slot = \
+        SNAPSHOT_HEADER.unpack_from(data)
+    base = None
+    if base_sequence != NO_BASE:
+        base = bases.get(base_sequence)
+        if base is None:
+            return None
+    offset = SNAPSHOT_HEADER.size
+    tables = {}
+    for name, fields in TABLES.items():
+        table_base = base[name] if base is not None and name in DELTA_TABLES else None
+        tables[name], offset = decode_table(data, offset, len(fields), table_base)
+    header = {"sequence": sequence, "base": None if base is None else base_sequence, "tick": tick,
+              "state": STATES[state], "slow_motion": bool(flags & SLOW_MOTION_FLAG),
+              "hostages_saved": hostages_saved, "slot": slot}
+    return header, tables
+
+
+def to_world(header, tables):
+    """WorldSnapshot seen from the receiving client's player, for Game.draw_mission"""
+    ids, values = tables["players"]
+    players = [PlayerState(x / POSITION_SCALE, y / POSITION_SCALE, (angle % 65536) / ANGLE_SCALE,
+                           health, max_health, "gun" if weapon else "knife")
+               for x, y, angle, health, max_health, weapon in values.tolist()]
+    slot = header["slot"]
+    allies = tuple(p for i, p in zip(ids.tolist(), players) if i != slot and p.health > 0)
+
+    ids, values = tables["enemies"]
+    enemies = Columns(len(ids), ids=ids, x=values[:, 0] / POSITION_SCALE, y=values[:, 1] / POSITION_SCALE,
+                      health=values[:, 2].astype(float), max_health=values[:, 3].astype(float))
+
+    _, values = tables["bullets"]
+    angles = (values[:, 2].astype(np.int64) % 65536) / ANGLE_SCALE
+    bullets = Columns(len(values), x=values[:, 0] / POSITION_SCALE, y=values[:, 1] / POSITION_SCALE,
+                      angle=angles, friendly=values[:, 3].astype(bool),
+                      vx=np.cos(angles) * BULLET_SPEED, vy=np.sin(angles) * BULLET_SPEED)
+
+    _, values = tables["hostages"]
+    hostages = tuple(HostageState(x / POSITION_SCALE, y / POSITION_SCALE, bool(saved))
+                     for x, y, saved in values.tolist())
+
+    return WorldSnapshot(header["tick"], header["state"], header["slow_motion"], header["hostages_saved"],
+                         players[slot], allies, enemies, bullets, hostages)
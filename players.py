@@ -0,0 +1,152 @@
+"""Structure-of-arrays player storage, with small handles for code that works on one player"""
+import numpy as np
+
+GUN, KNIFE = 0, 1
+WEAPONS = ("gun", "knife")
+
+PLAYER_HALF_SIZE = 15
+PLAYER_SPEED = 4
+PLAYER_HEALTH = 100
+TURN_RATE = 0.003
+SWITCH_COOLDOWN = 20
+
+
+class PlayerStore:
+    """All players as parallel NumPy arrays
+
+    Players never leave a mission, so every slot in [0, count) is live for
+    the whole game; a dead player just has zero health. Indexing or
+    iterating gives Player handles, which are created once and can be
+    compared with `is`.
+    """
+    FIELDS = ("x", "y", "angle", "speed", "health", "max_health", "weapon", "shoot_cooldown",
+              "weapon_switch_cooldown", "camera_distance", "camera_height")
+
+    def __init__(self, spawns):
+        n = len(spawns)
+        self.count = n
+        self.x = np.array([x for x, _ in spawns], dtype=float).reshape(n)
+        self.y = np.array([y for _, y in spawns], dtype=float).reshape(n)
+        self.angle = np.zeros(n)
+        self.speed = np.full(n, float(PLAYER_SPEED))
+        self.health = np.full(n, PLAYER_HEALTH, dtype=np.int64)
+        self.max_health = np.full(n, PLAYER_HEALTH, dtype=np.int64)
+        self.weapon = np.full(n, GUN, dtype=np.int8)
+        self.shoot_cooldown = np.zeros(n, dtype=np.int64)
+        self.weapon_switch_cooldown = np.zeros(n, dtype=np.int64)
+        self.camera_distance = np.full(n, 150.0)
+        self.camera_height = np.full(n, 80.0)
+        self.handles = [Player(self, i) for i in range(n)]
+
+    def __len__(self):
+        return self.count
+
+    def __getitem__(self, i):
+        return self.handles[i]
+
+    def __iter__(self):
+        return iter(self.handles)
+
+    def alive(self):
+        """Indices of the players still standing"""
+        return np.flatnonzero(self.health > 0)
+
+    def move(self, indices, dx, dy, walls):
+        """Step the given players by whole speeds along (dx, dy) unless the new spot is in a wall
+
+        dx and dy are -1, 0 or 1 per player. Shot cooldowns of the moved
+        players also tick down here.
+        """
+        speed = self.speed[indices]
+        x = self.x[indices] + dx * speed
+        y = self.y[indices] + dy * speed
+        clear = ~walls.hits_boxes(x, y, PLAYER_HALF_SIZE)
+        if clear.all():
+            self.x[indices] = x
+            self.y[indices] = y
+        else:
+            self.x[indices[clear]] = x[clear]
+            self.y[indices[clear]] = y[clear]
+        cooldown = self.shoot_cooldown[indices]
+        if cooldown.any():
+            self.shoot_cooldown[indices] = cooldown - (cooldown > 0)
+
+    def move_one(self, i, dx, dy, walls):
+        """move for the single player i, with plain scalars"""
+        if dx or dy:
+            speed = self.speed[i].item()
+            x = self.x[i].item() + dx * speed
+            y = self.y[i].item() + dy * speed
+            if not walls.hits_box(x, y, PLAYER_HALF_SIZE):
+                self.x[i] = x
+                self.y[i] = y
+        if self.shoot_cooldown[i]:
+            self.shoot_cooldown[i] -= 1
+
+    def rotate(self, indices, mouse_dx):
+        self.angle[indices] += mouse_dx * TURN_RATE
+
+    def switch_weapons(self, indices, pressed):
+        """Swap gun and knife for players pressing switch off cooldown, then tick the cooldown down"""
+        cooldown = self.weapon_switch_cooldown[indices]
+        if pressed.any():
+            switch = pressed & (cooldown == 0)
+            self.weapon[indices[switch]] ^= 1
+            cooldown[switch] = SWITCH_COOLDOWN
+        elif not cooldown.any():
+            return
+        self.weapon_switch_cooldown[indices] = cooldown - (cooldown > 0)
+
+    def switch_one(self, i, pressed):
+        """switch_weapons for the single player i, with plain scalars"""
+        cooldown = self.weapon_switch_cooldown[i].item()
+        if pressed and cooldown == 0:
+            self.weapon[i] ^= 1
+            cooldown = SWITCH_COOLDOWN
+        if cooldown:
+            self.weapon_switch_cooldown[i] = cooldown - 1
+
+    def damage(self, indices, amounts):
+        self.health[indices] = np.maximum(0, self.health[indices] - amounts)
+
+
+def _column(name):
+    def get(self):
+        return getattr(self.store, name)[self.index].item()
+
+    def set(self, value):
+        getattr(self.store, name)[self.index] = value
+
+    return property(get, set)
+
+
+class Player:
+    """One player's row of a PlayerStore, read and written like plain attributes"""
+    __slots__ = ("store", "index")
+
+    def __init__(self, store, index):
+        self.store = store
+        self.index = index
+
+    x = _column("x")
+    y = _column("y")
+    angle = _column("angle")
+    speed = _column("speed")
+    health = _column("health")
+    max_health = _column("max_health")
+    shoot_cooldown = _column("shoot_cooldown")
+    weapon_switch_cooldown = _column("weapon_switch_cooldown")
+    camera_distance = _column("camera_distance")
+    camera_height = _column("camera_height")
+
+    @property
+    def weapon(self):
+        """Name of the held weapon, from WEAPONS"""
+        return WEAPONS[self.store.weapon[self.index]]
+
+    @weapon.setter
+    def weapon(self, name):
+        self.store.weapon[self.index] = WEAPONS.index(name)
+
+    def can_shoot(self):
+        return self.store.shoot_cooldown[self.index] == 0
@@ -0,0 +1,141 @@
+"""Per-phase frame profiler with an in-game overlay and Chrome trace export
+
+Wrap each phase of a frame in a timer:
+
+    with profiler.phase("bullets"):
+        ...
+
+While disabled, phase() hands back one shared no-op context, so leaving
+the instrumentation in costs a method call per phase. While enabled,
+every phase keeps its last `capacity` durations in a ring buffer for
+mean/p99 readouts, and every timing is also kept as a trace event that
+export_trace writes in Chrome's trace-event format (open it in
+chrome://tracing or https://ui.perfetto.dev).
+"""
+import contextlib
+import threading
+import time
+from collections import deque
+
+import numpy as np
+import pygame
+
+from render_cache import TextCache
+
+_DISABLED = contextlib.nullcontext()
+
+
+class _Phase:
+    """Reusable timer context for one named phase"""
+    __slots__ = ("profiler", "name", "history", "start")
+
+    def __init__(self, profiler, name, capacity):
+        self.profiler = profiler
+        self.name = name
+        self.history = PhaseHistory(capacity)
+        self.start = 0
+
+    def __enter__(self):
+        self.start = time.perf_counter_ns()
+
+    def __exit__(self, *exc):
+        end = time.perf_counter_ns()
+        self.history.add((end - self.start) / 1e6)
+        self.profiler.events.append((self.name, self.start, end, threading.get_ident()))
+
+
+class PhaseHistory:
+    """Ring buffer of the most recent durations of one phase, in ms"""
+    def __init__(self, capacity):
+        self.samples = np.zeros(capacity)
+        self.index = 0
+        self.filled = 0
+
+    def add(self, ms):
+        self.samples[self.index] = ms
+        self.index = (self.index + 1) % len(self.samples)
+        self.filled = min(self.filled + 1, len(self.samples))
+
+    def window(self):
+        return self.samples[:self.filled]
+
+    def mean(self):
+        return float(self.window().mean()) if self.filled else 0.0
+
+    def percentile(self, q):
+        return float(np.percentile(self.window(), q)) if self.filled else 0.0
+
+
+class Profiler:
+    """Named phase timers, off by default
+
+    Phases are listed in the overlay in the order they were first timed.
+    The trace keeps at most trace_capacity events, dropping the oldest.
+    The overlay draws with text_cache, normally the game's shared one.
+    """
+    def __init__(self, capacity=300, trace_capacity=200000, enabled=False, text_cache=None):
+        self.capacity = capacity
+        self.text_cache = TextCache() if text_cache is None else text_cache
+        self.enabled = enabled
+        self.phases = {}
+        self.events = deque(maxlen=trace_capacity)
+        self.origin = time.perf_counter_ns()
+        self.overlay = None
+        self.overlay_frame = 0
+
+    def phase(self, name):
+        if not self.enabled:
+            return _DISABLED
+        timer = self.phases.get(name)
+        if timer is None:
+            timer = self.phases[name] = _Phase(self, name, self.capacity)
+        return timer
+
+    def toggle(self):
+        self.enabled = not self.enabled
+        self.overlay = None
+
+    def stats(self):
+        """{phase: (mean ms, p99 ms)} over each phase's ring buffer"""
+        return {name: (timer.history.mean(), timer.history.percentile(99))
+                for name, timer in self.phases.items()}
+
+    def draw_overlay(self, surface, pos=(10, 130), refresh=15):
+        """Blit a per-phase table of mean and p99 ms; the text is rebuilt every refresh frames"""
+        if not self.enabled:
+            return
+        self.overlay_frame += 1
+        if self.overlay is None or self.overlay_frame >= refresh:
+            self.overlay = self._render_overlay()
+            self.overlay_frame = 0
+        surface.blit(self.overlay, pos)
+
+    def _render_overlay(self):
+        # Phase names come from the shared label cache; the ever-changing numbers
+        # only borrow its font, so they do not push the HUD's labels out of it
+        text_cache = self.text_cache
+        font = text_cache.font(20)
+        white = (255, 255, 255)
+        rows = [("phase", "ms", "p99")]
+        rows += [(name, f"{mean:.2f}", f"{p99:.2f}") for name, (mean, p99) in self.stats().items()]
+        overlay = pygame.Surface((200, 6 + 18 * len(rows)), pygame.SRCALPHA)
+        overlay.fill((0, 0, 0, 160))
+        for i, (name, mean, p99) in enumerate(rows):
+            y = 4 + 18 * i
+            overlay.blit(text_cache.render(name, 20, white), (6, y))
+            # Proportional font: right-align the number columns by width
+            for text, right in ((mean, 130), (p99, 194)):
+                label = font.render(text, True, white)
+                overlay.blit(label, (right - label.get_width(), y))
+        return overlay
+
+    def export_trace(self, path):
+        """Write the recorded events as Chrome trace-event JSON"""
+        import json
+
+        events = [{"name": name, "cat": "frame", "ph": "X", "pid": 0, "tid": thread,
+                   "ts": (start - self.origin) / 1000, "dur": (end - start) / 1000}
+                  for name, start, end, thread in self.events]
+        with open(path, "w") as f:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f)
+        return len(events)
@@ -0,0 +1,38 @@
+"""Batched third-person camera projection"""
+import math
+
+import numpy as np
+
+# Render kinds, in the order the renderer builds its entity arrays
+WALL, PLAYER, BULLET, ENEMY, HOSTAGE, ALLY = range(6)
+
+
+def project(xs, ys, origin_x, origin_y, cam_angle, center_x, center_y):
+    """Project world points around the player into screen space in one pass
+
+    Returns (screen_x, screen_y, perspective, distance) arrays. Screen
+    coordinates are truncated toward zero like int() on single points.
+    """
+    rel_x = xs - origin_x
+    rel_y = ys - origin_y
+    cos_a = math.cos(-cam_angle)
+    sin_a = math.sin(-cam_angle)
+    rotated_x = rel_x * cos_a - rel_y * sin_a
+    rotated_y = rel_x * sin_a + rel_y * cos_a
+
+    distance = np.hypot(rel_x, rel_y)
+    perspective = 200 / (distance + 50)
+    screen_x = center_x + np.trunc(rotated_x * perspective).astype(np.int64)
+    screen_y = center_y + np.trunc(rotated_y * perspective * 0.5).astype(np.int64)
+    return screen_x, screen_y, perspective, distance
+
+
+def visible_mask(kinds, screen_x, screen_y, distance, width, height, max_distance=500):
+    """Frustum and range culling per render kind"""
+    # Walls and figures: in range and within a margin of the screen's sides
+    near = ((distance > 0) & (distance < max_distance) &
+            (screen_x > -100) & (screen_x < width + 100))
+    # Bullets: anywhere in range, but strictly on screen
+    on_screen = ((distance > 0) & (screen_x > 0) & (screen_x < width) &
+                 (screen_y > 0) & (screen_y < height))
+    return np.where(kinds == BULLET, on_screen, near) | (kinds == PLAYER)
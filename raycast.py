@@ -0,0 +1,210 @@
+"""First-person column raycaster over a rasterized wall grid
+
+    raycaster = Raycaster(wall_grid.boxes)
+    depth = raycaster.draw(screen, x, y, angle)
+
+Walls are rasterized once into a cell grid. Each frame casts one ray
+per screen column with a DDA that steps every ray a cell boundary at a
+time in lockstep, so the cost follows the screen width and view
+distance, not the number of walls. Wall slices are written straight into
+the surface's pixels, and the per-column distances come back as a depth
+buffer that sprites are clipped against with visible_spans.
+"""
+import math
+import warnings
+
+import numpy as np
+import pygame
+
+# Grid cell in world pixels; level walls should be laid out on multiples of it
+RAY_CELL = 10
+# Rays give up past this many world pixels
+MAX_DISTANCE = 800
+# Horizontal field of view
+FOV = math.radians(66)
+# World height of a wall, with the eye at half of it on the horizon
+WALL_HEIGHT = 60
+EYE_HEIGHT = WALL_HEIGHT / 2
+
+
+def visible_spans(depth, left, right, distance):
+    """Runs of columns [start, end) within [left, right) where walls are further than distance"""
+    left = max(left, 0)
+    right = min(right, len(depth))
+    if left >= right:
+        return []
+    clear = np.concatenate(([False], depth[left:right] > distance, [False]))
+    edges = np.flatnonzero(clear[1:] != clear[:-1]) + left
+    return list(zip(edges[::2].tolist(), edges[1::2].tolist()))
+
+
+# Raster cell values; EDGE rings the grid so rays stop there without bounds checks
+EMPTY, SOLID, EDGE = 0, 1, 2
+
+
+class Raycaster:
+    """Walls rasterized into a grid once, for casting a ray per screen column every frame
+
+    The grid spans the walls plus max_distance on every side. Nothing
+    outside it is closer than max_distance to a wall, so a ray that
+    reaches its edge can stop there. Walls off the cell grid are drawn
+    grown out to whole cells, with a warning.
+    """
+    def __init__(self, boxes, cell_size=RAY_CELL, max_distance=MAX_DISTANCE):
+        off_grid = int(np.any(np.mod(boxes, cell_size) != 0, axis=1).sum()) if len(boxes) else 0
+        if off_grid:
+            warnings.warn(f"{off_grid} of {len(boxes)} walls are off the {cell_size} px raycast grid; "
+                          "the first-person view draws them grown to whole cells", stacklevel=2)
+        self.cell_size = cell_size
+        self.max_distance = max_distance
+        margin = math.ceil(max_distance / cell_size) + 1
+        if len(boxes):
+            self.origin_x = (math.floor(boxes[:, 0].min() / cell_size) - margin) * cell_size
+            self.origin_y = (math.floor(boxes[:, 1].min() / cell_size) - margin) * cell_size
+            cols = math.ceil((boxes[:, 2].max() - self.origin_x) / cell_size) + margin
+            rows = math.ceil((boxes[:, 3].max() - self.origin_y) / cell_size) + margin
+        else:
+            self.origin_x = self.origin_y = 0
+            cols = rows = 2
+        # Indexed [column, row]; a cell is solid if any wall overlaps it
+        self.grid = np.full((cols, rows), EMPTY, dtype=np.int8)
+        for left, top, right, bottom in boxes.tolist():
+            c0 = math.floor((left - self.origin_x) / cell_size)
+            r0 = math.floor((top - self.origin_y) / cell_size)
+            c1 = math.ceil((right - self.origin_x) / cell_size)
+            r1 = math.ceil((bottom - self.origin_y) / cell_size)
+            self.grid[c0:c1, r0:r1] = SOLID
+        self.grid[[0, -1], :] = EDGE
+        self.grid[:, [0, -1]] = EDGE
+        # Gray levels mapped to the pixel format of the surface last drawn on
+        self.shades = None
+        self.shades_format = None
+
+    def rays(self, angle, width):
+        """Per-column ray directions, scaled so distances along them are perpendicular to the view"""
+        plane = math.tan(FOV / 2)
+        # Column centres from -1 at the left edge to 1 at the right
+        camera = (2 * np.arange(width) + 1) / width - 1
+        forward_x, forward_y = math.cos(angle), math.sin(angle)
+        # With y pointing down, the view's right is a quarter turn clockwise
+        return forward_x - forward_y * plane * camera, forward_y + forward_x * plane * camera
+
+    def focal_length(self, width):
+        """Screen pixels per world pixel at unit distance for a view this wide"""
+        return width / 2 / math.tan(FOV / 2)
+
+    def cast(self, x, y, angle, width):
+        """Depth of the first wall along each column's ray, and whether it was hit on a y face
+
+        Depths are perpendicular distances in world pixels, inf where a
+        ray goes max_distance without hitting a wall.
+        """
+        depth = np.full(width, np.inf)
+        y_face = np.zeros(width, dtype=bool)
+        cell = self.cell_size
+        grid = self.grid
+        pos_x = (x - self.origin_x) / cell
+        pos_y = (y - self.origin_y) / cell
+        start_x = math.floor(pos_x)
+        start_y = math.floor(pos_y)
+        if not (0 < start_x < grid.shape[0] - 1 and 0 < start_y < grid.shape[1] - 1):
+            # Out here every wall is further than max_distance
+            return depth, y_face
+
+        ray_x, ray_y = self.rays(angle, width)
+        with np.errstate(divide="ignore"):
+            delta_x = np.abs(1 / ray_x)
+            delta_y = np.abs(1 / ray_y)
+        step_x = np.where(ray_x < 0, -1, 1)
+        step_y = np.where(ray_y < 0, -1, 1)
+        # Distance along each ray to its first x and y cell boundary
+        with np.errstate(invalid="ignore"):
+            side_x = np.where(ray_x < 0, pos_x - start_x, start_x + 1 - pos_x) * delta_x
+            side_y = np.where(ray_y < 0, pos_y - start_y, start_y + 1 - pos_y) * delta_y
+        side_x[np.isnan(side_x)] = np.inf
+        side_y[np.isnan(side_y)] = np.inf
+        map_x = np.full(width, start_x, dtype=np.intp)
+        map_y = np.full(width, start_y, dtype=np.intp)
+
+        # Every array describes the rays still walking; columns maps them back to the screen
+        columns = np.arange(width)
+        limit = self.max_distance / cell
+        while len(columns):
+            across_y = side_y < side_x
+            across_x = ~across_y
+            # Distance at the boundary being crossed, then step into the next cell
+            reached = np.minimum(side_x, side_y)
+            map_x += step_x * across_x
+            map_y += step_y * across_y
+            side_x += np.where(across_x, delta_x, 0)
+            side_y += np.where(across_y, delta_y, 0)
+
+            value = grid[map_x, map_y]
+            stop = (value != EMPTY) | (reached > limit)
+            if not stop.any():
+                continue
+            hit = np.flatnonzero(value == SOLID)
+            depth[columns[hit]] = reached[hit] * cell
+            y_face[columns[hit]] = across_y[hit]
+            walking = ~stop
+            columns, map_x, map_y, side_x, side_y, delta_x, delta_y, step_x, step_y = (
+                a[walking] for a in (columns, map_x, map_y, side_x, side_y, delta_x, delta_y, step_x, step_y))
+        return depth, y_face
+
+    def shades_for(self, surface):
+        """Lookup from gray level to surface's pixel values"""
+        surface_format = (surface.get_bitsize(), surface.get_masks())
+        if self.shades_format != surface_format:
+            self.shades = np.array([surface.map_rgb((level, level, level)) for level in range(256)],
+                                   dtype=np.uint32)
+            self.shades_format = surface_format
+        return self.shades
+
+    def draw(self, surface, x, y, angle):
+        """Cast from (x, y) facing angle and paint the wall slices into surface; returns the depth buffer"""
+        width, height = surface.get_size()
+        depth, y_face = self.cast(x, y, angle, width)
+        focal = self.focal_length(width)
+        horizon = height // 2
+
+        # Slice extents per column, clipped to the screen; columns without a wall get none
+        with np.errstate(divide="ignore"):
+            scale = focal / depth
+        top = np.clip(np.ceil(horizon - scale * (WALL_HEIGHT - EYE_HEIGHT)), 0, height).astype(np.intp)
+        bottom = np.clip(np.ceil(horizon + scale * EYE_HEIGHT), 0, height).astype(np.intp)
+        bottom = np.maximum(bottom, top)
+        low = int(top.min())
+        high = int(bottom.max())
+        if low >= high:
+            return depth
+
+        # Nearer walls are lit brighter, and y faces are shaded darker for contrast
+        light = 50 + np.maximum(0, 100 - np.minimum(depth, self.max_distance) // 3)
+        gray = np.where(y_face, light * 0.75, light).astype(np.intp)
+        colors = self.shades_for(surface)[gray]
+
+        # Only the band of rows some slice covers is touched
+        rows = np.arange(low, high)
+        mask = (rows >= top[:, None]) & (rows < bottom[:, None])
+        pixels = pygame.surfarray.pixels2d(surface)
+        try:
+            # Boolean assignment visits columns in order, each one's rows top to bottom
+            pixels[:, low:high][mask] = np.repeat(colors, bottom - top)
+        finally:
+            del pixels
+        return depth
+
+    def project(self, xs, ys, x, y, angle, width):
+        """Screen x and view depth of world points, for sprites in the raycast view
+
+        Points behind the eye get a depth <= 0 and should be skipped.
+        """
+        rel_x = xs - x
+        rel_y = ys - y
+        cos_a = math.cos(angle)
+        sin_a = math.sin(angle)
+        forward = rel_x * cos_a + rel_y * sin_a
+        right = rel_y * cos_a - rel_x * sin_a
+        with np.errstate(divide="ignore", invalid="ignore"):
+            screen_x = width / 2 + self.focal_length(width) * right / forward
+        return screen_x, forward
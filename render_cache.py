@@ -0,0 +1,103 @@
+"""Caches for surfaces that are expensive to draw but rarely change"""
+from collections import OrderedDict
+
+import pygame
+
+
+class LayerCache:
+    """Full-screen layers painted once per resolution and variant, then just blitted
+
+    paint(size, variant) builds the surface on a miss. Asking for a different
+    size than last time drops every cached layer, so a resolution change
+    repaints everything once.
+    """
+    def __init__(self):
+        self.size = None
+        self.layers = {}
+
+    def get(self, name, size, variant, paint):
+        if size != self.size:
+            self.invalidate()
+            self.size = size
+        key = (name, variant)
+        layer = self.layers.get(key)
+        if layer is None:
+            layer = self.layers[key] = paint(size, variant)
+        return layer
+
+    def invalidate(self):
+        self.layers.clear()
+
+
+class TextCache:
+    """Shared fonts by size plus an LRU of rendered text surfaces
+
+    Surfaces are keyed by (text, size, color), so a label is only rendered
+    again when its text actually changes. Callers must not modify returned
+    surfaces; copy them first.
+    """
+    def __init__(self, max_entries=256, size_step=4):
+        self.max_entries = max_entries
+        self.size_step = size_step
+        self.fonts = {}
+        self.surfaces = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def font(self, size):
+        font = self.fonts.get(size)
+        if font is None:
+            font = self.fonts[size] = pygame.font.Font(None, size)
+        return font
+
+    def quantize(self, size):
+        """Snap perspective-scaled sizes to a few steps so they share fonts and renders"""
+        step = self.size_step
+        return max(step, int(round(size / step)) * step)
+
+    def render(self, text, size, color):
+        key = (text, size, color)
+        surface = self.surfaces.get(key)
+        if surface is not None:
+            self.hits += 1
+            self.surfaces.move_to_end(key)
+            return surface
+
+        self.misses += 1
+        surface = self.surfaces[key] = self.font(size).render(text, True, color)
+        if len(self.surfaces) > self.max_entries:
+            self.surfaces.popitem(last=False)
+        return surface
+
+
+class SpriteCache:
+    """LRU of pre-rendered sprites keyed by (color, quantized scale)
+
+    paint(color, scale) returns (surface, (anchor_x, anchor_y)), where the
+    anchor is the pixel that lines up with the figure's draw position.
+    """
+    def __init__(self, paint, max_entries=512, scale_step=0.05):
+        self.paint = paint
+        self.max_entries = max_entries
+        self.scale_step = scale_step
+        self.sprites = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def quantize(self, scale):
+        step = self.scale_step
+        return max(1, int(round(scale / step))) * step
+
+    def get(self, color, scale):
+        key = (color, self.quantize(scale))
+        sprite = self.sprites.get(key)
+        if sprite is not None:
+            self.hits += 1
+            self.sprites.move_to_end(key)
+            return sprite
+
+        self.misses += 1
+        sprite = self.sprites[key] = self.paint(*key)
+        if len(self.sprites) > self.max_entries:
+            self.sprites.popitem(last=False)
+        return sprite
@@ -0,0 +1,164 @@
+"""Deterministic input recording and replay
+
+A recording is a small header (magic, version, game seed) followed by one
+3-byte record per mission tick: a bitmask of the held keys, the mouse
+click and a restart flag, then mouse_dx as a signed 16-bit integer.
+Replaying a recording against a Game built with the same seed and level
+reproduces the run exactly.
+
+Usage:
+
+    python Game.py --record run.rec
+    python replay.py run.rec            # headless, as fast as possible
+    python replay.py run.rec --render   # drawn every tick, uncapped
+"""
+import struct
+import time
+
+import pygame
+
+MAGIC = b"HMRP"
+VERSION = 1
+HEADER = struct.Struct("<4sHq")
+RECORD = struct.Struct("<Bh")
+
+# Keys the mission reads, in bitmask order
+RECORDED_KEYS = (pygame.K_w, pygame.K_a, pygame.K_s, pygame.K_d, pygame.K_q)
+CLICK_BIT = 1 << 6
+RESTART_BIT = 1 << 7
+
+
+class KeyState:
+    """Stand-in for pygame.key.get_pressed() built from a set of held keys"""
+    def __init__(self, held=()):
+        self.held = frozenset(held)
+
+    def __getitem__(self, key):
+        return key in self.held
+
+
+def key_mask(keys):
+    """Bitmask of the RECORDED_KEYS held in keys"""
+    mask = 0
+    for bit, key in enumerate(RECORDED_KEYS):
+        if keys[key]:
+            mask |= 1 << bit
+    return mask
+
+
+def keys_from_mask(mask):
+    return KeyState(key for bit, key in enumerate(RECORDED_KEYS) if mask & (1 << bit))
+
+
+class InputRecorder:
+    """Streams (keys, mouse_dx, mouse_click) for every mission tick to a file"""
+    def __init__(self, path, seed):
+        self.file = open(path, "wb")
+        self.file.write(HEADER.pack(MAGIC, VERSION, seed))
+        self.restart_pending = False
+
+    def mark_restart(self):
+        """Flag the next recorded tick as the first one after Game.restart()"""
+        self.restart_pending = True
+
+    def record(self, keys, mouse_dx, mouse_click):
+        mask = key_mask(keys)
+        if mouse_click:
+            mask |= CLICK_BIT
+        if self.restart_pending:
+            mask |= RESTART_BIT
+            self.restart_pending = False
+        self.file.write(RECORD.pack(mask, max(-32768, min(32767, int(mouse_dx)))))
+
+    def close(self):
+        self.file.close()
+
+
+class InputReplay:
+    """Reads a recording back as (keys, mouse_dx, mouse_click, restart) per tick"""
+    def __init__(self, path):
+        with open(path, "rb") as f:
+            data = f.read()
+        magic, version, self.seed = HEADER.unpack_from(data)
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not an input recording")
+        if version != VERSION:
+            raise ValueError(f"{path} has recording version {version}, expected {VERSION}")
+        body = memoryview(data)[HEADER.size:]
+        self.records = list(RECORD.iter_unpack(body[:len(body) - len(body) % RECORD.size]))
+
+    def __len__(self):
+        return len(self.records)
+
+    def __iter__(self):
+        for mask, mouse_dx in self.records:
+            yield keys_from_mask(mask), mouse_dx, bool(mask & CLICK_BIT), bool(mask & RESTART_BIT)
+
+
+def state_digest(game):
+    """Hash of the simulation state, equal for equal runs"""
+    import hashlib
+
+    h = hashlib.sha256()
+    player = game.player
+    h.update(struct.pack("<dddd?", player.x, player.y, player.angle, player.health,
+                         player.weapon == "gun"))
+    h.update(struct.pack("<q8s", game.tick, game.state.encode()))
+    for store in (game.enemies, game.bullets):
+        for name in store.FIELDS:
+            h.update(getattr(store, name)[:len(store)].tobytes())
+    h.update(game.hostages.saved.tobytes())
+    return h.hexdigest()[:16]
+
+
+def run_replay(game, replay, render=False):
+    """Feed a recording into game.handle_mission; returns per-tick seconds"""
+    import Game
+
+    timings = []
+    for keys, mouse_dx, mouse_click, restart in replay:
+        start = time.perf_counter()
+        if restart:
+            game.restart()
+        if game.state == Game.MISSION:
+            game.handle_mission(keys, mouse_dx, mouse_click)
+        if render:
+            pygame.event.pump()
+            if game.state == Game.MISSION:
+                game.draw_mission()
+            pygame.display.flip()
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Replay a recorded mission")
+    parser.add_argument("recording")
+    parser.add_argument("--render", action="store_true", help="draw every tick in a window")
+    parser.add_argument("--level", help="level file the recording was made on")
+    args = parser.parse_args(argv)
+
+    # Imported late: Game imports this module
+    import Game
+    from level import Level
+
+    if args.render:
+        Game.init_display()
+    replay = InputReplay(args.recording)
+    game = Game.Game(Level.load(args.level) if args.level else None, seed=replay.seed)
+    timings = sorted(run_replay(game, replay, args.render))
+
+    total = sum(timings)
+    if timings:
+        p50 = timings[len(timings) // 2] * 1000
+        p99 = timings[min(len(timings) - 1, int(len(timings) * 0.99))] * 1000
+        print(f"{len(timings)} ticks in {total:.3f}s ({len(timings) / total:.0f} ticks/sec), "
+              f"p50 {p50:.3f} ms, p99 {p99:.3f} ms")
+    print(f"end state: {game.state}, digest {state_digest(game)}")
+    pygame.quit()
+
+
+if __name__ == "__main__":
+    main()
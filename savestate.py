@@ -0,0 +1,228 @@
+"""Binary save states of a running mission, and a per-tick ring buffer of them
+
+    data = save_state(game)
+    ...
+    restore_state(game, data)   # back to exactly where it was
+
+A save state is a fixed header (tick, state, timers, slow motion and the
+entity counts), the simulation RNG's Mersenne Twister words, then the
+live prefix of every player, hostage, enemy and bullet array as raw
+bytes. Restoring writes into the Game's
+existing objects and arrays, so it allocates almost nothing. Everything
+the simulation reads is covered; the level is assumed to be the same,
+and drawing-only state (render_rng, fog, cached screens) is left alone.
+Save states use native byte order: they are for rewinding this process,
+not for files shared between machines.
+
+    python savestate.py --ticks 3000
+
+reports save state sizes and save/restore latency over a headless run.
+"""
+import array
+import struct
+import time
+
+import numpy as np
+
+MAGIC = b"HMST"
+VERSION = 3
+# magic, version, tick, state, slow_motion, slow_motion_timer, hostages_saved,
+# timeskip/ending/death timers, head_turn_angle, then player, hostage, enemy and bullet
+# counts and the enemies' next id
+HEADER = struct.Struct("=4sHq8s?iiiiidHHIIq")
+# Mersenne Twister words and position, then gauss_next (present flag, value)
+RNG_WORDS = struct.Struct("=625I")
+GAUSS = struct.Struct("=?d")
+
+
+def save_state(game):
+    """Everything needed to put game back in its current simulation state, as bytes"""
+    enemies = game.enemies
+    bullets = game.bullets
+    n = len(enemies)
+    b = len(bullets)
+    version, words, gauss_next = game.rng.getstate()
+    parts = [
+        HEADER.pack(MAGIC, VERSION, game.tick, game.state.encode(), game.slow_motion,
+                    game.slow_motion_timer, game.hostages_saved, game.timeskip_timer,
+                    game.ending_timer, game.death_timer, game.head_turn_angle, len(game.players),
+                    len(game.hostages), n, b, enemies.next_id),
+        # array packs the 625 words about twice as fast as struct
+        array.array("I", words).tobytes(),
+        GAUSS.pack(gauss_next is not None, gauss_next or 0.0),
+    ]
+    for store, count in ((game.players, len(game.players)), (game.hostages, len(game.hostages)),
+                         (enemies, n), (bullets, b)):
+        parts += [getattr(store, name)[:count].tobytes() for name in store.FIELDS]
+    return b"".join(parts)
+
+
+def _restore_store(store, count, data, offset):
+    if count > len(store.x):
+        # Only enemies and bullets come and go; player and hostage counts were checked
+        store._grow(count)
+    store.count = count
+    for name in store.FIELDS:
+        column = getattr(store, name)
+        column[:count] = np.frombuffer(data, dtype=column.dtype, count=count, offset=offset)
+        offset += count * column.itemsize
+    return offset
+
+
+def restore_state(game, data):
+    """Put game back in the simulation state save_state returned
+
+    The game must be on the same level with the same number of players.
+    Per-tick caches and interpolation state are dropped, since they
+    belong to the timeline being left.
+    """
+    (magic, version, tick, state, slow_motion, slow_motion_timer, hostages_saved, timeskip_timer,
+     ending_timer, death_timer, head_turn_angle, players, hostages, enemies, bullets,
+     next_id) = HEADER.unpack_from(data)
+    if magic != MAGIC or version != VERSION:
+        raise ValueError("not a save state of this version")
+    if players != len(game.players) or hostages != len(game.hostages):
+        raise ValueError(f"save state has {players} players and {hostages} hostages, "
+                         f"game has {len(game.players)} and {len(game.hostages)}")
+
+    game.tick = tick
+    game.state = state.rstrip(b"\0").decode()
+    game.slow_motion = slow_motion
+    game.slow_motion_timer = slow_motion_timer
+    game.hostages_saved = hostages_saved
+    game.timeskip_timer = timeskip_timer
+    game.ending_timer = ending_timer
+    game.death_timer = death_timer
+    game.head_turn_angle = head_turn_angle
+    offset = HEADER.size
+
+    words = RNG_WORDS.unpack_from(data, offset)
+    offset += RNG_WORDS.size
+    has_gauss, gauss_next = GAUSS.unpack_from(data, offset)
+    offset += GAUSS.size
+    game.rng.setstate((3, words, gauss_next if has_gauss else None))
+
+    offset = _restore_store(game.players, players, data, offset)
+    offset = _restore_store(game.hostages, hostages, data, offset)
+    offset = _restore_store(game.enemies, enemies, data, offset)
+    game.enemies.next_id = next_id
+    _restore_store(game.bullets, bullets, data, offset)
+
+    game.los_cache.clear()
+    game.los_cache_tick = -1
+    game.prev_player = None
+    game.prev_enemies = None
+    game.screen_shown = None
+
+
+class StateHistory:
+    """Save states of the last `capacity` ticks, for rewinding and rollback
+
+    record() after each tick keeps that tick's state; restore(game, tick)
+    goes back to any tick still held. Restoring discards the ticks after
+    it, so recording from there on overwrites the abandoned future.
+    """
+    def __init__(self, capacity=600):
+        self.capacity = capacity
+        self.states = [None] * capacity
+        self.ticks = [-1] * capacity
+        self.newest = -1
+
+    def record(self, game):
+        slot = game.tick % self.capacity
+        self.states[slot] = save_state(game)
+        self.ticks[slot] = game.tick
+        self.newest = game.tick
+
+    def __contains__(self, tick):
+        return (self.newest - self.capacity < tick <= self.newest and
+                self.ticks[tick % self.capacity] == tick)
+
+    def oldest(self):
+        """Earliest tick that can still be restored, or None when empty"""
+        if self.newest < 0:
+            return None
+        for tick in range(max(0, self.newest - self.capacity + 1), self.newest + 1):
+            if tick in self:
+                return tick
+        return None
+
+    def restore(self, game, tick):
+        if tick not in self:
+            raise KeyError(f"tick {tick} is not in the history")
+        restore_state(game, self.states[tick % self.capacity])
+        self.newest = tick
+
+    def nbytes(self):
+        return sum(len(state) for state in self.states if state is not None)
+
+
+def main(argv=None):
+    # Imported here so that importing Game does not pull in argparse
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Measure save state size and save/restore latency")
+    parser.add_argument("--ticks", type=int, default=3000, help="headless ticks to record")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--players", type=int, default=1)
+    parser.add_argument("--history", type=int, default=600, help="ticks kept in the ring buffer")
+    args = parser.parse_args(argv)
+
+    # Imported late: Game imports this module
+    from Game import Game, MISSION
+    from headless import RandomPilot
+    from replay import state_digest
+
+    game = Game(seed=args.seed, players=args.players)
+    pilots = [RandomPilot(args.seed + i) for i in range(args.players)]
+    history = StateHistory(args.history)
+    # Inputs that led to each game tick, and the digest right after it
+    inputs = {}
+    digests = {}
+    saves = []
+    sizes = []
+    for tick in range(args.ticks):
+        if game.state != MISSION:
+            game.restart()
+            # Ticks count again from zero, so the old run's history no longer applies
+            history = StateHistory(args.history)
+            inputs.clear()
+            digests.clear()
+        frame = [pilot(tick) for pilot in pilots]
+        game.handle_players(frame)
+        start = time.perf_counter()
+        history.record(game)
+        saves.append(time.perf_counter() - start)
+        sizes.append(len(history.states[game.tick % history.capacity]))
+        inputs[game.tick] = frame
+        digests[game.tick] = state_digest(game)
+        inputs.pop(game.tick - history.capacity, None)
+        digests.pop(game.tick - history.capacity, None)
+
+    # Rewind to random recent ticks, checking that re-simulating one tick matches
+    rng = np.random.default_rng(args.seed)
+    digest = state_digest(game)
+    final = save_state(game)
+    restores = []
+    # The newest tick has no successor to compare against
+    oldest = history.oldest()
+    ticks = rng.integers(oldest, history.newest, 200).tolist() if oldest < history.newest else []
+    for tick in ticks:
+        start = time.perf_counter()
+        restore_state(game, history.states[tick % history.capacity])
+        restores.append(time.perf_counter() - start)
+        game.handle_players(inputs[tick + 1])
+        assert state_digest(game) == digests[tick + 1], f"re-simulating tick {tick + 1} diverged"
+    restore_state(game, final)
+    assert state_digest(game) == digest, "restoring the final state changed the digest"
+
+    saves = np.array(saves) * 1e6
+    restores = np.array(restores) * 1e6
+    print(f"{args.ticks} ticks, {args.players} player(s): save state {np.mean(sizes):.0f} B mean, "
+          f"{max(sizes)} B max; {args.history}-tick history holds {history.nbytes() / 1024:.0f} KiB")
+    print(f"save p50 {np.percentile(saves, 50):.1f} us, p99 {np.percentile(saves, 99):.1f} us; "
+          f"restore p50 {np.percentile(restores, 50):.1f} us, p99 {np.percentile(restores, 99):.1f} us")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,246 @@
+"""Authoritative co-op server: runs the mission and streams snapshots over UDP
+
+    python server.py --players 4 --seconds 60
+
+Clients (see client.py) send their input every frame; the server applies
+the latest input of every slot each fixed tick with Game.handle_players,
+then sends each client a snapshot delta-compressed against the last
+snapshot that client acknowledged (see netcode.py). Slots without a
+connected client stand idle. After a death or a completed mission the
+game restarts once restart_delay seconds have passed.
+"""
+import os
+
+# Keep pygame's import banner out of the stats
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+import argparse
+import errno
+import socket
+import time
+from collections import OrderedDict
+
+import numpy as np
+import pygame
+
+from Game import Game, MISSION, TICK_RATE, TICK_SECONDS, IDLE_KEYS
+from level import Level
+import netcode
+
+
+class ClientSlot:
+    """A connected client: its address, pending input and the snapshots it may ack"""
+    def __init__(self, address, now):
+        self.address = address
+        self.keys = IDLE_KEYS
+        self.mouse_dx = 0
+        self.mouse_click = False
+        self.input_sequence = -1
+        self.acked = None
+        self.sent = OrderedDict()
+        self.last_heard = now
+
+    def take_input(self):
+        """Input for the next tick; turning and clicks accumulate until a tick consumes them"""
+        mouse_dx, self.mouse_dx = self.mouse_dx, 0
+        mouse_click, self.mouse_click = self.mouse_click, False
+        return self.keys, mouse_dx, mouse_click
+
+
+class ServerStats:
+    """Tick times, bytes sent and datagrams dropped since the last report"""
+    def __init__(self):
+        self.tick_ms = []
+        self.bytes = 0
+        self.packets = 0
+        # Datagrams the socket refused: over the 64 KiB limit, or a full send buffer
+        self.dropped = 0
+        self.full = []
+        self.delta = []
+
+    def report(self, seconds, clients):
+        tick_ms = np.array(self.tick_ms or [0.0])
+        rate = self.bytes / 1024 / seconds if seconds > 0 else 0.0
+        per_client = rate / clients if clients else 0.0
+        full = np.mean(self.full) if self.full else 0.0
+        delta = np.mean(self.delta) if self.delta else 0.0
+        return (f"{clients} clients  tick p50 {np.percentile(tick_ms, 50):.2f}ms "
+                f"p99 {np.percentile(tick_ms, 99):.2f}ms  {rate:.1f} KB/s ({per_client:.1f} per client)  "
+                f"snapshot {full:.0f}B full / {delta:.0f}B delta  {self.dropped} dropped")
+
+
+class GameServer:
+    """Runs one co-op Game at TICK_RATE for up to `players` UDP clients"""
+    def __init__(self, players=2, seed=0, level=None, host="127.0.0.1", port=netcode.DEFAULT_PORT,
+                 history=64, timeout=5.0, restart_delay=3.0):
+        self.game = Game(level, seed, players)
+        self.seed = seed
+        self.history = history
+        self.timeout = timeout
+        self.restart_delay = restart_delay
+        self.slots = [None] * players
+        self.by_address = {}
+        self.sequence = 0
+        self.ended_at = None
+        self.stats = ServerStats()
+
+        self.socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.socket.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, 1 << 20)
+        self.socket.bind((host, port))
+        self.socket.setblocking(False)
+
+    def poll(self, now):
+        """Handle every packet waiting on the socket"""
+        while True:
+            try:
+                data, address = self.socket.recvfrom(2048)
+            except BlockingIOError:
+                return
+            except ConnectionResetError:
+                continue
+            if not data:
+                continue
+            kind = data[0]
+            slot = self.by_address.get(address)
+            if kind == netcode.HELLO:
+                self.welcome(address, slot, now)
+            elif kind == netcode.INPUT and slot is not None and len(data) >= netcode.INPUT_PACKET.size:
+                self.receive_input(self.slots[slot], data, now)
+            elif kind == netcode.BYE and slot is not None:
+                self.disconnect(slot)
+
+    def welcome(self, address, slot, now):
+        if slot is None and None in self.slots:
+            slot = self.slots.index(None)
+            self.slots[slot] = ClientSlot(address, now)
+            self.by_address[address] = slot
+        # A repeated HELLO gets the same answer, in case the WELCOME was lost
+        self.send(netcode.WELCOME_PACKET.pack(netcode.WELCOME, -1 if slot is None else slot, self.seed),
+                  address)
+
+    def receive_input(self, client, data, now):
+        sequence, ack, keys, mouse_dx, mouse_click = netcode.decode_input(data)
+        client.last_heard = now
+        if ack in client.sent and (client.acked is None or ack > client.acked):
+            client.acked = ack
+        # Late packets still count their turning and clicks, but never roll back the held keys
+        if sequence > client.input_sequence:
+            client.input_sequence = sequence
+            client.keys = keys
+        client.mouse_dx += mouse_dx
+        client.mouse_click = client.mouse_click or mouse_click
+
+    def disconnect(self, slot):
+        del self.by_address[self.slots[slot].address]
+        self.slots[slot] = None
+
+    def send(self, data, address):
+        try:
+            self.socket.sendto(data, address)
+        except ConnectionRefusedError:
+            return
+        except BlockingIOError:
+            self.stats.dropped += 1
+            return
+        except OSError as error:
+            if error.errno != errno.EMSGSIZE:
+                raise
+            self.stats.dropped += 1
+            return
+        self.stats.bytes += len(data)
+        self.stats.packets += 1
+
+    def tick(self, now):
+        """One fixed step: simulate, restart if due, then send every client its snapshot"""
+        game = self.game
+        for slot, client in enumerate(self.slots):
+            if client is not None and now - client.last_heard > self.timeout:
+                self.disconnect(slot)
+
+        if game.state == MISSION:
+            game.handle_players([client.take_input() if client else (IDLE_KEYS, 0, False)
+                                 for client in self.slots])
+        else:
+            game.update_screen()
+            if self.ended_at is None:
+                self.ended_at = now
+            elif now - self.ended_at >= self.restart_delay:
+                self.seed += 1
+                game.restart(self.seed)
+                self.ended_at = None
+
+        tables = netcode.capture_tables(game)
+        self.sequence += 1
+        # Clients that acked the same snapshot get the same delta
+        bodies = {}
+        for slot, client in enumerate(self.slots):
+            if client is None:
+                continue
+            base_sequence = client.acked if client.acked in client.sent else None
+            body = bodies.get(base_sequence)
+            if body is None:
+                body = bodies[base_sequence] = netcode.encode_tables(tables, client.sent.get(base_sequence))
+            data = netcode.encode_header(self.sequence, game, slot, base_sequence) + body
+            (self.stats.full if base_sequence is None else self.stats.delta).append(len(data))
+            client.sent[self.sequence] = tables
+            while len(client.sent) > self.history:
+                client.sent.popitem(last=False)
+            self.send(data, client.address)
+
+    def run(self, seconds=None, report_every=5.0):
+        """Tick at TICK_RATE until seconds have passed (forever if None)"""
+        start = next_tick = last_report = time.perf_counter()
+        while seconds is None or time.perf_counter() - start < seconds:
+            now = time.perf_counter()
+            self.poll(now)
+            if now < next_tick:
+                time.sleep(min(next_tick - now, 0.002))
+                continue
+            tick_start = time.perf_counter()
+            self.tick(now)
+            self.stats.tick_ms.append((time.perf_counter() - tick_start) * 1000)
+            next_tick += TICK_SECONDS
+            if now - next_tick > 5 * TICK_SECONDS:
+                # Too far behind to catch up: drop the backlog instead of spiralling
+                next_tick = now
+
+            if report_every and now - last_report >= report_every:
+                print(self.stats.report(now - last_report, self.connected()), flush=True)
+                self.stats = ServerStats()
+                last_report = now
+        end = time.perf_counter()
+        if self.stats.tick_ms:
+            print(self.stats.report(end - last_report, self.connected()), flush=True)
+
+    def connected(self):
+        return sum(client is not None for client in self.slots)
+
+    def close(self):
+        self.socket.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Host a co-op mission over UDP")
+    parser.add_argument("--players", type=int, default=4, help="player slots in the mission")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=netcode.DEFAULT_PORT)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--level", help="level file to host instead of the built-in mission")
+    parser.add_argument("--seconds", type=float, help="stop after this long (default: run until interrupted)")
+    parser.add_argument("--report", type=float, default=5.0, help="seconds between stats lines")
+    args = parser.parse_args(argv)
+
+    server = GameServer(args.players, args.seed, Level.load(args.level) if args.level else None,
+                        args.host, args.port)
+    print(f"Serving {args.players} slots on {args.host}:{args.port} at {TICK_RATE} ticks/sec", flush=True)
+    try:
+        server.run(args.seconds, args.report)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.close()
+        pygame.quit()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,212 @@
+"""Immutable world snapshots and a render thread that draws them
+
+The simulation captures a WorldSnapshot after its ticks and hands it to a
+RenderThread through a SnapshotBuffer. Snapshots copy only what drawing
+needs, with read-only arrays, so the render thread can draw one while the
+simulation already runs the next tick. pygame releases the GIL inside
+blits and fills, which is where the two threads overlap.
+"""
+import threading
+from typing import NamedTuple
+
+import numpy as np
+
+
+class PlayerState(NamedTuple):
+    x: float
+    y: float
+    angle: float
+    health: float
+    max_health: float
+    weapon: str
+    camera_distance: float = 150
+
+
+class HostageState(NamedTuple):
+    x: float
+    y: float
+    saved: bool
+
+
+def _frozen(array):
+    array = array.copy()
+    array.flags.writeable = False
+    return array
+
+
+class Columns:
+    """Read-only parallel arrays, e.g. copied from a structure-of-arrays store"""
+    def __init__(self, count, **arrays):
+        self.count = count
+        for name, array in arrays.items():
+            setattr(self, name, _frozen(np.asarray(array)[:count]))
+
+    @classmethod
+    def copy(cls, store, fields):
+        return cls(len(store), **{name: getattr(store, name) for name in fields})
+
+    def __len__(self):
+        return self.count
+
+
+def player_state(player):
+    return PlayerState(player.x, player.y, player.angle, player.health, player.max_health,
+                       player.weapon, player.camera_distance)
+
+
+class WorldSnapshot:
+    """Everything the mission view draws, as of the end of one tick
+
+    player is the one the camera follows; allies are the other living
+    players of a co-op mission.
+    """
+    __slots__ = ("tick", "state", "slow_motion", "hostages_saved", "player", "allies", "enemies",
+                 "bullets", "hostages", "prev_player", "prev_enemies")
+
+    def __init__(self, tick, state, slow_motion, hostages_saved, player, allies, enemies, bullets,
+                 hostages, prev_player=None, prev_enemies=None):
+        self.tick = tick
+        self.state = state
+        self.slow_motion = slow_motion
+        self.hostages_saved = hostages_saved
+        self.player = player
+        self.allies = allies
+        self.enemies = enemies
+        self.bullets = bullets
+        self.hostages = hostages
+        # Positions before the tick, for frames drawn between ticks
+        self.prev_player = prev_player
+        self.prev_enemies = prev_enemies
+
+    @classmethod
+    def capture(cls, game):
+        hostages = game.hostages
+        prev_enemies = None
+        if game.prev_enemies is not None:
+            prev_enemies = tuple(map(_frozen, game.prev_enemies))
+        return cls(game.tick, game.state, game.slow_motion, game.hostages_saved,
+                   player_state(game.player),
+                   tuple(player_state(p) for p in game.players if p is not game.player and p.health > 0),
+                   Columns.copy(game.enemies, ("ids", "x", "y", "health", "max_health")),
+                   Columns.copy(game.bullets, ("x", "y", "angle", "friendly", "vx", "vy")),
+                   tuple(map(HostageState, hostages.x.tolist(), hostages.y.tolist(), hostages.saved.tolist())),
+                   game.prev_player, prev_enemies)
+
+    def render_positions(self, alpha):
+        """Player pose plus bullet and enemy positions, alpha of the way from the previous tick
+
+        alpha 1 (or no remembered tick) gives the positions at the end of the tick.
+        """
+        player = self.player
+        bullet_xs = self.bullets.x
+        bullet_ys = self.bullets.y
+        enemy_xs = self.enemies.x
+        enemy_ys = self.enemies.y
+        if alpha >= 1 or self.prev_player is None:
+            return (player.x, player.y, player.angle), bullet_xs, bullet_ys, enemy_xs, enemy_ys
+
+        prev_x, prev_y, prev_angle = self.prev_player
+        pose = (prev_x + (player.x - prev_x) * alpha,
+                prev_y + (player.y - prev_y) * alpha,
+                prev_angle + (player.angle - prev_angle) * alpha)
+
+        # Bullets fly in straight lines, so their last step is just their velocity
+        back = 1 - alpha
+        bullet_xs = bullet_xs - self.bullets.vx * back
+        bullet_ys = bullet_ys - self.bullets.vy * back
+
+        # Enemies keep spawn order through removals, so ids stay sorted for matching
+        prev_ids, prev_xs, prev_ys = self.prev_enemies
+        if len(prev_ids):
+            ids = self.enemies.ids
+            slot = np.minimum(np.searchsorted(prev_ids, ids), len(prev_ids) - 1)
+            known = prev_ids[slot] == ids
+            enemy_xs = np.where(known, prev_xs[slot] + (enemy_xs - prev_xs[slot]) * alpha, enemy_xs)
+            enemy_ys = np.where(known, prev_ys[slot] + (enemy_ys - prev_ys[slot]) * alpha, enemy_ys)
+        return pose, bullet_xs, bullet_ys, enemy_xs, enemy_ys
+
+
+class SnapshotBuffer:
+    """Front and back slots for (snapshot, alpha) frames
+
+    publish() fills the back slot and swaps it to the front; take() blocks
+    until a frame newer than the last one taken is at the front. Frames the
+    reader never got to are simply replaced.
+    """
+    def __init__(self):
+        self.slots = [None, None]
+        self.front = 0
+        self.version = 0
+        self.taken = 0
+        self.condition = threading.Condition()
+
+    def publish(self, frame):
+        with self.condition:
+            back = 1 - self.front
+            self.slots[back] = frame
+            self.front = back
+            self.version += 1
+            self.condition.notify()
+
+    def take(self):
+        with self.condition:
+            self.condition.wait_for(lambda: self.version != self.taken)
+            self.taken = self.version
+            return self.slots[self.front]
+
+
+class RenderThread:
+    """Draws published snapshots with draw(snapshot, alpha) on a background thread
+
+    Only one frame is in flight: wait() blocks until the last submitted frame
+    is fully drawn, and must be called before the surface is flipped or
+    touched from another thread. An exception raised while drawing is
+    re-raised from wait(). With threaded=False, submit() draws inline.
+    """
+    def __init__(self, draw, threaded=True):
+        self.draw = draw
+        self.buffer = SnapshotBuffer()
+        self.idle = threading.Event()
+        self.idle.set()
+        self.pending = False
+        self.error = None
+        self.thread = None
+        if threaded:
+            self.thread = threading.Thread(target=self._run, name="render", daemon=True)
+            self.thread.start()
+
+    def _run(self):
+        while True:
+            frame = self.buffer.take()
+            if frame is None:
+                break
+            try:
+                self.draw(*frame)
+            except BaseException as error:
+                self.error = error
+            finally:
+                self.idle.set()
+
+    def submit(self, snapshot, alpha=1.0):
+        self.wait()
+        self.pending = True
+        if self.thread is None:
+            self.draw(snapshot, alpha)
+            return
+        self.idle.clear()
+        self.buffer.publish((snapshot, alpha))
+
+    def wait(self):
+        """Block until the submitted frame is drawn; returns whether one was pending"""
+        self.idle.wait()
+        drawn, self.pending = self.pending, False
+        if self.error is not None:
+            error, self.error = self.error, None
+            raise error
+        return drawn
+
+    def stop(self):
+        self.wait()
+        if self.thread is not None:
+            self.buffer.publish(None)
+            self.thread.join()
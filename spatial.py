@@ -0,0 +1,296 @@
+"""Uniform-grid broadphase over the static wall rects"""
+import math
+
+import numpy as np
+
+# Batches up to this size skip vectorization in the WallGrid queries, as do
+# segment tests against this few walls, and pools this small in EnemyPool
+# and BulletStore
+SCALAR_BATCH = 16
+
+
+def segment_box_entry(x1, y1, x2, y2, boxes):
+    """Slab test of segments (x1, y1)-(x2, y2) against every box at once
+
+    boxes is an (N, 4) array of (left, top, right, bottom). Endpoints may be
+    scalars, giving an (N,) result, or length-S arrays, giving (S, N); with
+    array endpoints boxes may also be (S, N, 4), a separate set per segment.
+    Each entry is the parametric point t in [0, 1] where the segment enters
+    the box, or inf if it misses. A segment starting inside a box enters at
+    0. Merely touching a box edge does not count as a hit, matching
+    pygame.Rect.colliderect.
+    """
+    x1, y1, x2, y2 = (np.asarray(v, dtype=float) for v in (x1, y1, x2, y2))
+    if x1.ndim:
+        x1, y1, x2, y2 = x1[:, None], y1[:, None], x2[:, None], y2[:, None]
+
+    t_enter = 0.0
+    t_exit = 1.0
+    with np.errstate(divide="ignore", invalid="ignore"):
+        for start, delta, low, high in ((x1, x2 - x1, boxes[..., 0], boxes[..., 2]),
+                                        (y1, y2 - y1, boxes[..., 1], boxes[..., 3])):
+            # A zero delta gives +-inf here, or nan on an edge, which rejects below
+            ta = (low - start) / delta
+            tb = (high - start) / delta
+            t_enter = np.maximum(t_enter, np.minimum(ta, tb))
+            t_exit = np.minimum(t_exit, np.maximum(ta, tb))
+    t_enter = np.array(t_enter, dtype=float)
+    t_enter[~(t_enter < t_exit)] = np.inf
+    return t_enter
+
+
+def segment_circle_entry(x1, y1, x2, y2, cx, cy, radius):
+    """Where segments (x1, y1)-(x2, y2) first come within radius of centres (cx, cy)
+
+    Arguments broadcast against each other, e.g. length-S endpoints with a
+    trailing axis against length-N centres give (S, N). Each entry is the
+    parametric t in [0, 1] where the segment enters the circle, or inf where
+    it stays clear. A segment starting inside a circle enters at 0; grazing
+    the circle does not count, matching a strict distance < radius test.
+    """
+    x1, y1, x2, y2, cx, cy = (np.asarray(v, dtype=float) for v in (x1, y1, x2, y2, cx, cy))
+    dx = x2 - x1
+    dy = y2 - y1
+    fx = x1 - cx
+    fy = y1 - cy
+
+    # |f + t d|^2 = r^2 as a t^2 + 2 b t + c = 0; the smaller root is where the segment enters
+    a = dx * dx + dy * dy
+    b = fx * dx + fy * dy
+    c = fx * fx + fy * fy - radius * radius
+    disc = b * b - a * c
+    with np.errstate(divide="ignore", invalid="ignore"):
+        t = np.array((-b - np.sqrt(disc)) / a, dtype=float)
+    # Starting outside, both roots share a sign, so a crossing needs 0 <= t < 1
+    t[~((disc > 0) & (t >= 0) & (t < 1))] = np.inf
+    t[c < 0] = 0.0
+    return t
+
+
+class WallGrid:
+    """Buckets static walls into grid cells once so movers only test nearby walls
+
+    Every wall is registered in each cell its rect touches after being grown by
+    pad on all sides. A box of half-size <= pad centred anywhere in a cell can
+    therefore only overlap walls listed in that one cell.
+    """
+    def __init__(self, walls, cell_size=64, pad=16):
+        boxes = np.array([(w.left, w.top, w.right, w.bottom) for w in walls],
+                         dtype=float).reshape(-1, 4)
+
+        if len(boxes):
+            origin_x = boxes[:, 0].min() - pad
+            origin_y = boxes[:, 1].min() - pad
+            cols = int((boxes[:, 2].max() + pad - origin_x) // cell_size) + 1
+            rows = int((boxes[:, 3].max() + pad - origin_y) // cell_size) + 1
+        else:
+            origin_x = origin_y = 0.0
+            cols = rows = 0
+        self._set_index(boxes, None, origin_x, origin_y, cols, rows, cell_size, pad)
+
+        cells = [[] for _ in range(cols * rows)]
+        for i, (left, top, right, bottom) in enumerate(boxes):
+            c0, r0 = self._cell(left - pad, top - pad)
+            c1, r1 = self._cell(right + pad, bottom + pad)
+            for r in range(r0, r1 + 1):
+                for c in range(c0, c1 + 1):
+                    cells[r * cols + c].append(i)
+        self.cells = dict(enumerate(map(tuple, cells)))
+
+        # Dense (cells, max walls per cell) table padded with -1 for vectorized lookups
+        depth = max((len(c) for c in cells), default=0)
+        self.table = np.full((len(cells), max(depth, 1)), -1, dtype=np.intp)
+        for i, members in enumerate(cells):
+            self.table[i, :len(members)] = members
+
+    @classmethod
+    def from_index(cls, boxes, table, origin_x, origin_y, cols, rows, cell_size, pad):
+        """Wrap a prebuilt index, e.g. arrays memory-mapped from a level file"""
+        grid = cls.__new__(cls)
+        grid._set_index(boxes, table, origin_x, origin_y, cols, rows, cell_size, pad)
+        return grid
+
+    def _set_index(self, boxes, table, origin_x, origin_y, cols, rows, cell_size, pad):
+        self.boxes = boxes
+        self.table = table
+        self.origin_x = origin_x
+        self.origin_y = origin_y
+        self.cols = cols
+        self.rows = rows
+        self.cell_size = cell_size
+        self.pad = pad
+        # Plain tuples for the scalar path, where NumPy indexing overhead dominates.
+        # Filled per cell on first use so wrapping a loaded index stays cheap.
+        self.cells = {}
+        self._box_list = None
+
+    def __len__(self):
+        return len(self.boxes)
+
+    @property
+    def box_list(self):
+        if self._box_list is None:
+            self._box_list = [tuple(b) for b in self.boxes.tolist()]
+        return self._box_list
+
+    def _cell(self, x, y):
+        return (int((x - self.origin_x) // self.cell_size),
+                int((y - self.origin_y) // self.cell_size))
+
+    def candidates(self, x, y):
+        """Indices of walls that may touch a box of half-size <= pad centred on (x, y)"""
+        c, r = self._cell(x, y)
+        if not (0 <= c < self.cols and 0 <= r < self.rows):
+            return ()
+        i = r * self.cols + c
+        cell = self.cells.get(i)
+        if cell is None:
+            row = self.table[i]
+            cell = self.cells[i] = tuple(row[row >= 0].tolist())
+        return cell
+
+    def hits_box(self, x, y, half):
+        """True if the box of the given half-size centred on (x, y) overlaps a wall"""
+        boxes = self.box_list
+        for i in self.candidates(x, y):
+            left, top, right, bottom = boxes[i]
+            if x - half < right and x + half > left and y - half < bottom and y + half > top:
+                return True
+        return False
+
+    def segment_blocked(self, x1, y1, x2, y2):
+        """True if the segment crosses any wall"""
+        if not len(self.boxes):
+            return False
+        if len(self.boxes) <= SCALAR_BATCH:
+            return self._segment_blocked_scalar(float(x1), float(y1), float(x2), float(y2))
+        return bool(np.isfinite(segment_box_entry(x1, y1, x2, y2, self.boxes)).any())
+
+    def _segment_blocked_scalar(self, x1, y1, x2, y2):
+        """segment_blocked one wall at a time, with the same slab arithmetic as segment_box_entry"""
+        dx = x2 - x1
+        dy = y2 - y1
+        min_x, max_x = (x1, x2) if x1 < x2 else (x2, x1)
+        min_y, max_y = (y1, y2) if y1 < y2 else (y2, y1)
+        for left, top, right, bottom in self.box_list:
+            # Segments that stay outside a wall's open interior along an axis cannot enter it
+            if max_x <= left or min_x >= right or max_y <= top or min_y >= bottom:
+                continue
+            t_enter = 0.0
+            t_exit = 1.0
+            for start, delta, low, high in ((x1, dx, left, right), (y1, dy, top, bottom)):
+                if delta:
+                    ta = (low - start) / delta
+                    tb = (high - start) / delta
+                    t_enter = max(t_enter, min(ta, tb))
+                    t_exit = min(t_exit, max(ta, tb))
+            if t_enter < t_exit:
+                return True
+        return False
+
+    def segments_blocked(self, x1, y1, x2, y2):
+        """Vectorized segment_blocked for arrays of endpoints; returns a bool array"""
+        if not len(self.boxes):
+            return np.zeros(len(x1), dtype=bool)
+        if len(x1) <= SCALAR_BATCH:
+            return np.array([self.segment_blocked(*segment) for segment in
+                             zip(x1.tolist(), y1.tolist(), x2.tolist(), y2.tolist())], dtype=bool)
+        return np.isfinite(segment_box_entry(x1, y1, x2, y2, self.boxes)).any(axis=1)
+
+    def sweep_box(self, x1, y1, x2, y2, half):
+        """Scalar sweep_boxes for one mover; returns t in [0, 1] or inf"""
+        dx = x2 - x1
+        dy = y2 - y1
+        if half + max(abs(dx), abs(dy)) / 2 <= self.pad:
+            candidates = self.candidates(x1 + dx / 2, y1 + dy / 2)
+        else:
+            candidates = range(len(self.boxes))
+        boxes = self.box_list
+        first = math.inf
+        for i in candidates:
+            left, top, right, bottom = boxes[i]
+            t_enter = 0.0
+            t_exit = 1.0
+            for start, delta, low, high in ((x1, dx, left - half, right + half),
+                                            (y1, dy, top - half, bottom + half)):
+                if delta:
+                    ta = (low - start) / delta
+                    tb = (high - start) / delta
+                    t_enter = max(t_enter, min(ta, tb))
+                    t_exit = min(t_exit, max(ta, tb))
+                elif not low < start < high:
+                    # Moving parallel to this slab from outside it
+                    t_exit = -1.0
+            if t_enter < t_exit and t_enter < first:
+                first = t_enter
+        return first
+
+    def sweep_boxes(self, x1, y1, x2, y2, half):
+        """When boxes of the given half-size moving from (x1, y1) to (x2, y2) first touch a wall
+
+        Returns the parametric t in [0, 1] of each mover's first contact
+        along its path, or inf for those that stay clear, so fast movers
+        cannot tunnel through thin walls between two positions.
+        """
+        if len(x1) <= SCALAR_BATCH:
+            return np.array([self.sweep_box(*path, half) for path in
+                             zip(x1.tolist(), y1.tolist(), x2.tolist(), y2.tolist())], dtype=float)
+        t = np.full(len(x1), np.inf)
+        if not len(self.boxes):
+            return t
+        # A box sweeping a segment touches what its path's bounding box grown by half does
+        grown = self.boxes + (-half, -half, half, half)
+        dx = x2 - x1
+        dy = y2 - y1
+        reach = half + np.maximum(np.abs(dx), np.abs(dy)) / 2
+
+        # Paths reaching at most pad from their midpoint only meet walls listed in its cell
+        cx = np.floor((x1 + dx / 2 - self.origin_x) / self.cell_size).astype(np.intp)
+        cy = np.floor((y1 + dy / 2 - self.origin_y) / self.cell_size).astype(np.intp)
+        near = (reach <= self.pad) & (cx >= 0) & (cx < self.cols) & (cy >= 0) & (cy < self.rows)
+        idx = np.flatnonzero(near)
+        cell = cy[idx] * self.cols + cx[idx]
+        occupied = self.table[cell, 0] >= 0
+        idx = idx[occupied]
+        if len(idx):
+            cand = self.table[cell[occupied]]
+            entry = segment_box_entry(x1[idx], y1[idx], x2[idx], y2[idx], grown[cand])
+            entry[cand < 0] = np.inf
+            t[idx] = entry.min(axis=1)
+
+        # Longer paths test every wall
+        far = np.flatnonzero(reach > self.pad)
+        if len(far):
+            t[far] = segment_box_entry(x1[far], y1[far], x2[far], y2[far], grown).min(axis=1)
+        return t
+
+    def hits_boxes(self, xs, ys, half):
+        """Vectorized hits_box for arrays of centres; returns a bool array"""
+        if len(xs) <= SCALAR_BATCH:
+            # Tiny batches are cheaper through the scalar path than NumPy's per-call overhead
+            return np.array([self.hits_box(x, y, half) for x, y in zip(xs.tolist(), ys.tolist())],
+                            dtype=bool)
+        result = np.zeros(len(xs), dtype=bool)
+        if not len(self.boxes):
+            return result
+
+        cx = np.floor((xs - self.origin_x) / self.cell_size).astype(np.intp)
+        cy = np.floor((ys - self.origin_y) / self.cell_size).astype(np.intp)
+        inside = (cx >= 0) & (cx < self.cols) & (cy >= 0) & (cy < self.rows)
+        idx = np.flatnonzero(inside)
+        cell = cy[idx] * self.cols + cx[idx]
+
+        # Only points in cells that hold walls need the exact test
+        occupied = self.table[cell, 0] >= 0
+        idx = idx[occupied]
+        if not len(idx):
+            return result
+        cand = self.table[cell[occupied]]
+        box = self.boxes[cand]
+        px = xs[idx, None]
+        py = ys[idx, None]
+        hit = ((cand >= 0) &
+               (px - half < box[..., 2]) & (px + half > box[..., 0]) &
+               (py - half < box[..., 3]) & (py + half > box[..., 1]))
+        result[idx] = hit.any(axis=1)
+        return result
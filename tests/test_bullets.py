@@ -0,0 +1,86 @@
+import numpy as np
+import pygame
+
+import bullets
+from bullets import BULLET_HALF_SIZE, BulletStore
+from spatial import WallGrid
+
+BOUNDS = (-100, -100, 1000, 1000)
+
+
+def test_fast_bullets_stop_at_thin_walls():
+    walls = WallGrid([pygame.Rect(100, 0, 2, 200)])
+    store = BulletStore()
+    # Fast enough to jump from one side of the wall to the other in one step
+    store.spawn(80, 50, 0.0, speed=40)
+    store.spawn(80, 150, np.pi, speed=40)
+    store.update(walls, BOUNDS)
+    assert store.x[0] == 100 - BULLET_HALF_SIZE
+    assert store.travel[0] == (100 - BULLET_HALF_SIZE - 80) / 40
+    assert store.x[1] == 40 and store.travel[1] == 1
+    store.compact()
+    assert len(store) == 1 and store.x[0] == 40
+
+
+def test_targets_are_hit_along_the_whole_step():
+    walls = WallGrid([])
+    store = BulletStore()
+    store.spawn(0, 0, 0.0, speed=100)
+    store.update(walls, BOUNDS)
+    # Passed clean through target 1 between ticks; target 0 is further along, target 2 off the path
+    hits = store.collide(np.array([90.0, 40.0, 40.0]), np.array([0.0, 0.0, 50.0]), 20, friendly=True)
+    assert hits.tolist() == [1]
+    assert not store.active[0]
+
+
+def test_bullets_stopped_by_a_wall_miss_targets_behind_it():
+    walls = WallGrid([pygame.Rect(50, -100, 4, 200)])
+    store = BulletStore()
+    store.spawn(0, 0, 0.0, speed=100)
+    store.spawn(0, 0, 0.0, speed=100)
+    store.update(walls, BOUNDS)
+    assert np.all(store.x[:2] == 50 - BULLET_HALF_SIZE)
+    # Behind the wall for the first bullet, then in front of it for the second
+    assert len(store.collide(np.array([80.0]), np.array([0.0]), 20, friendly=True)) == 0
+    assert store.collide(np.array([30.0]), np.array([0.0]), 20, friendly=True).tolist() == [0, 0]
+    store.compact()
+    assert len(store) == 0
+
+
+def test_collide_only_checks_one_side():
+    store = BulletStore()
+    store.spawn(0, 0, 0.0, friendly=False, speed=10)
+    store.spawn(0, 5, 0.0, friendly=True, speed=10)
+    store.update(WallGrid([]), BOUNDS)
+    hits = store.collide(np.array([10.0]), np.array([0.0]), 20, friendly=False)
+    assert hits.tolist() == [0]
+    assert store.active[:2].tolist() == [False, True]
+
+
+def volley(monkeypatch, scalar_batch):
+    """Bullet states and hits over a few ticks of crossfire, with the scalar path cut off at scalar_batch"""
+    monkeypatch.setattr(bullets, "SCALAR_BATCH", scalar_batch)
+    rng = np.random.default_rng(4)
+    walls = WallGrid([pygame.Rect(300, 100, 10, 300), pygame.Rect(100, 300, 300, 10)])
+    store = BulletStore()
+    store.spawn_many(rng.uniform(0, 600, 12), rng.uniform(0, 600, 12), rng.uniform(-np.pi, np.pi, 12),
+                     friendly=True, speed=30)
+    store.spawn_many(rng.uniform(0, 600, 4), rng.uniform(0, 600, 4), rng.uniform(-np.pi, np.pi, 4),
+                     friendly=False)
+    target_x = rng.uniform(0, 600, 6)
+    target_y = rng.uniform(0, 600, 6)
+    results = []
+    for _ in range(20):
+        store.update(walls, (0, 0, 600, 600))
+        results.append(store.collide(target_x, target_y, 40, friendly=True).tolist())
+        results.append(store.collide(target_x[:1], target_y[:1], 40, friendly=False).tolist())
+        results.append([getattr(store, name)[:len(store)].tolist() for name in store.FIELDS])
+        store.compact()
+    return results
+
+
+def test_scalar_path_matches_the_vectorized_one(monkeypatch):
+    scalar = volley(monkeypatch, bullets.SCALAR_BATCH)
+    vectorized = volley(monkeypatch, -1)
+    assert scalar == vectorized
+    assert any(scalar[0:-1:3]), "no bullet hit a target"
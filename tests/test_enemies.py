@@ -0,0 +1,70 @@
+import numpy as np
+import pygame
+import pytest
+
+import enemies
+from Game import Game
+from spatial import WallGrid
+
+
+def chase(monkeypatch, scalar_batch, players):
+    """Enemy positions and fire orders over a headless chase, with the scalar path cut off at scalar_batch"""
+    monkeypatch.setattr(enemies, "SCALAR_BATCH", scalar_batch)
+    game = Game(seed=7)
+    pool = game.enemies
+    flow = game.flow_field
+    target_x = np.array(players[0])
+    target_y = np.array(players[1])
+    ready = []
+    for tick in range(300):
+        # Targets circle around so enemies keep steering, sliding and stopping
+        angle = tick / 40
+        goal_x = target_x + 150 * np.cos(angle)
+        goal_y = target_y + 150 * np.sin(angle)
+        if goal_x.ndim:
+            flow.update(goal_x, goal_y)
+            # One target per enemy, alternating between the players
+            goal_x = goal_x[np.arange(len(pool)) % len(goal_x)]
+            goal_y = goal_y[np.arange(len(pool)) % len(goal_y)]
+        else:
+            flow.update(goal_x, goal_y)
+        ready.append(pool.update(goal_x, goal_y, game.wall_grid, flow).tolist())
+    return pool.x[:len(pool)].copy(), pool.y[:len(pool)].copy(), ready
+
+
+@pytest.mark.parametrize("players", [(100.0, 300.0), ([100.0, 700.0], [300.0, 550.0])])
+def test_scalar_path_matches_the_vectorized_one(monkeypatch, players):
+    scalar = chase(monkeypatch, enemies.SCALAR_BATCH, players)
+    vectorized = chase(monkeypatch, -1, players)
+    assert np.array_equal(scalar[0], vectorized[0])
+    assert np.array_equal(scalar[1], vectorized[1])
+    assert scalar[2] == vectorized[2]
+
+
+@pytest.mark.parametrize("scalar_batch", [16, -1])
+def test_moves_into_walls_slide_or_revert(monkeypatch, scalar_batch):
+    monkeypatch.setattr(enemies, "SCALAR_BATCH", scalar_batch)
+    walls = WallGrid([pygame.Rect(100, 0, 20, 400), pygame.Rect(0, 100, 100, 20)])
+    pool = enemies.EnemyPool()
+    # Up against the wall heading diagonally into it, pinned in its corner, and in the open
+    for x, y in ((84.0, 300.0), (84.0, 84.0), (50.0, 300.0)):
+        pool.spawn(x, y, speed=2.0)
+    pool.update(np.array([600.0, 600.0, 50.0]), np.array([600.0, 600.0, 600.0]), walls)
+    assert pool.x.tolist()[:3] == [84.0, 84.0, 50.0]
+    assert pool.y.tolist()[:3] == [300.0 + 2 * 300 / np.hypot(516, 300), 84.0, 302.0]
+
+
+def test_remove_dead_compacts_every_field_in_spawn_order():
+    pool = enemies.EnemyPool()
+    for i in range(5):
+        pool.spawn(float(i), float(10 * i), speed=1.0 + i)
+    pool.damage(np.array([1, 3, 3]), 40)
+    assert pool.remove_dead() == 1
+    pool.health[0] = 0
+    assert pool.remove_dead() == 1 and pool.remove_dead() == 0
+    assert len(pool) == 3
+    # Survivors keep their relative order, so ids stay sorted for snapshot matching
+    assert pool.ids[:3].tolist() == [1, 2, 4]
+    assert pool.x[:3].tolist() == [1.0, 2.0, 4.0]
+    assert pool.speed[:3].tolist() == [2.0, 3.0, 5.0]
+    assert pool.health[:3].tolist()[0] == enemies.ENEMY_HEALTH - 40
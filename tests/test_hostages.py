@@ -0,0 +1,18 @@
+import numpy as np
+
+from hostages import RESCUE_RADIUS, HostageStore
+
+
+def test_rescue_by_any_player_counts_each_hostage_once():
+    store = HostageStore([(0.0, 0.0), (200.0, 0.0), (400.0, 0.0)])
+    # Nobody close, and no living players at all
+    assert store.rescue(np.array([100.0]), np.array([100.0])) == 0
+    assert store.rescue(np.zeros(0), np.zeros(0)) == 0
+    # The first player reaches hostage 0, the second hostage 2; reach is strict
+    assert store.rescue(np.array([10.0, 400.0 + RESCUE_RADIUS - 1]), np.array([0.0, 0.0])) == 2
+    assert store.saved.tolist() == [True, False, True]
+    assert store.rescue(np.array([200.0 + RESCUE_RADIUS]), np.array([0.0])) == 0
+    # Already saved hostages are not counted again
+    assert store.rescue(np.array([0.0, 200.0]), np.array([0.0, 0.0])) == 1
+    assert store.saved.all() and len(store) == 3
+    assert store.rescue(np.array([0.0]), np.array([0.0])) == 0
@@ -0,0 +1,34 @@
+import numpy as np
+
+import level
+from Game import mission_level
+from level import Level
+
+
+def test_exported_mission_loads_back_memory_mapped(tmp_path):
+    path = tmp_path / "mission.lvl"
+    level.main(["export", str(path)])
+    built = mission_level()
+    loaded = Level.load(path)
+
+    assert isinstance(loaded.wall_grid.boxes.base, np.memmap)
+    assert not loaded.nav_grid.blocked.flags.writeable
+    assert loaded.size == built.size
+    assert loaded.player_spawn == built.player_spawn
+    assert np.array_equal(loaded.enemy_spawns, built.enemy_spawns)
+    assert np.array_equal(loaded.hostage_spawns, built.hostage_spawns)
+    assert loaded.rects == built.rects
+
+    grid, expected = loaded.wall_grid, built.wall_grid
+    assert np.array_equal(grid.boxes, expected.boxes)
+    assert np.array_equal(grid.table, expected.table)
+    for name in ("origin_x", "origin_y", "cols", "rows", "cell_size", "pad"):
+        assert getattr(grid, name) == getattr(expected, name), name
+    # The loaded index answers queries like the one built in code
+    xs, ys = (a.ravel() * 10.0 for a in np.indices((80, 60)))
+    assert np.array_equal(grid.hits_boxes(xs, ys, 15), expected.hits_boxes(xs, ys, 15))
+
+    nav, expected = loaded.nav_grid, built.nav_grid
+    assert np.array_equal(nav.blocked, expected.blocked)
+    assert (nav.cell_size, nav.clearance) == (expected.cell_size, expected.clearance)
+    assert nav.links() == expected.links()
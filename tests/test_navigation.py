@@ -0,0 +1,56 @@
+import numpy as np
+
+from navigation import FlowField, NavGrid
+
+
+def grid(rows):
+    """NavGrid with 10 pixel cells from strings, '#' for blocked"""
+    blocked = np.array([[c == "#" for c in row] for row in rows], dtype=np.uint8)
+    return NavGrid(blocked, 10, 5)
+
+
+def test_distances_go_around_walls():
+    nav = grid(["....",
+                "###.",
+                "....",
+                ".###"])
+    flow = FlowField(nav)
+    flow.update(5, 5)
+    flow.steer_targets(np.array([5.0]), np.array([25.0]), 5, 5)
+    expected = [[0, 1, 2, 3],
+                [np.inf, np.inf, np.inf, 4],
+                [8, 7, 6, 5],
+                [9, np.inf, np.inf, np.inf]]
+    assert np.array_equal(flow.distance, expected)
+    # From the bottom left, the way to the goal starts back up the left column
+    target_x, target_y = flow.steer_targets(np.array([5.0]), np.array([35.0]), 5, 5)
+    assert (target_x[0], target_y[0]) == (5, 25)
+
+
+def test_field_is_rebuilt_only_when_sampled_after_the_goal_moves():
+    flow = FlowField(grid(["...", "...", "..."]))
+    assert flow.update(5, 5)
+    assert not flow.update(6, 6)
+    assert flow.update(25, 25)
+    assert flow.rebuilds == 0
+    xs = np.array([5.0])
+    flow.steer_targets(xs, xs, 25, 25)
+    flow.steer_targets(xs, xs, 25, 25)
+    assert flow.rebuilds == 1
+    assert flow.distance[0, 0] == 4
+
+
+def test_single_chaser_steps_match_the_batched_ones():
+    rng = np.random.default_rng(8)
+    nav = NavGrid((rng.random((12, 15)) < 0.3).astype(np.uint8), 10, 5)
+    flow = FlowField(nav)
+    xs, ys = (a.ravel() * 10 + 5.0 for a in np.indices((12, 15))[::-1])
+    for goal_x, goal_y in ((75.0, 55.0), (np.array([5.0, 145.0]), np.array([5.0, 115.0]))):
+        flow.update(goal_x, goal_y)
+        # Cells first asked about one at a time, then all at once
+        single = [flow.steer_target(x, y, -1.0, -1.0) for x, y in zip(xs.tolist(), ys.tolist())]
+        target_x, target_y = flow.steer_targets(xs, ys, -1.0, -1.0)
+        assert single == list(zip(target_x.tolist(), target_y.tolist()))
+    # Every field over the grid walks the same neighbour links
+    assert flow.rebuilds == 2
+    assert nav.links() is nav.links()
@@ -0,0 +1,80 @@
+import numpy as np
+import pygame
+
+import netcode
+from Game import Game, IDLE_KEYS
+from replay import KeyState
+from server import GameServer
+
+
+def copied(tables):
+    return {name: (ids.copy(), values.copy()) for name, (ids, values) in tables.items()}
+
+
+def test_delta_snapshots_survive_an_enemy_kill_between_acked_bases():
+    game = Game(seed=1)
+    # Bases kept by the server and by the client, acked two snapshots behind like a laggy link
+    sent = {}
+    received = {}
+    for sequence in range(1, 10):
+        if sequence == 5:
+            # remove_dead compacts the enemy arrays in place
+            game.enemies.health[0] = 0
+            assert game.enemies.remove_dead() == 1
+        game.handle_mission(IDLE_KEYS, 3, False)
+        tables = netcode.capture_tables(game)
+        expected = copied(tables)
+        acked = sequence - 2 if sequence > 2 else None
+        data = netcode.encode_snapshot(sequence, game, tables, 0, acked, sent.get(acked))
+        sent[sequence] = tables
+
+        header, decoded = netcode.decode_snapshot(data, received)
+        received[sequence] = decoded
+        assert header["base"] == acked
+        for name, (ids, values) in expected.items():
+            assert np.array_equal(decoded[name][0], ids), (sequence, name)
+            assert np.array_equal(decoded[name][1], values), (sequence, name)
+    assert len(received[9]["enemies"][0]) == len(game.enemies)
+
+
+def test_full_snapshot_round_trip():
+    game = Game(seed=2, players=3)
+    tables = netcode.capture_tables(game)
+    header, decoded = netcode.decode_snapshot(netcode.encode_snapshot(7, game, tables, 2), {})
+    assert header["sequence"] == 7 and header["slot"] == 2 and header["base"] is None
+    for name, (ids, values) in tables.items():
+        assert np.array_equal(decoded[name][0], ids)
+        assert np.array_equal(decoded[name][1], values)
+
+
+def test_input_round_trip():
+    keys = KeyState({pygame.K_w, pygame.K_q})
+    sequence, ack, decoded_keys, mouse_dx, mouse_click = netcode.decode_input(
+        netcode.encode_input(12, 9, keys, -40, True))
+    assert (sequence, ack, mouse_dx, mouse_click) == (12, 9, -40, True)
+    assert decoded_keys.held == keys.held
+
+
+def test_tables_past_16_bit_counts_and_ids_round_trip():
+    # Enemy ids keep growing over a long session; bullet tables can outgrow a u16 count
+    ids = np.arange(70000, dtype=np.int64) * 3 + 65000
+    values = (np.arange(70000 * 2, dtype=np.int64).reshape(-1, 2) % 60000 - 30000).astype(np.int16)
+    base = (ids[::2].copy(), values[::2].copy())
+    for table_base in (None, base):
+        data = netcode.encode_table(ids, values, table_base)
+        (decoded_ids, decoded_values), offset = netcode.decode_table(data, 0, 2, table_base)
+        assert offset == len(data)
+        assert np.array_equal(decoded_ids, ids)
+        assert np.array_equal(decoded_values, values)
+
+
+def test_server_counts_snapshots_too_big_to_send():
+    server = GameServer(players=1, port=0)
+    try:
+        address = server.socket.getsockname()
+        server.send(b"\0" * 100, address)
+        server.send(b"\0" * (70 * 1024), address)
+        assert (server.stats.packets, server.stats.dropped) == (1, 1)
+        assert "1 dropped" in server.stats.report(1.0, 1)
+    finally:
+        server.close()
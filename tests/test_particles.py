@@ -0,0 +1,38 @@
+import numpy as np
+import pygame
+
+import Game
+from particles import FogSystem
+
+AREA = (800, 300)
+
+
+def drifted(frames_per_tick, ticks=30):
+    fog = FogSystem(seed=4)
+    surface = pygame.Surface(AREA)
+    for frame in range(ticks * frames_per_tick + 1):
+        fog.draw(surface, AREA, frame / frames_per_tick)
+    return fog.x, fog.y
+
+
+def test_fog_drifts_with_the_clock_not_the_frame_rate():
+    Game.init_display()
+    slow_x, slow_y = drifted(1)
+    fast_x, fast_y = drifted(4)
+    assert np.allclose(slow_x, fast_x) and np.allclose(slow_y, fast_y)
+    start = FogSystem(seed=4)
+    start.spawn(AREA)
+    assert not np.allclose(start.x, slow_x)
+
+
+def test_fog_holds_still_when_the_clock_goes_back():
+    Game.init_display()
+    fog = FogSystem(seed=4)
+    surface = pygame.Surface(AREA)
+    fog.draw(surface, AREA, 50.0)
+    fog.draw(surface, AREA, 60.0)
+    x = fog.x.copy()
+    fog.draw(surface, AREA, 0.0)
+    assert np.array_equal(fog.x, x)
+    fog.draw(surface, AREA, 2.0)
+    assert np.allclose(fog.x, (x + fog.vx * 2 + fog.size) % (AREA[0] + fog.size) - fog.size)
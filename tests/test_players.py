@@ -0,0 +1,51 @@
+import numpy as np
+import pygame
+
+from players import PlayerStore
+from spatial import WallGrid
+
+
+def test_single_player_steps_match_the_batched_ones():
+    walls = WallGrid([pygame.Rect(120, 0, 20, 400)])
+    rng = np.random.default_rng(6)
+    one = PlayerStore([(100.0, 200.0)])
+    batch = PlayerStore([(100.0, 200.0)])
+    alive = np.zeros(1, dtype=np.intp)
+    blocked = 0
+    for _ in range(200):
+        dx, dy = rng.integers(-1, 2, 2).tolist()
+        switch = bool(rng.random() < 0.2)
+        if rng.random() < 0.1:
+            one.shoot_cooldown[0] = batch.shoot_cooldown[0] = 15
+        x = one.x[0]
+        one.move_one(0, dx, dy, walls)
+        blocked += dx != 0 and one.x[0] == x
+        one.switch_one(0, switch)
+        batch.move(alive, np.array([dx], dtype=float), np.array([dy], dtype=float), walls)
+        batch.switch_weapons(alive, np.array([switch]))
+        for name in PlayerStore.FIELDS:
+            assert getattr(one, name).tolist() == getattr(batch, name).tolist(), name
+    # The wall right of the spawn stopped some of those steps
+    assert blocked
+
+
+def test_damage_clamps_at_zero_and_dead_players_keep_their_slot():
+    store = PlayerStore([(0.0, 0.0), (50.0, 0.0), (100.0, 0.0)])
+    handles = list(store)
+    store.damage(np.array([0, 2]), np.array([30, 150]))
+    assert store.health.tolist() == [70, 100, 0]
+    # Players never compact: the dead one stays in its row, with the same handle
+    assert store.alive().tolist() == [0, 1]
+    assert len(store) == 3 and list(store) == handles and store[2].health == 0
+    store.damage(store.alive(), 15 * np.bincount([1, 1, 0], minlength=2))
+    assert store.health.tolist() == [55, 70, 0]
+    store.damage(np.arange(3), 100)
+    assert store.health.tolist() == [0, 0, 0] and not len(store.alive())
+
+
+def test_handles_read_and_write_their_row():
+    store = PlayerStore([(0.0, 0.0), (50.0, 10.0)])
+    store[1].x = 75.0
+    store[1].health -= 20
+    assert store.x.tolist() == [0.0, 75.0] and store.health.tolist() == [100, 80]
+    assert store[1].weapon == "gun" and isinstance(store[1].y, float)
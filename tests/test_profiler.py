@@ -0,0 +1,23 @@
+import pygame
+
+from profiler import Profiler
+from render_cache import TextCache
+
+
+def test_overlay_reuses_the_shared_font_and_labels(monkeypatch):
+    pygame.font.init()
+    text_cache = TextCache()
+    profiler = Profiler(enabled=True, text_cache=text_cache)
+    for name in ("bullets", "enemy_ai"):
+        with profiler.phase(name):
+            pass
+    fonts = []
+    real_font = pygame.font.Font
+    monkeypatch.setattr(pygame.font, "Font", lambda *args: fonts.append(args) or real_font(*args))
+    surface = pygame.Surface((300, 200))
+    for _ in range(3):
+        profiler.draw_overlay(surface, refresh=1)
+    # One font for every refresh, and the phase names rendered once
+    assert len(fonts) == 1 and list(text_cache.fonts) == [20]
+    assert text_cache.misses == 3 and text_cache.hits == 6
+    assert profiler.overlay.get_height() == 6 + 18 * 3
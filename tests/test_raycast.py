@@ -0,0 +1,47 @@
+import math
+import warnings
+
+import numpy as np
+import pytest
+
+from Game import mission_level
+from raycast import Raycaster, visible_spans
+
+WIDTH = 64
+
+
+def test_cast_depths_against_a_known_layout():
+    # Two walls square to the view: a near one above the eye line and a far one below it
+    raycaster = Raycaster(np.array([[100.0, 0.0, 110.0, 200.0], [150.0, 200.0, 160.0, 400.0]]))
+    depth, y_face = raycaster.cast(50, 200, 0.0, WIDTH)
+    assert depth.tolist() == pytest.approx([50.0] * (WIDTH // 2) + [100.0] * (WIDTH // 2))
+    assert not y_face.any()
+
+    # Facing down at the top face of a wide wall, which fills the whole view
+    depth, y_face = Raycaster(np.array([[-100.0, 400.0, 400.0, 410.0]])).cast(50, 300, math.pi / 2, WIDTH)
+    assert depth.tolist() == pytest.approx([100.0] * WIDTH)
+    assert y_face.all()
+
+    # Nothing within max_distance behind the walls, and nothing at all from outside the grid
+    assert np.isinf(raycaster.cast(50, 200, math.pi, WIDTH)[0]).all()
+    assert np.isinf(raycaster.cast(5000, 200, math.pi, WIDTH)[0]).all()
+
+
+def test_visible_spans():
+    depth = np.array([np.inf, 10.0, 50.0, 50.0, 5.0, 80.0, 80.0])
+    assert visible_spans(depth, 0, 7, 40) == [(0, 1), (2, 4), (5, 7)]
+    # Clipped to the screen, and split around nearer walls
+    assert visible_spans(depth, -5, 3, 40) == [(0, 1), (2, 3)]
+    assert visible_spans(depth, 3, 20, 40) == [(3, 4), (5, 7)]
+    assert visible_spans(depth, 1, 2, 40) == []
+    assert visible_spans(depth, 5, 5, 1) == []
+    assert visible_spans(depth, 0, 7, 100) == [(0, 1)]
+
+
+def test_walls_off_the_ray_grid_warn():
+    with pytest.warns(UserWarning, match="1 of 2 walls"):
+        Raycaster(np.array([[100.0, 0.0, 110.0, 200.0], [105.0, 300.0, 120.0, 310.0]]))
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")
+        Raycaster(mission_level().wall_grid.boxes)
+        Raycaster(np.zeros((0, 4)))
@@ -0,0 +1,70 @@
+import pytest
+
+from Game import Game, MISSION
+from headless import RandomPilot
+from replay import state_digest
+from savestate import StateHistory, restore_state, save_state
+
+
+def play(game, pilots, ticks):
+    """Inputs fed on each tick, for replaying them after a restore"""
+    frames = []
+    for tick in range(ticks):
+        frame = [pilot(tick) for pilot in pilots]
+        game.handle_players(frame)
+        frames.append(frame)
+    assert game.state == MISSION
+    return frames
+
+
+@pytest.mark.parametrize("players", [1, 2])
+def test_restore_then_resimulate_matches_the_original_run(players):
+    game = Game(seed=3, players=players)
+    pilots = [RandomPilot(3 + i) for i in range(players)]
+    play(game, pilots, 50)
+    data = save_state(game)
+    frames = play(game, pilots, 40)
+    digest = state_digest(game)
+
+    restore_state(game, data)
+    for frame in frames:
+        game.handle_players(frame)
+    assert state_digest(game) == digest
+
+
+def test_restore_rewinds_into_a_game_that_moved_on():
+    game = Game(seed=5)
+    pilots = [RandomPilot(5)]
+    play(game, pilots, 30)
+    data = save_state(game)
+    digest = state_digest(game)
+    play(game, pilots, 60)
+    assert state_digest(game) != digest
+
+    restore_state(game, data)
+    assert state_digest(game) == digest
+    assert save_state(game) == data
+
+
+def test_history_keeps_the_last_capacity_ticks():
+    game = Game(seed=2)
+    pilots = [RandomPilot(2)]
+    history = StateHistory(capacity=20)
+    digests = {}
+    for tick in range(50):
+        game.handle_players([pilot(tick) for pilot in pilots])
+        history.record(game)
+        digests[game.tick] = state_digest(game)
+
+    assert history.oldest() == game.tick - 19
+    assert game.tick - 20 not in history
+    history.restore(game, game.tick - 10)
+    assert state_digest(game) == digests[game.tick]
+    with pytest.raises(KeyError):
+        history.restore(game, game.tick - 15)
+
+
+def test_restore_refuses_a_state_for_another_player_count():
+    data = save_state(Game(seed=0, players=2))
+    with pytest.raises(ValueError):
+        restore_state(Game(seed=0), data)
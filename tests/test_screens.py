@@ -0,0 +1,62 @@
+import pygame
+
+import Game
+from Game import DEATH, ENDING, TIMESKIP
+
+
+def pixels():
+    return pygame.image.tostring(Game.screen, "RGB")
+
+
+def fresh_frame(state, **timers):
+    """The screen painted from scratch at the given timers"""
+    game = Game.Game(seed=0)
+    game.state = state
+    for name, value in timers.items():
+        setattr(game, name, value)
+    {DEATH: game.draw_death_screen, TIMESKIP: game.draw_timeskip}[state]()
+    return pixels()
+
+
+def test_death_screen_repaints_only_what_changed():
+    Game.init_display()
+    game = Game.Game(seed=0)
+    game.state = DEATH
+    assert game.draw_death_screen() == [Game.screen.get_rect()]
+    changes = {}
+    for _ in range(200):
+        game.update_screen()
+        changes[game.death_timer] = game.draw_death_screen()
+        if game.death_timer in (30, 61, 62, 100, 121, 199):
+            # Patching dirty rects onto the screen gives the same picture as painting it anew
+            frame = pixels()
+            assert frame == fresh_frame(DEATH, death_timer=game.death_timer), game.death_timer
+    # Nothing shows before the title; then it fades in until fully opaque, then the hint appears
+    assert not any(changes[t] for t in range(1, 61))
+    assert len(changes[61]) == 1
+    assert all(len(changes[t]) == 2 for t in range(62, 86))
+    assert not any(changes[t] for t in range(86, 121))
+    assert len(changes[121]) == 1
+    assert not any(changes[t] for t in range(122, 200))
+
+
+def test_timeskip_swaps_cards_then_moves_on_to_the_ending():
+    Game.init_display()
+    game = Game.Game(seed=0)
+    game.state = TIMESKIP
+    assert len(game.draw_timeskip()) == 2
+    swapped = None
+    while True:
+        game.update_screen()
+        if game.state != TIMESKIP:
+            break
+        dirty = game.draw_timeskip()
+        if dirty:
+            assert swapped is None and len(dirty) == 2
+            swapped = game.timeskip_timer
+            assert pixels() == fresh_frame(TIMESKIP, timeskip_timer=swapped)
+    assert swapped == 120 and game.timeskip_timer == 200
+    assert game.state == ENDING
+    # The ending is a new screen, painted in full once
+    assert game.draw_ending()[0] == Game.screen.get_rect()
+    assert game.draw_ending() == []
@@ -0,0 +1,172 @@
+import threading
+import time
+
+import numpy as np
+import pygame
+import pytest
+
+from Game import Game
+from headless import RandomPilot
+from replay import KeyState
+from snapshot import RenderThread, SnapshotBuffer
+
+ENEMY_FIELDS = ("ids", "x", "y", "health", "max_health")
+BULLET_FIELDS = ("x", "y", "angle", "friendly", "vx", "vy")
+
+
+def warmed_up_game(ticks=20):
+    game = Game(seed=1)
+    pilot = RandomPilot(1)
+    for tick in range(ticks):
+        game.handle_mission(*pilot(tick))
+    return game
+
+
+def test_interpolation_between_ticks_with_enemies_coming_and_going():
+    game = warmed_up_game()
+    game.remember_positions()
+    prev_x, prev_y, prev_angle = game.prev_player
+    prev_ids, prev_xs, prev_ys = (a.copy() for a in game.prev_enemies)
+
+    game.handle_mission(KeyState({pygame.K_d, pygame.K_s}), 40, False)
+    # One enemy dies and a new one appears between the two ticks
+    gone = game.enemies.ids[0]
+    game.enemies.health[0] = 0
+    assert game.enemies.remove_dead() == 1
+    game.enemies.spawn(300.0, 300.0)
+    game.bullets.spawn(100.0, 100.0, 0.5)
+    world = game.snapshot()
+
+    pose, bullet_xs, bullet_ys, enemy_xs, enemy_ys = world.render_positions(0.25)
+    player = world.player
+    assert pose == pytest.approx((prev_x + (player.x - prev_x) * 0.25, prev_y + (player.y - prev_y) * 0.25,
+                                  prev_angle + (player.angle - prev_angle) * 0.25))
+    assert pose != (player.x, player.y, player.angle)
+
+    ids = world.enemies.ids.tolist()
+    assert gone not in ids and len(enemy_xs) == len(ids)
+    for i, enemy_id in enumerate(ids):
+        if enemy_id in prev_ids:
+            j = prev_ids.tolist().index(enemy_id)
+            assert enemy_xs[i] == pytest.approx(prev_xs[j] + (world.enemies.x[i] - prev_xs[j]) * 0.25)
+            assert enemy_ys[i] == pytest.approx(prev_ys[j] + (world.enemies.y[i] - prev_ys[j]) * 0.25)
+        else:
+            # New this tick: drawn where it is, with nothing to come from
+            assert (enemy_xs[i], enemy_ys[i]) == (world.enemies.x[i], world.enemies.y[i])
+    assert ids[-1] not in prev_ids
+
+    # Bullets are drawn back along their velocity
+    assert np.allclose(bullet_xs, world.bullets.x - world.bullets.vx * 0.75)
+    assert np.allclose(bullet_ys, world.bullets.y - world.bullets.vy * 0.75)
+
+    # At the end of the tick everything is where the snapshot has it
+    pose, bullet_xs, _, enemy_xs, _ = world.render_positions(1.0)
+    assert pose == (player.x, player.y, player.angle)
+    assert bullet_xs is world.bullets.x and enemy_xs is world.enemies.x
+
+
+def test_interpolation_when_every_remembered_enemy_is_gone():
+    game = warmed_up_game()
+    game.remember_positions()
+    game.handle_mission(KeyState(), 0, False)
+    game.enemies.health[:len(game.enemies)] = 0
+    game.enemies.remove_dead()
+    game.enemies.spawn(300.0, 300.0)
+    _, _, _, enemy_xs, enemy_ys = game.snapshot().render_positions(0.5)
+    assert (enemy_xs.tolist(), enemy_ys.tolist()) == ([300.0], [300.0])
+
+
+def test_buffer_hands_over_only_the_newest_frame():
+    buffer = SnapshotBuffer()
+    buffer.publish("first")
+    buffer.publish("second")
+    assert buffer.take() == "second"
+    taken = []
+    reader = threading.Thread(target=lambda: taken.append(buffer.take()))
+    reader.start()
+    # take() waits for a frame it has not seen yet
+    time.sleep(0.05)
+    assert not taken
+    buffer.publish("third")
+    reader.join(1)
+    assert taken == ["third"]
+
+
+def test_render_thread_draws_the_last_frame_and_stops_cleanly():
+    drawn = []
+    renderer = RenderThread(lambda world, alpha: drawn.append((world, alpha)))
+    assert not renderer.wait()
+    for frame in range(5):
+        renderer.submit(frame, 0.5)
+        assert renderer.wait()
+    renderer.stop()
+    assert not renderer.thread.is_alive()
+    assert drawn == [(frame, 0.5) for frame in range(5)]
+
+    # Stopping with a frame still in flight lets it finish first
+    renderer = RenderThread(lambda world, alpha: (time.sleep(0.05), drawn.append(world)))
+    renderer.submit("slow")
+    renderer.stop()
+    assert not renderer.thread.is_alive() and drawn[-1] == "slow"
+
+
+def test_render_thread_reraises_drawing_errors():
+    def draw(world, alpha):
+        raise RuntimeError(world)
+
+    renderer = RenderThread(draw)
+    renderer.submit("broken")
+    with pytest.raises(RuntimeError, match="broken"):
+        renderer.wait()
+    # The error is reported once, and the thread is still there to stop
+    assert not renderer.wait()
+    renderer.stop()
+    assert not renderer.thread.is_alive()
+
+
+def columns(world):
+    return ([getattr(world.enemies, name).copy() for name in ENEMY_FIELDS] +
+            [getattr(world.bullets, name).copy() for name in BULLET_FIELDS] +
+            [np.array(a) for a in world.prev_enemies])
+
+
+def test_published_snapshot_is_not_mutated_while_it_is_drawn():
+    game = warmed_up_game()
+    pilot = RandomPilot(9)
+    game.remember_positions()
+    game.handle_mission(*pilot(0))
+    game.bullets.spawn(100.0, 100.0, 0.5)
+    world = game.snapshot()
+    before = columns(world)
+    arrays = [getattr(world.enemies, name) for name in ENEMY_FIELDS] + \
+        [getattr(world.bullets, name) for name in BULLET_FIELDS] + list(world.prev_enemies)
+    assert not any(a.flags.writeable for a in arrays)
+
+    reads = []
+    started = threading.Event()
+
+    def draw(world, alpha):
+        # Read the snapshot, let the simulation run on, then read it again
+        first = columns(world)
+        started.set()
+        time.sleep(0.05)
+        reads.append((first, columns(world)))
+
+    renderer = RenderThread(draw)
+    renderer.submit(world)
+    started.wait(1)
+    # The simulation moves, kills, compacts and respawns in its stores meanwhile
+    for tick in range(1, 30):
+        game.remember_positions()
+        game.handle_mission(*pilot(tick))
+    game.enemies.health[:len(game.enemies)] = 0
+    game.enemies.remove_dead()
+    game.bullets.compact()
+    game.enemies.spawn(1.0, 1.0)
+    renderer.stop()
+
+    (first, second), = reads
+    for expected, a, b in zip(before, first, second):
+        assert np.array_equal(expected, a) and np.array_equal(expected, b)
+    with pytest.raises(ValueError):
+        world.enemies.x[0] = -1.0
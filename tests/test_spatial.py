@@ -0,0 +1,120 @@
+import math
+
+import numpy as np
+import pygame
+import pytest
+
+import spatial
+from spatial import WallGrid, segment_box_entry, segment_circle_entry
+
+BOX = np.array([[10.0, 10.0, 20.0, 20.0]])
+
+
+@pytest.mark.parametrize("segment, t", [
+    # Straight through, entering a quarter of the way along
+    ((0, 15, 40, 15), 0.25),
+    # Diagonally through a corner region
+    ((0, 0, 30, 30), 1 / 3),
+    # Starting inside enters at once
+    ((15, 15, 40, 15), 0.0),
+    # Ending inside still enters
+    ((0, 15, 12, 15), 10 / 12),
+    # Stopping short of the box
+    ((0, 15, 9, 15), math.inf),
+    # Sliding along an edge only touches it, like pygame.Rect.colliderect
+    ((0, 10, 40, 10), math.inf),
+    ((20, 0, 20, 40), math.inf),
+    # Ending exactly on the near edge
+    ((0, 15, 10, 15), math.inf),
+    # Parallel to a slab and outside it
+    ((0, 25, 40, 25), math.inf),
+    # Parallel to a slab and inside it
+    ((15, 0, 15, 40), 0.25),
+    # A point, inside and outside
+    ((15, 15, 15, 15), 0.0),
+    ((5, 5, 5, 5), math.inf),
+])
+def test_segment_box_entry(segment, t):
+    assert segment_box_entry(*segment, BOX)[0] == pytest.approx(t)
+    # One wall takes WallGrid's scalar path, which must agree on every edge case
+    assert WallGrid([pygame.Rect(10, 10, 10, 10)]).segment_blocked(*segment) == math.isfinite(t)
+
+
+def test_points_hit_only_the_box_interior():
+    xs, ys = (a.ravel().astype(float) for a in np.meshgrid(np.arange(5, 26), np.arange(5, 26)))
+    entry = segment_box_entry(xs, ys, xs, ys, BOX)[:, 0]
+    inside = (xs > 10) & (xs < 20) & (ys > 10) & (ys < 20)
+    assert np.array_equal(entry == 0, inside)
+    assert np.isinf(entry[~inside]).all()
+
+
+def test_segment_box_entry_array_shapes():
+    boxes = np.array([[10.0, 10.0, 20.0, 20.0], [30.0, 10.0, 40.0, 20.0]])
+    x1 = np.array([0.0, 0.0, 35.0])
+    y1 = np.array([15.0, 0.0, 15.0])
+    x2 = np.array([50.0, 0.0, 35.0])
+    y2 = np.array([15.0, 50.0, 30.0])
+    entry = segment_box_entry(x1, y1, x2, y2, boxes)
+    assert entry.shape == (3, 2)
+    assert entry[0].tolist() == pytest.approx([0.2, 0.6])
+    assert np.isinf(entry[1]).all()
+    assert entry[2].tolist() == [math.inf, 0.0]
+
+    # A separate box set per segment
+    per_segment = np.stack([boxes[::-1], boxes, boxes])
+    assert np.array_equal(segment_box_entry(x1, y1, x2, y2, per_segment)[0], entry[0][::-1])
+
+
+def test_segment_circle_entry():
+    t = segment_circle_entry(0, 0, 40, 0, np.array([20.0, 20.0, 20.0, 0.0]),
+                             np.array([0.0, 10.0, 20.0, 0.0]), 10)
+    # Through the centre, grazing, missing, starting inside
+    assert t.tolist() == [0.25, math.inf, math.inf, 0.0]
+
+
+def random_walls(rng, count):
+    walls = []
+    for _ in range(count):
+        x, y = rng.integers(0, 800, 2)
+        w, h = rng.integers(5, 120, 2)
+        walls.append(pygame.Rect(int(x), int(y), int(w), int(h)))
+    return walls
+
+
+@pytest.mark.parametrize("count", [5, 200])
+def test_batched_queries_match_scalar_ones(monkeypatch, count):
+    rng = np.random.default_rng(count)
+    grid = WallGrid(random_walls(rng, 40))
+    xs = rng.uniform(-50, 850, count)
+    ys = rng.uniform(-50, 850, count)
+    x2 = xs + rng.uniform(-200, 200, count)
+    y2 = ys + rng.uniform(-200, 200, count)
+
+    hits = [grid.hits_box(x, y, 15) for x, y in zip(xs.tolist(), ys.tolist())]
+    sweeps = [grid.sweep_box(*path, 15) for path in zip(xs.tolist(), ys.tolist(), x2.tolist(), y2.tolist())]
+    blocked = np.isfinite(segment_box_entry(xs, ys, x2, y2, grid.boxes)).any(axis=1).tolist()
+    # Both sides of the SCALAR_BATCH cutoff, and scalar segment tests against all 40 walls
+    for scalar_batch in (100, spatial.SCALAR_BATCH, -1):
+        monkeypatch.setattr(spatial, "SCALAR_BATCH", scalar_batch)
+        assert grid.hits_boxes(xs, ys, 15).tolist() == hits
+        assert grid.sweep_boxes(xs, ys, x2, y2, 15).tolist() == pytest.approx(sweeps)
+        assert grid.segments_blocked(xs, ys, x2, y2).tolist() == blocked
+        assert [grid.segment_blocked(*path) for path in zip(xs, ys, x2, y2)] == blocked
+
+
+def test_hits_box_agrees_with_colliderect():
+    walls = random_walls(np.random.default_rng(1), 30)
+    grid = WallGrid(walls)
+    rng = np.random.default_rng(2)
+    for x, y in rng.integers(0, 900, (500, 2)).tolist():
+        mover = pygame.Rect(x - 15, y - 15, 30, 30)
+        assert grid.hits_box(x, y, 15) == (mover.collidelist(walls) >= 0)
+
+
+def test_sweep_stops_fast_movers_at_thin_walls():
+    grid = WallGrid([pygame.Rect(100, 0, 2, 200)])
+    # Both ends are clear of the wall, but the path crosses it
+    assert not grid.hits_box(80, 100, 5) and not grid.hits_box(130, 100, 5)
+    t = grid.sweep_box(80, 100, 130, 100, 5)
+    assert t == pytest.approx((95 - 80) / 50)
+    assert grid.sweep_box(80, 100, 90, 100, 5) == math.inf